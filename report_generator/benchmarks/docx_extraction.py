@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+DOCX extraction benchmark: streaming extractor versus python-docx.
+
+Writes a synthetic Word document with headings, list items and tables, then
+extracts it in a fresh interpreter per run with:
+
+- ``stream``: report_generator.docx_extraction (iterparse of word/document.xml)
+- ``python-docx``: the previous extractor, which builds the full document
+  model and joins ``doc.paragraphs`` (tables are not included)
+
+and reports median time, peak RSS and output size.
+
+Usage:
+    python benchmarks/docx_extraction.py [--paragraphs 50000] [--tables 500] [--runs 3] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+RELATIONSHIPS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+EXTRACTORS = {
+    'stream': (
+        "from src.report_generator.docx_extraction import extract_docx_text\n"
+        "text = extract_docx_text(path)\n"
+    ),
+    'python-docx': (
+        "import docx\n"
+        "doc = docx.Document(path)\n"
+        "text = '\\n'.join(paragraph.text for paragraph in doc.paragraphs)\n"
+    ),
+}
+
+RUN_SNIPPET = """
+import resource, sys, time
+path = sys.argv[1]
+start = time.perf_counter()
+{extract}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, len(text))
+"""
+
+
+def _paragraph(text: str, style: str = None) -> str:
+    properties = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{properties}<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def write_document(path: Path, paragraphs: int, tables: int) -> None:
+    """Write a synthetic report-like document, streaming it into the zip"""
+    table_every = max(paragraphs // max(tables, 1), 1)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', RELATIONSHIPS)
+        with archive.open('word/document.xml', 'w') as out:
+            out.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            )
+            for i in range(paragraphs):
+                if i % 200 == 0:
+                    block = _paragraph(f"Section {i // 200}", 'Heading1')
+                elif i % 7 == 0:
+                    block = _paragraph(f"Action item {i}: follow up with the on-call team", 'ListBullet')
+                else:
+                    block = _paragraph(
+                        f"Paragraph {i}. Throughput stayed within target while the batch "
+                        f"queue drained; latency peaked at {i % 300} ms during the backfill."
+                    )
+                if i % table_every == table_every - 1:
+                    rows = ''.join(
+                        '<w:tr>' + ''.join(
+                            f'<w:tc><w:p><w:r><w:t>{"metric" if r == 0 else r * c + i}</w:t></w:r></w:p></w:tc>'
+                            for c in range(5)
+                        ) + '</w:tr>'
+                        for r in range(10)
+                    )
+                    block += f'<w:tbl>{rows}</w:tbl>'
+                out.write(block.encode('utf-8'))
+            out.write(b'<w:sectPr/></w:body></w:document>')
+
+
+def measure(name: str, path: Path, runs: int) -> dict:
+    """Extract in fresh interpreters; return median seconds, peak RSS and output size"""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', RUN_SNIPPET.format(extract=EXTRACTORS[name]), str(path)],
+            cwd=PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        elapsed, max_rss_kb, chars = result.stdout.split()
+        samples.append((float(elapsed), int(max_rss_kb), int(chars)))
+    return {
+        'median_s': statistics.median(sample[0] for sample in samples),
+        'peak_rss_mb': max(sample[1] for sample in samples) / 1024,
+        'output_chars': samples[-1][2],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--paragraphs', type=int, default=50000, help='paragraphs in the document')
+    parser.add_argument('--tables', type=int, default=500, help='10x5 tables in the document')
+    parser.add_argument('--runs', type=int, default=3, help='fresh processes per extractor')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'benchmark.docx'
+        write_document(path, args.paragraphs, args.tables)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        results = {name: measure(name, path, args.runs) for name in EXTRACTORS}
+
+    if args.json:
+        print(json.dumps({'document_mb': size_mb, 'results': results}, indent=2))
+        return
+
+    print(f"document: {args.paragraphs} paragraphs, {args.tables} tables, {size_mb:.1f} MB zipped")
+    print(f"{'extractor':<14}{'median':>10}{'peak RSS':>12}{'output':>14}")
+    for name, stats in results.items():
+        print(
+            f"{name:<14}{stats['median_s']:>9.2f}s{stats['peak_rss_mb']:>10.0f}MB"
+            f"{stats['output_chars']:>14,}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Load test of the report pipeline against the fake model backend.
+
+Simulates concurrent users, each turning uploads into saved reports:
+
+- ``extract``: FileProcessor.extract_upload() on a synthetic upload
+- ``generate``: GeminiReportGenerator.generate_report_stream() against a
+  FakeModelBackend, retrying 429/5xx errors with backoff like the job queue
+- ``save``: ReportManager.save_report() into a temporary history
+
+Model latency, throughput and failure rates are set on the command line, so
+the numbers show the overhead of our own code (rate limiter, cache, storage,
+search index, thread contention) rather than of the Gemini service. For each
+stage it reports p50/p95/p99 latency and throughput, with time to first
+token for generation and the end-to-end time per report.
+
+Usage:
+    python benchmarks/load_test.py [--users 16] [--reports 10] [--latency 0.5] [--json]
+"""
+import argparse
+import io
+import json
+import logging
+import math
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from src.report_generator.batch_generation import RateLimiter, backoff_delay, is_retryable_error  # noqa: E402
+from src.report_generator.file_utils import FileProcessor  # noqa: E402
+from src.report_generator.gemini_utils import GeminiReportGenerator  # noqa: E402
+from src.report_generator.model_backends import FakeModelBackend, LATENCY_DISTRIBUTIONS  # noqa: E402
+from src.report_generator.report_utils import ReportManager  # noqa: E402
+from src.report_generator.response_cache import ResponseCache  # noqa: E402
+
+STAGES = ('extract', 'generate', 'first_token', 'save', 'total')
+TEMPLATES = ('default', 'operations', 'development', 'meetings')
+NOTE_LINES = (
+    "Reviewed the deployment checklist with the release team",
+    "Fixed a crash when exporting reports with empty tables",
+    "Customer reported slow uploads; investigating the proxy",
+    "Planned next sprint and assigned owners to open incidents",
+    "Latency of the search endpoint dropped after adding an index",
+)
+
+
+class Upload(io.BytesIO):
+    """An in-memory upload like Streamlit's UploadedFile"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def make_upload(user: int, index: int, size_kb: int, fmt: str) -> Upload:
+    """Build a synthetic upload of about ``size_kb`` kilobytes"""
+    lines = []
+    size = 0
+    n = 0
+    while size < size_kb * 1024:
+        if fmt == 'csv':
+            line = f"{n},user{user},{NOTE_LINES[n % len(NOTE_LINES)]},{(n * 37) % 1000}"
+        else:
+            line = f"- {NOTE_LINES[(n + index) % len(NOTE_LINES)]} (user {user}, item {n})"
+        lines.append(line)
+        size += len(line) + 1
+        n += 1
+    if fmt == 'csv':
+        lines.insert(0, "id,user,note,value")
+    return Upload(f"notes_{user}_{index}.{fmt}", '\n'.join(lines).encode('utf-8'))
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Recorder:
+    """Collects stage durations and failures from all simulated users"""
+
+    def __init__(self):
+        self.durations: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.failures: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[stage].append(seconds)
+
+    def fail(self, stage: str) -> None:
+        with self._lock:
+            self.failures[stage] += 1
+
+    def retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def summary(self, wall_seconds: float) -> Dict[str, Any]:
+        stages = {}
+        for stage in STAGES:
+            values = self.durations[stage]
+            stages[stage] = {
+                'count': len(values),
+                'failed': self.failures[stage],
+                'p50_ms': percentile(values, 50) * 1000,
+                'p95_ms': percentile(values, 95) * 1000,
+                'p99_ms': percentile(values, 99) * 1000,
+                'max_ms': max(values, default=0.0) * 1000,
+                'mean_ms': (sum(values) / len(values) * 1000) if values else 0.0,
+                'per_second': len(values) / wall_seconds if wall_seconds else 0.0,
+            }
+        return {'wall_seconds': wall_seconds, 'retries': self.retries, 'stages': stages}
+
+
+def simulate_user(
+    user: int,
+    args: argparse.Namespace,
+    generator: GeminiReportGenerator,
+    manager: ReportManager,
+    processor: FileProcessor,
+    recorder: Recorder,
+    start: threading.Event
+) -> None:
+    """Turn ``args.reports`` uploads into saved reports"""
+    start.wait()
+    for index in range(args.reports):
+        upload = make_upload(user, index, args.input_kb, args.format)
+        began = time.perf_counter()
+
+        try:
+            text = processor.extract_upload(upload)
+        except Exception:
+            recorder.fail('extract')
+            continue
+        extracted = time.perf_counter()
+        recorder.add('extract', extracted - began)
+
+        template = TEMPLATES[(user + index) % len(TEMPLATES)]
+        content = None
+        first_token = None
+        for attempt in range(args.max_retries + 1):
+            chunks = []
+            try:
+                for chunk in generator.generate_report_stream(
+                    text, template, max_tokens=args.output_tokens, use_cache=args.cache
+                ):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                    chunks.append(chunk)
+                content = ''.join(chunks)
+                break
+            except Exception as e:
+                if attempt == args.max_retries or not is_retryable_error(e):
+                    break
+                recorder.retry()
+                time.sleep(backoff_delay(attempt + 1, base_delay=args.retry_delay))
+        generated = time.perf_counter()
+        if content is None:
+            recorder.fail('generate')
+            continue
+        recorder.add('generate', generated - extracted)
+        recorder.add('first_token', first_token - extracted)
+
+        report = {
+            'title': f"{template.capitalize()} Report - user {user} #{index}",
+            'content': content,
+            'template': template,
+            'date': time.strftime('%Y-%m-%d'),
+            'priority': 'Medium',
+            'metadata': {'model': generator.model_name, 'user': user},
+        }
+        try:
+            manager.save_report(report)
+        except Exception:
+            recorder.fail('save')
+            continue
+        saved = time.perf_counter()
+        recorder.add('save', saved - generated)
+        recorder.add('total', saved - began)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the load test and return its summary"""
+    backend = FakeModelBackend(
+        latency=args.latency,
+        distribution=args.distribution,
+        spread=args.spread,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    rate_limiter = RateLimiter(args.requests_per_minute) if args.requests_per_minute else None
+    # The cache stays in memory so runs do not reuse each other's responses
+    cache = ResponseCache(enabled=True) if args.cache else None
+    generator = GeminiReportGenerator(backend=backend, cache=cache, rate_limiter=rate_limiter)
+    recorder = Recorder()
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ReportManager(
+            Path(directory) / 'reports.json',
+            backend=args.storage,
+            search=args.search,
+            split_bodies=args.split_bodies
+        )
+        processor = FileProcessor()
+        start = threading.Event()
+        users = [
+            threading.Thread(
+                target=simulate_user,
+                args=(user, args, generator, manager, processor, recorder, start),
+                name=f'user-{user}'
+            )
+            for user in range(args.users)
+        ]
+        for thread in users:
+            thread.start()
+        began = time.perf_counter()
+        start.set()
+        for thread in users:
+            thread.join()
+        wall = time.perf_counter() - began
+        manager.close()
+
+    summary = recorder.summary(wall)
+    summary['model'] = backend.stats()
+    summary['settings'] = {
+        key: getattr(args, key) for key in (
+            'users', 'reports', 'input_kb', 'format', 'latency', 'distribution', 'spread',
+            'tokens_per_second', 'output_tokens', 'error_rate', 'rate_limit_rate', 'seed',
+            'storage', 'search', 'split_bodies', 'cache', 'requests_per_minute'
+        )
+    }
+    return summary
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    lines = [f"{'stage':<12}{'count':>7}{'failed':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'per s':>9}"]
+    for stage, row in summary['stages'].items():
+        lines.append(
+            f"{stage:<12}{row['count']:>7}{row['failed']:>8}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+            f"{row['p99_ms']:>10.1f}{row['max_ms']:>10.1f}{row['per_second']:>9.2f}"
+        )
+    model = summary['model']
+    lines.append(
+        f"\n{summary['wall_seconds']:.2f}s wall, {summary['retries']} retries; model: {model['calls']} calls, "
+        f"{model['rate_limited']} rate limited, {model['errors']} errors, {model['output_tokens']} tokens"
+    )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--users', type=int, default=16, help='concurrent simulated users (default: %(default)s)')
+    parser.add_argument('--reports', type=int, default=10, help='reports per user (default: %(default)s)')
+    parser.add_argument('--input-kb', type=int, default=8, help='size of each upload (default: %(default)s)')
+    parser.add_argument('--format', choices=('txt', 'md', 'csv'), default='txt', help='upload format (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.5, help='model time to first token in seconds (default: %(default)s)')
+    parser.add_argument('--distribution', choices=LATENCY_DISTRIBUTIONS, default='lognormal',
+                        help='latency distribution (default: %(default)s)')
+    parser.add_argument('--spread', type=float, default=0.5, help='relative latency spread (default: %(default)s)')
+    parser.add_argument('--tokens-per-second', type=float, default=200.0, help='model output rate (default: %(default)s)')
+    parser.add_argument('--output-tokens', type=int, default=400, help='tokens per report (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls failing with 5xx (default: %(default)s)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='fraction of calls failing with 429 (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the fake model (default: %(default)s)')
+    parser.add_argument('--max-retries', type=int, default=3, help='retries on 429/5xx (default: %(default)s)')
+    parser.add_argument('--retry-delay', type=float, default=0.2, help='base backoff delay in seconds (default: %(default)s)')
+    parser.add_argument('--requests-per-minute', type=float, default=0,
+                        help='client-side rate limit, 0 for none (default: %(default)s)')
+    parser.add_argument('--storage', choices=('json', 'journal', 'sqlite'), default='journal',
+                        help='report storage backend (default: %(default)s)')
+    parser.add_argument('--search', action='store_true', help='maintain the full-text search index')
+    parser.add_argument('--split-bodies', action='store_true', help='store report bodies separately')
+    parser.add_argument('--cache', action='store_true', help='use the response cache (in memory only)')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log failed and retried calls')
+    args = parser.parse_args()
+    # Injected failures are expected; only show them when asked
+    logging.basicConfig(level=logging.WARNING if args.verbose else logging.CRITICAL)
+
+    summary = run(args)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(format_summary(summary))
+
+
+if __name__ == '__main__':
+    main()
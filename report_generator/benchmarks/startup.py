@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Daily Report Generator.
+
+Measures, each in a fresh interpreter:
+
+- import time of the package and of the Streamlit app module
+- time to first render of the app (script start until the first full run
+  completes), using Streamlit's headless AppTest runner
+
+Usage:
+    python benchmarks/startup.py [--runs 5] [--import-budget-ms 300] [--render-budget-ms 3000] [--json]
+
+Exits with status 1 when a median exceeds its budget, so it can run in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RENDER_SNIPPET = """
+import time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file('run.py', default_timeout=120)
+app.run()
+elapsed = time.perf_counter() - start
+if app.exception:
+    raise SystemExit('App raised: ' + str(app.exception[0].value))
+print(elapsed)
+"""
+
+
+def _time_snippet(snippet: str) -> float:
+    """Run a snippet in a fresh interpreter and return the seconds it printed"""
+    env = dict(os.environ)
+    # Never touch the network while benchmarking startup
+    env.setdefault('GEMINI_API_KEY', 'benchmark-key')
+    env['GEMINI_HEALTH_CHECK'] = 'false'
+    result = subprocess.run(
+        [sys.executable, '-c', snippet],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure(snippet: str, runs: int) -> dict:
+    """Return median/min/max milliseconds over several fresh runs"""
+    samples = [_time_snippet(snippet) * 1000 for _ in range(runs)]
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh processes per measurement')
+    parser.add_argument('--import-budget-ms', type=float, default=300.0,
+                        help='budget for importing the package')
+    parser.add_argument('--render-budget-ms', type=float, default=3000.0,
+                        help='budget for the first render of the app')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = {
+        'import src.report_generator': measure(
+            IMPORT_SNIPPET.format(module='src.report_generator'), args.runs
+        ),
+        'import src.report_generator.app': measure(
+            IMPORT_SNIPPET.format(module='src.report_generator.app'), args.runs
+        ),
+        'first render': measure(RENDER_SNIPPET, args.runs),
+    }
+    budgets = {
+        'import src.report_generator': args.import_budget_ms,
+        'first render': args.render_budget_ms,
+    }
+
+    over_budget = [
+        name for name, budget in budgets.items()
+        if results[name]['median_ms'] > budget
+    ]
+
+    if args.json:
+        print(json.dumps({'results': results, 'budgets': budgets, 'over_budget': over_budget}, indent=2))
+    else:
+        print(f"{'measurement':<34}{'median':>10}{'min':>10}{'max':>10}{'budget':>10}")
+        for name, stats in results.items():
+            budget = budgets.get(name)
+            print(
+                f"{name:<34}{stats['median_ms']:>8.0f}ms{stats['min_ms']:>8.0f}ms"
+                f"{stats['max_ms']:>8.0f}ms" + (f"{budget:>8.0f}ms" if budget else '')
+            )
+        for name in over_budget:
+            print(f"OVER BUDGET: {name}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
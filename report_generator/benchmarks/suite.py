@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Scale benchmarks for report storage and text extraction, with baselines.
+
+``run`` measures, each case in a fresh interpreter:
+
+- report storage: for every backend and history size (10k, 100k, ... reports
+  built from synthetic data), the time to open the history, list the first
+  page, list with filters, list a deep page, get, save and delete reports
+  (and search with ``--search``), with the peak RSS of the process and the
+  size of the files on disk
+- extraction: FileProcessor.extract_text() on large synthetic PDF, DOCX,
+  CSV and XLSX files, with the peak RSS and the input and output sizes
+
+Results are written as JSON. ``--baseline`` (or the ``compare`` command)
+compares them with an earlier run and exits with status 1 when a metric got
+worse by more than ``--threshold``, so it can run in CI.
+
+Usage:
+    python benchmarks/suite.py run [--scales 10000,100000] [--backends journal,sqlite]
+        [--formats pdf,docx,csv,xlsx] [--doc-mb 5] [--output results.json] [--baseline baseline.json]
+    python benchmarks/suite.py compare baseline.json results.json [--threshold 0.2]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional
+
+import synthetic
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+BACKENDS = ('json', 'journal', 'sqlite')
+FORMATS = ('pdf', 'docx', 'csv', 'xlsx')
+# Differences smaller than this are noise whatever the ratio
+NOISE_FLOORS = {'_ms': 0.5, '_mb': 1.0}
+SEARCH_TERMS = ('deployment', 'latency customer', 'outage', 'security audit', 'roadmap')
+
+
+def _peak_rss_mb() -> float:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _timings(call: Callable[[int], Any], count: int) -> Dict[str, float]:
+    """Call ``call(i)`` ``count`` times; return the median and p95 in milliseconds"""
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        call(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'p50_ms': statistics.median(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+def _storage_size_mb(directory: Path) -> float:
+    total = 0
+    for path in directory.rglob('*'):
+        if path.is_file():
+            total += path.stat().st_size
+    return total / 1024 / 1024
+
+
+def _manager(directory: Path, spec: Dict[str, Any]):
+    sys.path.insert(0, str(PROJECT_DIR))
+    from src.report_generator.config import REPORT_STORAGE_OPTIONS
+    from src.report_generator.report_utils import ReportManager
+
+    return ReportManager(
+        directory / 'reports.json',
+        backend=spec['backend'],
+        search=spec['search'],
+        split_bodies=spec['split_bodies'],
+        **REPORT_STORAGE_OPTIONS.get(spec['backend'], {})
+    )
+
+
+def build_history(directory: Path, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Create a history of spec['reports'] synthetic reports in the backend's own format"""
+    start = time.perf_counter()
+    if spec['backend'] == 'json' and not spec['split_bodies'] and not spec['search']:
+        synthetic.write_json_history(directory / 'reports.json', spec['reports'], spec['content_bytes'], spec['seed'])
+    else:
+        manager = _manager(directory, spec)
+        batch = 5000
+        for first in range(0, spec['reports'], batch):
+            count = min(batch, spec['reports'] - first)
+            manager.save_reports(list(synthetic.iter_reports(count, spec['content_bytes'], spec['seed'], start=first)))
+        manager.close()
+    return {'build_s': time.perf_counter() - start}
+
+
+def measure_storage(directory: Path, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Time the ReportManager operations on a history built by build_history"""
+    n = spec['reports']
+    ops = spec['ops']
+    rng = random.Random(spec['seed'])
+    result: Dict[str, Any] = {}
+
+    start = time.perf_counter()
+    manager = _manager(directory, spec)
+    assert manager.get_report_count() == n
+    result['open'] = {'p50_ms': (time.perf_counter() - start) * 1000}
+
+    last_day = synthetic.START_DATE.toordinal() + n // 20
+    def filtered(i: int) -> Any:
+        day = rng.randrange(synthetic.START_DATE.toordinal(), last_day + 1)
+        return manager.list_reports(
+            limit=10, template=synthetic.TEMPLATES[i % 4],
+            date_from=datetime.fromordinal(max(day - 30, 1)).date().isoformat(),
+            date_to=datetime.fromordinal(day).date().isoformat()
+        )
+
+    result['list_first_page'] = _timings(lambda i: manager.list_reports(limit=10), ops)
+    result['list_filtered'] = _timings(filtered, ops)
+    result['list_deep_page'] = _timings(lambda i: manager.list_reports(limit=10, offset=n // 2), ops)
+    lookups = [synthetic.report_id(rng.randrange(n)) for _ in range(ops)]
+    result['get_report'] = _timings(lambda i: manager.get_report(lookups[i]), ops)
+
+    new_reports = list(synthetic.iter_reports(ops, spec['content_bytes'], spec['seed'] + 1, start=n))
+    result['save_report'] = _timings(lambda i: manager.save_report(new_reports[i]), ops)
+    result['delete_report'] = _timings(lambda i: manager.delete_report(new_reports[i]['id']), ops)
+    if spec['search'] and manager.search_enabled:
+        result['search_reports'] = _timings(
+            lambda i: manager.search_reports(SEARCH_TERMS[i % len(SEARCH_TERMS)], limit=10), ops
+        )
+    manager.close()
+
+    result['process'] = {'peak_rss_mb': _peak_rss_mb(), 'files_mb': _storage_size_mb(directory)}
+    return result
+
+
+def measure_extraction(path: Path) -> Dict[str, Any]:
+    """Time FileProcessor.extract_text() on one file"""
+    sys.path.insert(0, str(PROJECT_DIR))
+    from src.report_generator.file_utils import FileProcessor
+
+    start = time.perf_counter()
+    text = FileProcessor.extract_text(path)
+    elapsed = (time.perf_counter() - start) * 1000
+    return {'extract_ms': elapsed, 'peak_rss_mb': _peak_rss_mb(), 'output_chars': len(text)}
+
+
+def _child(task: str, *args: str) -> Dict[str, Any]:
+    """Run a measurement in a fresh interpreter and return its JSON result"""
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), '_child', task, *args],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{task} {' '.join(args)} failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def write_document(path: Path, fmt: str, size_mb: float, seed: int) -> None:
+    """Write a synthetic document of roughly ``size_mb`` megabytes"""
+    if fmt == 'csv':
+        synthetic.write_csv(path, int(size_mb * 1024 * 1024), seed)
+    elif fmt == 'xlsx':
+        # About 45 bytes per compressed row
+        synthetic.write_xlsx(path, int(size_mb * 1024 * 1024 / 45), seed=seed)
+    elif fmt == 'pdf':
+        # About 3.5 KB per page of 45 lines
+        synthetic.write_pdf(path, max(1, int(size_mb * 1024 / 3.5)), seed=seed)
+    else:
+        from docx_extraction import write_document as write_docx
+
+        # About 8 bytes per paragraph once compressed
+        paragraphs = max(1, int(size_mb * 1024 * 1024 / 8))
+        write_docx(path, paragraphs, max(1, paragraphs // 100))
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the selected cases and return the results document"""
+    results: Dict[str, Dict[str, float]] = {}
+    work = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix='report-bench-'))
+    work.mkdir(parents=True, exist_ok=True)
+    try:
+        for backend in args.backends:
+            for n in args.scales:
+                spec = {
+                    'backend': backend, 'reports': n, 'ops': args.ops, 'seed': args.seed,
+                    'content_bytes': args.content_bytes, 'search': args.search,
+                    'split_bodies': args.split_bodies,
+                }
+                name = f"storage/{backend}/{n}"
+                fixture = work / f"{backend}-{n}-{args.content_bytes}-{args.seed}-{int(args.search)}{int(args.split_bodies)}"
+                if not fixture.exists():
+                    log(f"{name}: building history")
+                    fixture.with_suffix('.tmp').mkdir(exist_ok=True)
+                    _child('build', str(fixture.with_suffix('.tmp')), json.dumps(spec))
+                    fixture.with_suffix('.tmp').rename(fixture)
+                scratch = work / 'scratch'
+                shutil.rmtree(scratch, ignore_errors=True)
+                shutil.copytree(fixture, scratch)
+                log(f"{name}: measuring")
+                measured = _child('storage', str(scratch), json.dumps(spec))
+                shutil.rmtree(scratch, ignore_errors=True)
+                for operation, metrics in measured.items():
+                    results[f"{name}/{operation}"] = metrics
+
+        for fmt in args.formats:
+            name = f"extract/{fmt}/{args.doc_mb:g}mb"
+            path = work / f"document-{args.doc_mb:g}mb-{args.seed}.{fmt}"
+            if not path.exists():
+                log(f"{name}: writing document")
+                write_document(path, fmt, args.doc_mb, args.seed)
+            log(f"{name}: measuring")
+            samples = [_child('extract', str(path)) for _ in range(args.runs)]
+            results[name] = {
+                'extract_ms': statistics.median(s['extract_ms'] for s in samples),
+                'peak_rss_mb': max(s['peak_rss_mb'] for s in samples),
+                'input_mb': path.stat().st_size / 1024 / 1024,
+                'output_chars': samples[-1]['output_chars'],
+            }
+    finally:
+        if not args.work_dir:
+            shutil.rmtree(work, ignore_errors=True)
+
+    return {'meta': _meta(args), 'results': results}
+
+
+def _meta(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'settings': {
+            'scales': args.scales, 'backends': args.backends, 'formats': args.formats,
+            'doc_mb': args.doc_mb, 'ops': args.ops, 'runs': args.runs, 'seed': args.seed,
+            'content_bytes': args.content_bytes, 'search': args.search, 'split_bodies': args.split_bodies,
+        },
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents metric by metric
+
+    Every metric is lower-is-better. A change is a regression when the
+    current value exceeds the baseline by more than ``threshold`` (0.2 for
+    20%) and by more than the noise floor of its unit.
+
+    Returns:
+        One row per metric present in both, with 'case', 'metric',
+        'baseline', 'current', 'change' and 'regression'
+    """
+    rows = []
+    for case, metrics in current['results'].items():
+        before = baseline['results'].get(case)
+        if before is None:
+            continue
+        for metric, value in metrics.items():
+            old = before.get(metric)
+            if old is None or metric == 'output_chars':
+                continue
+            floor = next((f for suffix, f in NOISE_FLOORS.items() if metric.endswith(suffix)), 0.0)
+            change = (value - old) / old if old else 0.0
+            rows.append({
+                'case': case,
+                'metric': metric,
+                'baseline': old,
+                'current': value,
+                'change': change,
+                'regression': change > threshold and value - old > floor,
+            })
+    return rows
+
+
+def format_results(document: Dict[str, Any]) -> str:
+    lines = []
+    for case, metrics in document['results'].items():
+        values = ', '.join(f"{metric} {value:,.2f}" for metric, value in metrics.items())
+        lines.append(f"{case:<40}{values}")
+    return '\n'.join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]], threshold: float) -> str:
+    lines = [f"{'case':<40}{'metric':<14}{'baseline':>12}{'current':>12}{'change':>9}"]
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        lines.append(
+            f"{row['case']:<40}{row['metric']:<14}{row['baseline']:>12,.2f}{row['current']:>12,.2f}"
+            f"{row['change']:>+8.0%}{flag}"
+        )
+    regressions = sum(row['regression'] for row in rows)
+    lines.append(f"\n{regressions} regression(s) beyond {threshold:.0%} in {len(rows)} metrics")
+    return '\n'.join(lines)
+
+
+def log(message: str) -> None:
+    print(message, file=sys.stderr, flush=True)
+
+
+def _csv(kind: Callable[[str], Any], choices: Optional[tuple] = None) -> Callable[[str], list]:
+    def parse(value: str) -> list:
+        items = [kind(item.strip()) for item in value.split(',') if item.strip()]
+        if choices is not None:
+            unknown = [item for item in items if item not in choices]
+            if unknown:
+                raise argparse.ArgumentTypeError(f"unknown: {', '.join(map(str, unknown))}; choose from {', '.join(choices)}")
+        return items
+    return parse
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['_child']:
+        task, target = argv[1], Path(argv[2])
+        if task == 'build':
+            result = build_history(target, json.loads(argv[3]))
+        elif task == 'storage':
+            result = measure_storage(target, json.loads(argv[3]))
+        else:
+            result = measure_extraction(target)
+        print(json.dumps(result))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks')
+    run.add_argument('--scales', type=_csv(int), default=[10000, 100000],
+                     help='history sizes, comma separated (default: 10000,100000)')
+    run.add_argument('--backends', type=_csv(str, BACKENDS), default=list(BACKENDS),
+                     help='storage backends (default: json,journal,sqlite)')
+    run.add_argument('--formats', type=_csv(str, FORMATS), default=list(FORMATS),
+                     help='document formats, or "" for none (default: pdf,docx,csv,xlsx)')
+    run.add_argument('--doc-mb', type=float, default=5, help='size of each document (default: %(default)s)')
+    run.add_argument('--content-bytes', type=int, default=1500, help='report body size (default: %(default)s)')
+    run.add_argument('--ops', type=int, default=20, help='calls per storage operation (default: %(default)s)')
+    run.add_argument('--runs', type=int, default=3, help='fresh processes per extraction (default: %(default)s)')
+    run.add_argument('--search', action='store_true', help='maintain and benchmark the search index')
+    run.add_argument('--split-bodies', action='store_true', help='store report bodies separately')
+    run.add_argument('--seed', type=int, default=0, help='seed of the synthetic data (default: %(default)s)')
+    run.add_argument('--work-dir', help='keep generated histories and documents here for later runs')
+    run.add_argument('--output', help='write the results to this JSON file')
+    run.add_argument('--baseline', help='compare with this results file')
+    run.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown (default: %(default)s)')
+
+    diff = commands.add_parser('compare', help='compare two results files')
+    diff.add_argument('baseline')
+    diff.add_argument('current')
+    diff.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        document = run_suite(args)
+        if args.output:
+            Path(args.output).write_text(json.dumps(document, indent=2))
+        print(format_results(document))
+        if not args.baseline:
+            return 0
+        baseline = json.loads(Path(args.baseline).read_text())
+    else:
+        baseline = json.loads(Path(args.baseline).read_text())
+        document = json.loads(Path(args.current).read_text())
+
+    rows = compare(baseline, document, args.threshold)
+    print(format_comparison(rows, args.threshold))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
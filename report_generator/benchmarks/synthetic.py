@@ -0,0 +1,155 @@
+"""
+Synthetic data for the benchmarks: report histories and large documents.
+
+Everything is generated from a seed, so two runs with the same arguments
+produce identical data and their measurements can be compared.
+"""
+import csv
+import json
+import random
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Iterator
+
+TEMPLATES = ('default', 'operations', 'development', 'meetings')
+PRIORITIES = ('Low', 'Medium', 'High')
+WORDS = (
+    'deployment', 'incident', 'latency', 'customer', 'release', 'review', 'backlog',
+    'migration', 'database', 'throughput', 'onboarding', 'budget', 'roadmap', 'outage',
+    'dashboard', 'invoice', 'security', 'audit', 'forecast', 'escalation', 'retention',
+    'pipeline', 'sprint', 'capacity', 'vendor', 'contract', 'training', 'metrics',
+)
+START_DATE = date(2020, 1, 1)
+
+
+def report_id(index: int) -> str:
+    """ID of the index-th synthetic report, so benchmarks can look reports up without listing them"""
+    return f"report_{index:08d}"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_report(index: int, content_bytes: int = 1500, seed: int = 0) -> Dict[str, Any]:
+    """Return a report shaped like the ones the app saves, with about ``content_bytes`` of Markdown"""
+    rng = random.Random(seed * 1_000_003 + index)
+    template = TEMPLATES[index % len(TEMPLATES)]
+    day = START_DATE + timedelta(days=index // 20)
+    lines = [f"# {template.capitalize()} Report - {day.isoformat()}", "", "## Summary", _sentence(rng, 25)]
+    size = sum(len(line) + 1 for line in lines)
+    while size < content_bytes:
+        line = f"- {_sentence(rng, rng.randint(6, 16))}"
+        lines.append(line)
+        size += len(line) + 1
+    return {
+        'id': report_id(index),
+        'title': f"{template.capitalize()} Report - {day.isoformat()}",
+        'content': '\n'.join(lines),
+        'template': template,
+        'date': day.isoformat(),
+        'priority': PRIORITIES[rng.randrange(len(PRIORITIES))],
+        'created_at': (datetime(2020, 1, 1) + timedelta(minutes=index * 72)).isoformat(),
+        'metadata': {'model': 'gemini-pro', 'max_tokens': 2048, 'temperature': 0.7},
+    }
+
+
+def iter_reports(count: int, content_bytes: int = 1500, seed: int = 0, start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield ``count`` synthetic reports"""
+    for index in range(start, start + count):
+        yield make_report(index, content_bytes, seed)
+
+
+def write_json_history(path: Path, count: int, content_bytes: int = 1500, seed: int = 0) -> None:
+    """Write a JSON history file without holding it in memory"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for index, report in enumerate(iter_reports(count, content_bytes, seed)):
+            f.write(',\n' if index else '\n')
+            f.write(json.dumps(report, indent=2))
+        f.write('\n]')
+
+
+def write_csv(path: Path, size_bytes: int, seed: int = 0) -> int:
+    """Write a sales-like CSV of about ``size_bytes``; returns the number of rows"""
+    rng = random.Random(seed)
+    rows = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['order_id', 'date', 'region', 'product', 'quantity', 'unit_price', 'notes'])
+        while f.tell() < size_bytes:
+            for _ in range(1000):
+                writer.writerow([
+                    rows,
+                    (START_DATE + timedelta(days=rows % 1500)).isoformat(),
+                    rng.choice(('north', 'south', 'east', 'west')),
+                    rng.choice(WORDS),
+                    rng.randint(1, 500),
+                    round(rng.uniform(1, 900), 2),
+                    _sentence(rng, rng.randint(3, 10)),
+                ])
+                rows += 1
+    return rows
+
+
+def write_xlsx(path: Path, rows: int, sheets: int = 2, seed: int = 0) -> None:
+    """Write a workbook with ``rows`` rows spread over ``sheets`` sheets"""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    per_sheet = max(1, rows // sheets)
+    for sheet_number in range(sheets):
+        sheet = workbook.create_sheet(f"Sheet{sheet_number + 1}")
+        sheet.append(['order_id', 'date', 'region', 'product', 'quantity', 'unit_price', 'notes'])
+        for row in range(per_sheet):
+            sheet.append([
+                row,
+                (START_DATE + timedelta(days=row % 1500)).isoformat(),
+                rng.choice(('north', 'south', 'east', 'west')),
+                rng.choice(WORDS),
+                rng.randint(1, 500),
+                round(rng.uniform(1, 900), 2),
+                _sentence(rng, rng.randint(3, 10)),
+            ])
+    workbook.save(path)
+
+
+def write_pdf(path: Path, pages: int, lines_per_page: int = 45, seed: int = 0) -> None:
+    """Write a text-only PDF, streaming the objects to disk"""
+    rng = random.Random(seed)
+    # Objects 1-3 are the catalog, the page tree and the font; each page
+    # adds a content stream and a page object
+    page_ids = [4 + 2 * i + 1 for i in range(pages)]
+    offsets = []
+    with open(path, 'wb') as out:
+        def write_object(number: int, body: bytes) -> None:
+            offsets.append((number, out.tell()))
+            out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+
+        out.write(b"%PDF-1.4\n")
+        write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        write_object(2, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages))
+        write_object(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        for page in range(pages):
+            text = [b"BT /F1 10 Tf 50 760 Td 12 TL"]
+            text.append(b"(Page %d) Tj T*" % (page + 1))
+            for _ in range(lines_per_page):
+                line = _sentence(rng, rng.randint(6, 14)).encode('latin-1')
+                text.append(b"(%s) Tj T*" % line)
+            text.append(b"ET")
+            stream = b"\n".join(text)
+            content_id = 4 + 2 * page
+            write_object(content_id, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+            write_object(
+                content_id + 1,
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+            )
+        xref = out.tell()
+        count = len(offsets) + 1
+        out.write(b"xref\n0 %d\n0000000000 65535 f \n" % count)
+        for _, offset in sorted(offsets):
+            out.write(b"%010d 00000 n \n" % offset)
+        out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, xref))
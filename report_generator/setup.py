@@ -16,7 +16,7 @@ setup(
     package_dir={"": "src"},
     python_requires=">=3.10",
     install_requires=[
-        "streamlit>=1.32.0",
+        "streamlit>=1.37.0",
         "google-generativeai>=0.3.2",
         "python-dotenv>=1.0.1",
         "python-dateutil>=2.9.0",
@@ -27,6 +27,11 @@ setup(
         "requests>=2.31.0",
     ],
     extras_require={
+        "api": [
+            "starlette>=0.37.0",
+            "uvicorn>=0.29.0",
+            "python-multipart>=0.0.9",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=23.0.0",
@@ -38,6 +43,8 @@ setup(
     entry_points={
         "console_scripts": [
             "report-generator=report_generator.app:main",
+            "report-generator-batch=report_generator.cli:main",
+            "report-generator-api=report_generator.api_server:main",
         ],
     },
     classifiers=[
@@ -7,10 +7,31 @@ using Google's Gemini API.
 
 __version__ = '0.1.0'
 __author__ = 'Your Name <your.email@example.com>'
-__all__ = ['app', 'config', 'gemini_utils', 'report_utils', 'file_utils']
+__all__ = ['app', 'config', 'gemini_utils', 'report_utils', 'report_journal',
+           'report_sqlite', 'sqlite_utils', 'report_search', 'report_bodies',
+           'storage_utils', 'response_cache', 'batch_generation',
+           'chunked_summary', 'upload_store', 'pdf_extraction',
+           'extractors', 'table_extraction', 'docx_extraction', 'batch_extraction',
+           'file_utils', 'job_queue', 'model_backends', 'services', 'cli', 'api_server',
+           'instrumentation', 'logging_utils']
 
-# Import main components
+# Import main components. Everything except the configuration is loaded on
+# first access so importing the package does not pull in pandas, python-docx
+# or the Gemini SDK.
 from .config import *
-from .gemini_utils import GeminiReportGenerator
-from .report_utils import ReportManager
-from .file_utils import FileProcessor
+
+_LAZY_ATTRIBUTES = {
+    'GeminiReportGenerator': 'gemini_utils',
+    'ReportManager': 'report_utils',
+    'FileProcessor': 'file_utils',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,705 @@
+"""
+HTTP API for generating reports and reading the report history.
+
+Endpoints (JSON unless noted):
+
+- ``POST /reports``: queue a report from JSON ``{"content": ...}`` or a
+  multipart form with files; returns 202 and the job's status URL
+- ``POST /reports/stream``: generate a report on the request and stream it
+  as newline-delimited JSON; the report is saved when the stream ends
+- ``GET /jobs/{id}`` (``?wait=seconds`` to long-poll), ``DELETE /jobs/{id}``
+- ``GET /reports``, ``GET /reports/search?q=...``, ``GET /reports/{id}``
+- ``GET /health``, ``GET /metrics`` (Prometheus text format)
+
+Requests beyond the configured concurrency, generations beyond the
+generation limit and jobs beyond the queue depth limit are answered with
+429 and a Retry-After header instead of piling up.
+
+Usage:
+    python -m src.report_generator.api_server [--host 127.0.0.1] [--port 8600]
+"""
+import argparse
+import asyncio
+import io
+import json
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Sequence
+import logging
+
+from .logging_utils import configure_logging, log_context
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES = ('default', 'operations', 'development', 'meetings')
+PRIORITIES = ('Low', 'Medium', 'High')
+
+# Longest a GET /jobs/{id}?wait=... request is held open
+MAX_LONG_POLL_SECONDS = 30.0
+
+
+class Upload(io.BytesIO):
+    """An uploaded file in the shape FileProcessor.extract_uploads expects"""
+
+    def __init__(self, name: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+
+
+class ConcurrencyLimiter:
+    """Counts work in flight and refuses more than a limit instead of queueing it"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free"""
+        with self._lock:
+            if self.in_flight >= self.limit:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {'limit': self.limit, 'in_flight': self.in_flight, 'rejected': self.rejected}
+
+
+class RequestLimitMiddleware:
+    """
+    ASGI middleware answering 429 when too many requests are in flight.
+
+    A streamed response holds its slot until the stream ends. Paths in
+    ``exempt`` (health checks, metrics) are always served.
+    """
+
+    def __init__(self, app: Any, limiter: ConcurrencyLimiter, exempt: Sequence[str] = ('/health', '/metrics')):
+        self.app = app
+        self.limiter = limiter
+        self.exempt = set(exempt)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] != 'http' or scope['path'] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+        if not self.limiter.try_acquire():
+            await too_busy('The server is busy')(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+
+class BodyTooLarge(Exception):
+    """Raised while receiving a request body that exceeds the size limit"""
+
+
+class BodyLimitMiddleware:
+    """
+    ASGI middleware answering 413 when a request body exceeds ``max_bytes``.
+
+    The Content-Length header is checked up front; chunked bodies, which
+    have none, are counted as the application receives them.
+    """
+
+    def __init__(self, app: Any, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        length = dict(scope.get('headers') or []).get(b'content-length')
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await self.too_large()(scope, receive, send)
+            return
+
+        received = 0
+        started = False
+
+        async def receive_limited() -> Dict[str, Any]:
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_bytes:
+                    raise BodyTooLarge()
+            return message
+
+        async def send_tracking(message: Dict[str, Any]) -> None:
+            nonlocal started
+            started = started or message['type'] == 'http.response.start'
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_tracking)
+        except BodyTooLarge:
+            if started:
+                raise
+            await self.too_large()(scope, receive, send)
+
+    def too_large(self):
+        from starlette.responses import JSONResponse
+
+        return JSONResponse({'error': f"Request body is larger than {self.max_bytes} bytes"}, status_code=413)
+
+
+class ReleasingResponse:
+    """
+    ASGI app sending a response, then releasing a limiter slot.
+
+    The slot is released just before the last body message, so a client that
+    has read the whole response sees it free, and otherwise however sending
+    ends, including when the client disconnects before a streamed body has
+    started.
+    """
+
+    def __init__(self, response: Any, limiter: ConcurrencyLimiter):
+        self.response = response
+        self.limiter = limiter
+        self._released = False
+
+    def _release(self) -> None:
+        if not self._released:
+            self._released = True
+            self.limiter.release()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        async def send_releasing(message: Dict[str, Any]) -> None:
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                self._release()
+            await send(message)
+
+        try:
+            await self.response(scope, receive, send_releasing)
+        finally:
+            self._release()
+
+
+class RequestLogMiddleware:
+    """
+    ASGI middleware giving each request an ID and logging it with its duration.
+
+    The ID is taken from the X-Request-ID header (or generated), returned in
+    the response and added to every record logged while serving it.
+    """
+
+    def __init__(self, app: Any, quiet: Sequence[str] = ('/health', '/metrics')):
+        self.app = app
+        self.quiet = set(quiet)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get('headers') or [])
+        request_id = headers.get(b'x-request-id', b'').decode('latin-1')[:64] or uuid.uuid4().hex[:16]
+        status = {'code': 500}
+
+        async def send_with_id(message: Dict[str, Any]) -> None:
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                message['headers'] = list(message.get('headers', [])) + [(b'x-request-id', request_id.encode('latin-1'))]
+            await send(message)
+
+        start = time.monotonic()
+        with log_context(request_id=request_id):
+            try:
+                await self.app(scope, receive, send_with_id)
+            finally:
+                if scope['path'] not in self.quiet or status['code'] >= 400:
+                    elapsed = time.monotonic() - start
+                    logger.info(
+                        f"{scope['method']} {scope['path']} {status['code']} {elapsed * 1000:.0f}ms",
+                        extra={
+                            'method': scope['method'],
+                            'path': scope['path'],
+                            'status': status['code'],
+                            'duration_ms': round(elapsed * 1000, 1),
+                        }
+                    )
+
+
+class ApiError(Exception):
+    """An error answered with its HTTP status and message"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def too_busy(message: str, retry_after: int = 1):
+    """Return a 429 response asking the client to retry later"""
+    from starlette.responses import JSONResponse
+
+    return JSONResponse({'error': message}, status_code=429, headers={'Retry-After': str(retry_after)})
+
+
+def _parse_count(params: Any, name: str, default: int, maximum: Optional[int] = None) -> int:
+    """Read a non-negative integer query parameter, capped at ``maximum``"""
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+    if value < 0:
+        raise ApiError(400, f"'{name}' must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+
+def _parse_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def new_report(fields: Dict[str, Any], model_name: Optional[str], max_tokens: int, temperature: float) -> Dict[str, Any]:
+    """Return a report without content for validated request fields"""
+    return {
+        'id': f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}",
+        'title': f"{fields['template'].capitalize()} Report - {fields['date']}",
+        'content': '',
+        'template': fields['template'],
+        'date': fields['date'],
+        'priority': fields['priority'],
+        'created_at': datetime.now().isoformat(),
+        'metadata': {
+            'model': model_name,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'source': 'api',
+        }
+    }
+
+
+def create_app(
+    generator: Any,
+    report_manager: Any,
+    file_processor: Any,
+    job_queue: Any = None,
+    summarizer: Any = None,
+    max_requests: int = 64,
+    max_generations: int = 4,
+    max_queue_depth: int = 100,
+    max_upload_bytes: int = 64 * 1024 * 1024,
+    workers: int = 2,
+    max_per_user: int = 1,
+    max_tokens: int = 2048,
+    temperature: float = 0.7,
+    model_name: Optional[str] = None
+):
+    """
+    Build the ASGI application
+
+    Args:
+        generator: GeminiReportGenerator (or anything with the same methods)
+        report_manager: ReportManager for saving and reading reports
+        file_processor: FileProcessor for uploaded files
+        job_queue: JobQueue for POST /reports (None generates on the request)
+        summarizer: ChunkedSummarizer for inputs too large for one prompt
+        max_requests: Requests in flight before new ones get 429
+        max_generations: Reports generated on requests at once
+        max_queue_depth: Queued jobs before submissions get 429
+        max_upload_bytes: Largest request body accepted (larger ones get 413)
+        workers: Job workers started with the app (0 to leave jobs to
+            other processes sharing the queue)
+        max_per_user: Jobs one user may have running at once
+        max_tokens: Maximum number of tokens to generate per report
+        temperature: Controls randomness (0.0 to 1.0)
+        model_name: Model recorded in the report metadata
+
+    Returns:
+        A Starlette application
+    """
+    from contextlib import asynccontextmanager
+
+    from starlette.applications import Starlette
+    from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+    from starlette.requests import Request
+    from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    from starlette.routing import Route
+
+    from .batch_extraction import merge_extractions
+    from .instrumentation import default_recorder
+    from .job_queue import JobWorkerPool, QueueFullError, QUEUED, DONE, report_job_handler
+    from .report_utils import SUMMARY_FIELDS
+
+    request_limiter = ConcurrencyLimiter(max_requests)
+    generation_limiter = ConcurrencyLimiter(max_generations)
+    model_name = model_name or getattr(generator, 'model_name', None)
+
+    def error(status_code: int, message: str) -> JSONResponse:
+        return JSONResponse({'error': message}, status_code=status_code)
+
+    async def read_input(request: Request) -> Dict[str, Any]:
+        """Validate a report request from a JSON body or a multipart form"""
+        content_type = request.headers.get('content-type', '')
+        files: List[Upload] = []
+        if content_type.startswith('multipart/form-data'):
+            form = await request.form()
+            fields = {key: value for key, value in form.items() if isinstance(value, str)}
+            for _, value in form.multi_items():
+                if not isinstance(value, str):
+                    files.append(Upload(value.filename or 'upload.txt', await value.read()))
+            await form.close()
+        else:
+            try:
+                fields = await request.json()
+            except ValueError:
+                raise ApiError(400, "Send a JSON object or a multipart form")
+            if not isinstance(fields, dict):
+                raise ApiError(400, "Send a JSON object or a multipart form")
+
+        content = str(fields.get('content') or '')
+        if files:
+            results = await run_in_threadpool(
+                file_processor.extract_uploads, files, max_workers=min(len(files), 4)
+            )
+            if not any(result.ok for result in results):
+                raise ApiError(422, "; ".join(f"{r.name}: {r.error}" for r in results))
+            text = merge_extractions(results) if len(results) > 1 else results[0].text
+            content = f"{content}\n\n{text}" if content.strip() else text
+        if not content.strip():
+            raise ApiError(400, "Provide 'content' or at least one file")
+
+        template = str(fields.get('template') or 'default').lower()
+        if template not in TEMPLATES:
+            raise ApiError(400, f"Unknown template '{template}'. Choose one of: {', '.join(TEMPLATES)}")
+        priority = str(fields.get('priority') or 'Medium').capitalize()
+        if priority not in PRIORITIES:
+            raise ApiError(400, f"Unknown priority '{priority}'. Choose one of: {', '.join(PRIORITIES)}")
+        report_date = str(fields.get('date') or date.today().isoformat())
+        try:
+            date.fromisoformat(report_date)
+        except ValueError:
+            raise ApiError(400, f"Invalid date '{report_date}'; use YYYY-MM-DD")
+        return {
+            'content': content,
+            'template': template,
+            'priority': priority,
+            'date': report_date,
+            'use_cache': _parse_bool(fields.get('use_cache', True)),
+        }
+
+    def generate_and_save(report: Dict[str, Any], fields: Dict[str, Any]) -> str:
+        content = fields['content']
+        if summarizer is not None and summarizer.needs_chunking(content):
+            content = summarizer.condense(content, use_cache=fields['use_cache'])
+        report['content'] = generator.generate_report(
+            content=content,
+            template=fields['template'],
+            max_tokens=max_tokens,
+            temperature=temperature,
+            use_cache=fields['use_cache']
+        )
+        return report_manager.save_report(report)
+
+    def user_of(request: Request) -> str:
+        return request.headers.get('x-user') or (request.client.host if request.client else 'anonymous')
+
+    def job_view(job: Any) -> Dict[str, Any]:
+        view = {
+            'id': job.id,
+            'status': job.status,
+            'attempts': job.attempts,
+            'created_at': job.created_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at,
+            'error': job.error,
+        }
+        if job.status == QUEUED:
+            view['position'] = job_queue.position(job.id)
+        if job.status == DONE and job.result:
+            view['report_id'] = job.result.get('report_id')
+            view['report_url'] = f"/reports/{view['report_id']}"
+        return view
+
+    async def health(request: Request) -> JSONResponse:
+        body = {
+            'status': 'ok',
+            'requests': request_limiter.stats(),
+            'generations': generation_limiter.stats(),
+            'gemini': getattr(generator, 'health', None),
+        }
+        if job_queue is not None:
+            body['queue'] = await run_in_threadpool(job_queue.stats)
+        return JSONResponse(body)
+
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            default_recorder.prometheus_text(),
+            media_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+    async def submit_report(request: Request) -> JSONResponse:
+        try:
+            fields = await read_input(request)
+        except ApiError as e:
+            return error(e.status_code, str(e))
+        report = new_report(fields, model_name, max_tokens, temperature)
+
+        if job_queue is None:
+            # No queue: generate on the request, within the generation limit
+            if not generation_limiter.try_acquire():
+                return too_busy('Too many reports are being generated')
+            try:
+                with log_context(report_id=report['id']):
+                    report_id = await run_in_threadpool(generate_and_save, report, fields)
+            except Exception as e:
+                logger.error(f"Error generating report: {str(e)}", extra={'report_id': report['id']})
+                return error(502, f"Report generation failed: {str(e)}")
+            finally:
+                generation_limiter.release()
+            saved = await run_in_threadpool(report_manager.get_report, report_id)
+            return JSONResponse(saved, status_code=201, headers={'Location': f"/reports/{report_id}"})
+
+        if await run_in_threadpool(job_queue.depth) >= max_queue_depth:
+            return too_busy('The generation queue is full', retry_after=5)
+        try:
+            job_id = await run_in_threadpool(
+                job_queue.enqueue,
+                user_of(request),
+                {'report': report, 'content': fields['content'], 'use_cache': fields['use_cache']}
+            )
+        except QueueFullError as e:
+            return too_busy(str(e), retry_after=5)
+        logger.info("Queued report", extra={'report_id': report['id'], 'job_id': job_id})
+        return JSONResponse(
+            {'job_id': job_id, 'status': QUEUED, 'status_url': f"/jobs/{job_id}", 'report_id': report['id']},
+            status_code=202,
+            headers={'Location': f"/jobs/{job_id}"}
+        )
+
+    async def stream_report(request: Request):
+        try:
+            fields = await read_input(request)
+        except ApiError as e:
+            return error(e.status_code, str(e))
+        if not generation_limiter.try_acquire():
+            return too_busy('Too many reports are being generated')
+        report = new_report(fields, model_name, max_tokens, temperature)
+
+        def line(event: Dict[str, Any]) -> bytes:
+            return (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+
+        async def events():
+            with log_context(report_id=report['id']):
+                try:
+                    yield line({'report_id': report['id'], 'status': 'generating'})
+                    content = fields['content']
+                    if summarizer is not None and summarizer.needs_chunking(content):
+                        yield line({'status': 'summarizing'})
+                        content = await run_in_threadpool(
+                            summarizer.condense, content, use_cache=fields['use_cache']
+                        )
+                    chunks = []
+                    stream = generator.generate_report_stream(
+                        content=content,
+                        template=fields['template'],
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        use_cache=fields['use_cache']
+                    )
+                    async for chunk in iterate_in_threadpool(stream):
+                        chunks.append(chunk)
+                        yield line({'text': chunk})
+                    report['content'] = ''.join(chunks)
+                    report_id = await run_in_threadpool(report_manager.save_report, report)
+                    yield line({'status': 'done', 'report_id': report_id, 'report_url': f"/reports/{report_id}"})
+                except Exception as e:
+                    logger.error(f"Error streaming report: {str(e)}")
+                    yield line({'status': 'failed', 'error': str(e)})
+
+        return ReleasingResponse(StreamingResponse(events(), media_type='application/x-ndjson'), generation_limiter)
+
+    async def get_job(request: Request) -> JSONResponse:
+        if job_queue is None:
+            return error(404, "Jobs are not enabled")
+        job_id = request.path_params['job_id']
+        try:
+            wait = min(float(request.query_params.get('wait', 0)), MAX_LONG_POLL_SECONDS)
+        except ValueError:
+            return error(400, "'wait' must be a number of seconds")
+        deadline = time.monotonic() + wait
+        while True:
+            job = await run_in_threadpool(job_queue.get, job_id)
+            if job is None:
+                return error(404, f"No job {job_id}")
+            if job.finished or time.monotonic() >= deadline:
+                return JSONResponse(job_view(job))
+            await asyncio.sleep(min(0.25, max(0.0, deadline - time.monotonic())))
+
+    async def cancel_job(request: Request) -> JSONResponse:
+        if job_queue is None:
+            return error(404, "Jobs are not enabled")
+        job_id = request.path_params['job_id']
+        if await run_in_threadpool(job_queue.cancel, job_id):
+            return JSONResponse({'id': job_id, 'status': 'cancelled'})
+        job = await run_in_threadpool(job_queue.get, job_id)
+        if job is None:
+            return error(404, f"No job {job_id}")
+        return error(409, f"Job {job_id} is already {job.status}")
+
+    async def list_reports(request: Request) -> JSONResponse:
+        params = request.query_params
+        try:
+            limit = _parse_count(params, 'limit', 10, maximum=100)
+            offset = _parse_count(params, 'offset', 0)
+        except ApiError as e:
+            return error(e.status_code, str(e))
+        sort_by = params.get('sort_by', 'created_at')
+        if sort_by not in SUMMARY_FIELDS:
+            return error(400, f"Cannot sort by '{sort_by}'. Choose one of: {', '.join(SUMMARY_FIELDS)}")
+        reports = await run_in_threadpool(
+            report_manager.list_reports,
+            limit=limit,
+            offset=offset,
+            sort_by=sort_by,
+            descending=params.get('order', 'desc') != 'asc',
+            template=params.get('template'),
+            priority=params.get('priority'),
+            date_from=params.get('date_from'),
+            date_to=params.get('date_to')
+        )
+        total = await run_in_threadpool(report_manager.get_report_count)
+        return JSONResponse({'reports': reports, 'total': total, 'limit': limit, 'offset': offset})
+
+    async def search_reports(request: Request) -> JSONResponse:
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return error(400, "Provide a search query with ?q=")
+        if not report_manager.search_enabled:
+            return error(404, "Search is not enabled")
+        try:
+            limit = _parse_count(request.query_params, 'limit', 10, maximum=100)
+        except ApiError as e:
+            return error(e.status_code, str(e))
+        reports = await run_in_threadpool(
+            report_manager.search_reports,
+            query,
+            limit=limit,
+            template=request.query_params.get('template'),
+            date_from=request.query_params.get('date_from'),
+            date_to=request.query_params.get('date_to')
+        )
+        return JSONResponse({'reports': reports})
+
+    async def get_report(request: Request) -> JSONResponse:
+        report_id = request.path_params['report_id']
+        report = await run_in_threadpool(report_manager.get_report, report_id)
+        if report is None:
+            return error(404, f"No report {report_id}")
+        return JSONResponse(report)
+
+    @asynccontextmanager
+    async def lifespan(app: Any):
+        pool = None
+        if job_queue is not None and workers > 0:
+            handler = report_job_handler(generator, report_manager, summarizer, max_tokens, temperature)
+            pool = JobWorkerPool(job_queue, {'report': handler}, workers=workers, max_per_user=max_per_user).start()
+        try:
+            yield
+        finally:
+            if pool is not None:
+                await run_in_threadpool(pool.stop)
+
+    app = Starlette(
+        routes=[
+            Route('/health', health, methods=['GET']),
+            Route('/metrics', metrics, methods=['GET']),
+            Route('/reports', submit_report, methods=['POST']),
+            Route('/reports', list_reports, methods=['GET']),
+            Route('/reports/stream', stream_report, methods=['POST']),
+            Route('/reports/search', search_reports, methods=['GET']),
+            Route('/reports/{report_id}', get_report, methods=['GET']),
+            Route('/jobs/{job_id}', get_job, methods=['GET']),
+            Route('/jobs/{job_id}', cancel_job, methods=['DELETE']),
+        ],
+        lifespan=lifespan
+    )
+    app.add_middleware(BodyLimitMiddleware, max_bytes=max_upload_bytes)
+    app.add_middleware(RequestLimitMiddleware, limiter=request_limiter)
+    # Added last so it is the outermost: refused requests are logged too
+    app.add_middleware(RequestLogMiddleware)
+    app.state.request_limiter = request_limiter
+    app.state.generation_limiter = generation_limiter
+    default_recorder.register_gauge(
+        'api_requests_in_flight', 'HTTP API requests being served', lambda: request_limiter.stats()['in_flight']
+    )
+    default_recorder.register_gauge(
+        'api_requests_rejected', 'HTTP API requests answered with 429', lambda: request_limiter.stats()['rejected']
+    )
+    if job_queue is not None:
+        default_recorder.register_gauge('jobs', 'Jobs per status', lambda: job_queue.stats()['counts'])
+    return app
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the API server until interrupted"""
+    from .config import (
+        API_HOST, API_PORT, API_MAX_REQUESTS, API_MAX_GENERATIONS, API_MAX_QUEUE_DEPTH,
+        API_MAX_UPLOAD_BYTES, API_KEEP_ALIVE_SECONDS, GEMINI_API_KEY, GEMINI_MODEL,
+        GEMINI_MAX_TOKENS, GEMINI_TEMPERATURE, MODEL_BACKEND, JOB_QUEUE_ENABLED, JOB_WORKERS, JOB_MAX_PER_USER
+    )
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n\n')[0])
+    parser.add_argument('--host', default=API_HOST, help='interface to listen on (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=API_PORT, help='port to listen on (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=JOB_WORKERS,
+                        help='background job workers in this process (default: %(default)s)')
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    try:
+        import uvicorn
+    except ImportError as e:
+        print(f"Error: {e}")
+        print("The API server needs Starlette and uvicorn: pip install starlette uvicorn python-multipart")
+        return 1
+    if not GEMINI_API_KEY and MODEL_BACKEND == 'gemini':
+        print("Error: set GEMINI_API_KEY to generate reports", file=sys.stderr)
+        return 2
+
+    from .services import (
+        build_generator, build_summarizer, build_report_manager, build_upload_store,
+        build_file_processor, build_job_queue
+    )
+
+    generator = build_generator(GEMINI_API_KEY)
+    report_manager = build_report_manager()
+    app = create_app(
+        generator,
+        report_manager,
+        build_file_processor(store=build_upload_store()),
+        job_queue=build_job_queue() if JOB_QUEUE_ENABLED else None,
+        summarizer=build_summarizer(generator),
+        max_requests=API_MAX_REQUESTS,
+        max_generations=API_MAX_GENERATIONS,
+        max_queue_depth=API_MAX_QUEUE_DEPTH,
+        max_upload_bytes=API_MAX_UPLOAD_BYTES,
+        workers=args.workers,
+        max_per_user=JOB_MAX_PER_USER,
+        max_tokens=GEMINI_MAX_TOKENS,
+        temperature=GEMINI_TEMPERATURE,
+        model_name=GEMINI_MODEL
+    )
+    try:
+        uvicorn.run(app, host=args.host, port=args.port, timeout_keep_alive=API_KEEP_ALIVE_SECONDS)
+    finally:
+        report_manager.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,27 +5,33 @@ from datetime import datetime, date
 from pathlib import Path
 import logging
 import json
-from typing import Dict, Any, Optional, List
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Iterator, NamedTuple
 
 # Local imports
 from .config import (
-    BASE_DIR, DATA_DIR, LOG_DIR, TEMPLATES_DIR,
+    BASE_DIR, DATA_DIR, TEMPLATES_DIR,
     GEMINI_API_KEY, GEMINI_MODEL, GEMINI_TEMPERATURE, GEMINI_MAX_TOKENS,
-    DEFAULT_REPORT_TEMPLATE, REPORT_HISTORY_FILE, THEMES
+    DEFAULT_REPORT_TEMPLATE, THEMES,
+    RESPONSE_CACHE_ENABLED, GEMINI_BATCH_CONCURRENCY, GEMINI_HEALTH_CHECK,
+    UPLOAD_BATCH_CONCURRENCY, JOB_QUEUE_ENABLED, JOB_WORKERS, JOB_MAX_PER_USER,
+    JOB_RETENTION_DAYS, METRICS_HOST, METRICS_PORT, PROFILE_SLOW_RERUN_MS, PROFILE_DIR,
+    DEBUG_PANEL, MODEL_BACKEND
 )
-from .gemini_utils import GeminiReportGenerator
-from .report_utils import ReportManager
 from .file_utils import FileProcessor
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(LOG_DIR / 'app.log'),
-        logging.StreamHandler()
-    ]
+from .batch_extraction import merge_extractions
+from .job_queue import JobWorkerPool, QueueFullError, QUEUED, RUNNING, DONE, report_job_handler
+from .instrumentation import default_recorder, span, SlowRunProfiler, start_metrics_server
+from .logging_utils import configure_logging, dropped_records, log_context
+from .services import (
+    build_generator, build_summarizer, build_report_manager, build_upload_store,
+    build_file_processor, build_job_queue
 )
+
+# Configure logging; records are written by a background thread
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
@@ -39,13 +45,131 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize report manager and file processor
-report_manager = ReportManager(REPORT_HISTORY_FILE)
-file_processor = FileProcessor()
+class AppServices(NamedTuple):
+    """Services shared by every session and rerun of this server"""
+    report_manager: Any
+    upload_store: Any
+    file_processor: Any
+    job_queue: Any
+    metrics_server: Any
+
+class ModelServices(NamedTuple):
+    """The generator and summarizer for one API key"""
+    gemini_client: Any
+    summarizer: Any
+
+# Jobs are generated with the server's own key (or the fake backend); without
+# one, each session generates its reports with the key it was given
+JOBS_ENABLED = JOB_QUEUE_ENABLED and (bool(GEMINI_API_KEY) or MODEL_BACKEND == 'fake')
+
+def start_metrics(job_queue):
+    """Serve the span timings and service gauges"""
+    if JOBS_ENABLED:
+        default_recorder.register_gauge('jobs', 'Jobs per status', lambda: job_queue.stats()['counts'])
+    default_recorder.register_gauge('log_records_dropped', 'Log records dropped on a full log queue', dropped_records)
+    return start_metrics_server(METRICS_PORT, METRICS_HOST)
+
+@st.cache_resource
+def get_services() -> AppServices:
+    """
+    Build the services that do not depend on the API key, once per server
 
-# Initialize Gemini API client
-gemini_client = GeminiReportGenerator(GEMINI_API_KEY)
-GEMINI_AVAILABLE = True
+    Streamlit re-executes this module on every rerun, so anything built at
+    module level would be rebuilt (with its threads and connections) each
+    time.
+    """
+    report_manager = build_report_manager()
+    upload_store = build_upload_store()
+    threading.Thread(target=upload_store.collect_garbage, name='upload-store-gc', daemon=True).start()
+    file_processor = build_file_processor(store=upload_store)
+
+    # Background report generation; the queue lives on disk so jobs outlive
+    # browser sessions and server restarts
+    job_queue = build_job_queue()
+    if JOB_QUEUE_ENABLED and not JOBS_ENABLED:
+        logger.warning("Job queue disabled: it needs GEMINI_API_KEY (or MODEL_BACKEND=fake) on the server")
+    metrics_server = start_metrics(job_queue) if METRICS_PORT else None
+    return AppServices(report_manager, upload_store, file_processor, job_queue, metrics_server)
+
+@st.cache_resource
+def get_model_services(api_key: Optional[str]) -> ModelServices:
+    """
+    Build the generator for an API key, once per key
+
+    Sessions using the server's key share a generator; a key entered in the
+    UI only reaches the sessions that entered it.
+    """
+    # The Gemini client connects on first use
+    gemini_client = build_generator(api_key)
+    if GEMINI_HEALTH_CHECK:
+        gemini_client.check_health(background=True)
+    if api_key == GEMINI_API_KEY:
+        default_recorder.register_gauge(
+            'response_cache', 'Response cache counters',
+            lambda: {key: value for key, value in gemini_client.cache_stats().items()
+                     if isinstance(value, (int, float)) and not isinstance(value, bool)}
+        )
+    return ModelServices(gemini_client, build_summarizer(gemini_client, max_workers=GEMINI_BATCH_CONCURRENCY))
+
+@st.cache_resource
+def start_job_workers() -> JobWorkerPool:
+    """Start this server's job workers once, on the server's key and the UI's ReportManager"""
+    removed = job_queue.purge(JOB_RETENTION_DAYS * 24 * 60 * 60)
+    if removed:
+        logger.info(f"Removed {removed} finished jobs")
+    model = get_model_services(GEMINI_API_KEY)
+    handler = report_job_handler(
+        model.gemini_client, report_manager, model.summarizer,
+        max_tokens=GEMINI_MAX_TOKENS, temperature=GEMINI_TEMPERATURE
+    )
+    return JobWorkerPool(
+        job_queue,
+        {'report': handler},
+        workers=JOB_WORKERS,
+        max_per_user=JOB_MAX_PER_USER
+    ).start()
+
+def session_api_key() -> Optional[str]:
+    """
+    Return the API key for this session: the server's, or one the user enters
+
+    Asked for outside the cached builders, so a missing key stops only this
+    rerun and is kept in this session's state.
+    """
+    if GEMINI_API_KEY or MODEL_BACKEND == 'fake':
+        return GEMINI_API_KEY
+    st.warning("Gemini API key not found in environment variables.")
+    api_key = st.text_input("Please enter your Gemini API key:", type="password", key="gemini_api_key")
+    if not api_key:
+        st.stop()
+    return api_key
+
+services = get_services()
+report_manager = services.report_manager
+file_processor = services.file_processor
+job_queue = services.job_queue
+
+if JOBS_ENABLED:
+    start_job_workers()
+
+model_services = get_model_services(session_api_key())
+gemini_client = model_services.gemini_client
+summarizer = model_services.summarizer
+
+# Reruns slower than PROFILE_SLOW_RERUN_MS leave a stack profile in PROFILE_DIR
+rerun_profiler = SlowRunProfiler(PROFILE_DIR, threshold=PROFILE_SLOW_RERUN_MS / 1000) if PROFILE_SLOW_RERUN_MS else None
+
+def current_user() -> str:
+    """
+    Return the ID the current browser's jobs are queued under
+    
+    It is kept in the page URL so it survives a refresh.
+    """
+    user = st.query_params.get('user')
+    if not user:
+        user = uuid.uuid4().hex[:12]
+        st.query_params['user'] = user
+    return user
 
 def init_session_state():
     """Initialize session state variables"""
@@ -92,17 +216,42 @@ def render_sidebar() -> Dict[str, Any]:
         
         # File upload
         st.subheader("Import Content")
-        uploaded_file = st.file_uploader(
-            "Upload a file",
-            type=['txt', 'md', 'docx', 'pdf', 'csv', 'xlsx'],
+        uploaded_files = st.file_uploader(
+            "Upload files",
+            type=[suffix.lstrip('.') for suffix in FileProcessor.SUPPORTED_EXTENSIONS],
+            accept_multiple_files=True,
             key="file_uploader"
         )
         
         # Display file info if uploaded
-        if uploaded_file is not None:
+        for uploaded_file in uploaded_files or []:
             file_details = {"FileName": uploaded_file.name, "FileType": uploaded_file.type}
             st.write(file_details)
         
+        # Response cache
+        st.subheader("Generation")
+        if gemini_client.health and not gemini_client.health['ok']:
+            st.warning(f"Gemini API check failed: {gemini_client.health['error']}")
+        use_cache = st.checkbox(
+            "Reuse cached responses",
+            value=RESPONSE_CACHE_ENABLED,
+            disabled=not RESPONSE_CACHE_ENABLED,
+            help="Return the previous result for identical content and settings",
+            key="use_response_cache"
+        )
+        cache_stats = gemini_client.cache_stats()
+        if cache_stats.get('enabled'):
+            st.caption(
+                f"Cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, "
+                f"{cache_stats['misses']} misses"
+            )
+        if JOBS_ENABLED:
+            queue_stats = job_queue.stats()
+            st.caption(
+                f"Queue: {queue_stats['depth']} waiting, {queue_stats['running']} running"
+                + (f", average wait {queue_stats['avg_wait']:.0f}s" if queue_stats['recent_done'] else "")
+            )
+        
         # Add a divider
         st.markdown("---")
         
@@ -120,20 +269,51 @@ def render_sidebar() -> Dict[str, Any]:
         
         return {
             'template': template,
-            'uploaded_file': uploaded_file
+            'uploaded_files': uploaded_files or [],
+            'use_cache': use_cache
         }
 
-def render_report_form(template: str, uploaded_file: Any = None) -> Dict[str, Any]:
+def render_report_form(template: str, uploaded_files: Optional[List[Any]] = None, use_cache: bool = True) -> Dict[str, Any]:
     """Render the report form and return form data"""
     form_data = {}
     
     with st.expander("📝 Enter Report Details", expanded=True):
         # Content input
-        if uploaded_file:
+        if uploaded_files and len(uploaded_files) > 1:
+            # Files are extracted concurrently and merged under one heading each
+            progress_bar = st.progress(0.0, text=f"Reading {len(uploaded_files)} files...")
+            results = file_processor.extract_uploads(
+                uploaded_files,
+                max_workers=UPLOAD_BATCH_CONCURRENCY,
+                progress=lambda done, total, name: progress_bar.progress(
+                    done / total, text=f"Read {name} ({done} of {total})"
+                )
+            )
+            progress_bar.empty()
+            form_data['content'] = merge_extractions(results)
+            failed = [result for result in results if not result.ok]
+            if failed:
+                st.warning("Could not process: " + ", ".join(
+                    f"{result.name} ({result.error})" for result in failed
+                ))
+            if len(failed) < len(results):
+                st.success(f"{len(results) - len(failed)} of {len(results)} files processed successfully!")
+            st.caption(" · ".join(
+                f"{result.name}: {'cached' if result.cached else f'{result.elapsed:.2f}s'}"
+                for result in results
+            ))
+        elif uploaded_files:
+            uploaded_file = uploaded_files[0]
             try:
-                # Save the uploaded file and extract text
-                saved_file = file_processor.save_uploaded_file(uploaded_file, DATA_DIR)
-                form_data['content'] = file_processor.extract_text(saved_file)
+                # Identical uploads are saved and parsed only once
+                progress_bar = st.progress(0.0, text=f"Reading {uploaded_file.name}...")
+                form_data['content'] = file_processor.extract_upload(
+                    uploaded_file,
+                    progress=lambda done, total: progress_bar.progress(
+                        done / total, text=f"Reading {uploaded_file.name}: page {done} of {total}"
+                    )
+                )
+                progress_bar.empty()
                 st.success("File processed successfully!")
             except Exception as e:
                 st.error(f"Error processing file: {str(e)}")
@@ -164,62 +344,142 @@ def render_report_form(template: str, uploaded_file: Any = None) -> Dict[str, An
         
         # Template-specific options
         form_data['template'] = template
+        form_data['use_cache'] = use_cache
         
     return form_data
 
-def generate_report(form_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-    """Generate a report using the Gemini API"""
+def new_report(form_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Create the report object for a form, without its content"""
+    # The report manager assigns the ID
+    return {
+        'title': f"{form_data['template'].capitalize()} Report - {form_data['date']}",
+        'content': '',
+        'template': form_data['template'],
+        'date': form_data['date'].isoformat(),
+        'priority': form_data['priority'],
+        'created_at': datetime.now().isoformat(),
+        'metadata': {
+            'model': GEMINI_MODEL,
+            'max_tokens': GEMINI_MAX_TOKENS,
+            'temperature': GEMINI_TEMPERATURE
+        }
+    }
+
+def enqueue_report(form_data: Dict[str, Any]) -> Optional[str]:
+    """Queue a report for background generation and remember its job"""
     if not form_data.get('content', '').strip():
         st.warning("Please enter some content to generate a report.")
         return None
     
-    if not GEMINI_AVAILABLE:
-        st.error("Gemini API is not available. Please check your API key and internet connection.")
+    report = new_report(form_data)
+    report['id'] = f"report_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+    try:
+        job_id = job_queue.enqueue(
+            current_user(),
+            {'report': report, 'content': form_data['content'], 'use_cache': form_data.get('use_cache', True)}
+        )
+    except QueueFullError as e:
+        st.warning(str(e))
         return None
+    logger.info("Queued report", extra={'report_id': report['id'], 'job_id': job_id})
+    # Kept in the URL so the job is picked up again after a refresh
+    st.query_params['job'] = job_id
+    return job_id
+
+@st.fragment(run_every=1)
+def render_job_status():
+    """Show the status of the current job, refreshing every second"""
+    job_id = st.query_params.get('job')
+    if not job_id:
+        return
+    with span('fragment.job_status'):
+        job = job_queue.get(job_id)
+    if job is None:
+        return
     
-    with st.spinner("Generating your report..."):
-        try:
-            # Generate the report using Gemini
-            generated_content = gemini_client.generate_report(
-                content=form_data['content'],
-                template=form_data['template'],
-                max_tokens=GEMINI_MAX_TOKENS,
-                temperature=GEMINI_TEMPERATURE
-            )
-            
-            # Create report object
-            report = {
-                'id': f"report_{int(datetime.now().timestamp())}",
-                'title': f"{form_data['template'].capitalize()} Report - {form_data['date']}",
-                'content': generated_content,
-                'template': form_data['template'],
-                'date': form_data['date'].isoformat(),
-                'priority': form_data['priority'],
-                'created_at': datetime.now().isoformat(),
-                'metadata': {
-                    'model': GEMINI_MODEL,
-                    'max_tokens': GEMINI_MAX_TOKENS,
-                    'temperature': GEMINI_TEMPERATURE
-                }
-            }
-            
-            # Save the report
-            report_id = report_manager.save_report(report)
+    if job.status == QUEUED:
+        position = job_queue.position(job.id)
+        col1, col2 = st.columns([4, 1])
+        col1.info(f"Your report is queued ({position} ahead of it)...")
+        if col2.button("Cancel", key="cancel_job"):
+            job_queue.cancel(job.id)
+            del st.query_params['job']
+            st.rerun()
+    elif job.status == RUNNING:
+        st.info(f"Generating your report... {time.time() - job.started_at:.0f}s")
+    elif job.status == DONE:
+        report_id = job.result['report_id']
+        current = st.session_state.get('generated_report') or {}
+        if current.get('id') != report_id:
+            report = report_manager.get_report(report_id)
             st.session_state.current_report = report
+            st.session_state.generated_report = report
             st.session_state.report_history = report_manager.list_reports()
-            
-            st.success("Report generated successfully!")
-            st.balloons()
-            
-            return report
-            
-        except Exception as e:
-            logger.error(f"Error generating report: {str(e)}")
-            st.error(f"An error occurred while generating the report: {str(e)}")
-            return None
-
-def render_report(report: Dict[str, Any]):
-    """Render the generated report"""
+            # Rerun the whole page so the report and history are shown
+            st.rerun(scope="app")
+    else:
+        st.error(f"Report generation {job.status}: {job.error or 'no details'}")
+        if st.button("Dismiss", key="dismiss_job"):
+            del st.query_params['job']
+            st.rerun(scope="app")
+
+def generate_report(form_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Generate a report using the Gemini API"""
+    if not form_data.get('content', '').strip():
+        st.warning("Please enter some content to generate a report.")
+        return None
+    
+    report = new_report(form_data)
+    
+    try:
+        content = form_data['content']
+        if summarizer.needs_chunking(content):
+            # Too large for one prompt: summarize it in chunks first
+            progress_bar = st.progress(0.0, text="Summarizing large input...")
+            content = summarizer.condense(
+                content,
+                use_cache=form_data.get('use_cache', True),
+                progress=lambda stage, done, total: progress_bar.progress(
+                    done / total, text=f"Summarizing large input ({stage}: {done}/{total})"
+                )
+            )
+            progress_bar.empty()
+        
+        # Stream the report from Gemini, rendering it as it arrives
+        chunks = gemini_client.generate_report_stream(
+            content=content,
+            template=form_data['template'],
+            max_tokens=GEMINI_MAX_TOKENS,
+            temperature=GEMINI_TEMPERATURE,
+            use_cache=form_data.get('use_cache', True)
+        )
+        render_report(report, stream=chunks)
+        
+        # Save the report once the stream has finished
+        with log_context(report_id=report_manager.save_report(report)):
+            logger.info("Saved generated report")
+        st.session_state.current_report = report
+        st.session_state.report_history = report_manager.list_reports()
+        
+        st.success("Report generated successfully!")
+        st.balloons()
+        
+        return report
+        
+    except Exception as e:
+        logger.error(f"Error generating report: {str(e)}")
+        st.error(f"An error occurred while generating the report: {str(e)}")
+        return None
+
+def render_report(report: Dict[str, Any], stream: Optional[Iterator[str]] = None):
+    """
+    Render the generated report
+    
+    Args:
+        report: Report to display
+        stream: Text chunks still being generated; they are shown as they
+            arrive and collected into report['content']
+    """
     if not report:
         return
     
@@ -236,7 +496,17 @@ def render_report(report: Dict[str, Any]):
     
     # Display report content
     st.markdown("---")
-    st.markdown(report.get('content', ''))
+    if stream is not None:
+        placeholder = st.empty()
+        placeholder.markdown("_Generating your report..._")
+        content = ''
+        for chunk in stream:
+            content += chunk
+            placeholder.markdown(content + "▌")
+        placeholder.markdown(content)
+        report['content'] = content
+    else:
+        st.markdown(report.get('content', ''))
     
     # Add export options
     st.markdown("---")
@@ -252,9 +522,9 @@ def render_report(report: Dict[str, Any]):
             mime="text/markdown"
         )
     
-    with col2:
+    with col2, span('rerun.export_html'):
         # HTML export
-        html_content = f"""
+        html_content = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -306,11 +576,37 @@ def render_report_history():
     st.sidebar.markdown("---")
     st.sidebar.subheader("Recent Reports")
     
-    reports = report_manager.list_reports(limit=5)
+    query = ""
+    if report_manager.search_enabled:
+        query = st.sidebar.text_input(
+            "Search reports",
+            placeholder="Keywords...",
+            key="report_search"
+        )
     
-    if not reports:
-        st.sidebar.info("No reports generated yet.")
-        return
+    if query.strip():
+        template_filter = st.sidebar.selectbox(
+            "Template",
+            ["All", "Default", "Operations", "Development", "Meetings"],
+            key="report_search_template"
+        )
+        date_from = st.sidebar.date_input("From", value=None, key="report_search_from")
+        date_to = st.sidebar.date_input("To", value=None, key="report_search_to")
+        reports = report_manager.search_reports(
+            query,
+            limit=10,
+            template=None if template_filter == "All" else template_filter.lower(),
+            date_from=date_from.isoformat() if date_from else None,
+            date_to=date_to.isoformat() if date_to else None
+        )
+        if not reports:
+            st.sidebar.info("No matching reports.")
+            return
+    else:
+        reports = report_manager.list_reports(limit=5)
+        if not reports:
+            st.sidebar.info("No reports generated yet.")
+            return
     
     for report in reports:
         if st.sidebar.button(
@@ -318,41 +614,98 @@ def render_report_history():
             key=f"report_{report.get('id')}",
             use_container_width=True
         ):
-            st.session_state.current_report = report
+            # Listings only carry summaries; load the full report on demand
+            full_report = report_manager.get_report(report['id'])
+            st.session_state.current_report = full_report
+            st.session_state.generated_report = full_report
             st.rerun()
 
+def debug_panel_enabled() -> bool:
+    """Whether to show rerun timings (DEBUG_PANEL or ?debug=1 in the URL)"""
+    return DEBUG_PANEL or st.query_params.get('debug') == '1'
+
+def render_debug_panel(trace_id: Optional[str]):
+    """Show where the time of this session's previous rerun went"""
+    with st.sidebar.expander("🐞 Last rerun", expanded=False):
+        trace = default_recorder.find_trace(trace_id) if trace_id else None
+        if trace is None:
+            st.caption("No timings recorded yet.")
+            return
+        st.caption(f"{trace.duration * 1000:.0f} ms, {len(trace.spans)} spans")
+        rows = [
+            {
+                'span': '  ' * (s.depth - 1) + s.name,
+                'ms': round(s.duration * 1000, 1),
+                '%': round(100 * s.duration / trace.duration, 1) if trace.duration else 0.0,
+                'error': s.error or '',
+            }
+            for s in sorted(trace.spans, key=lambda s: s.start)
+            if s.depth > 0
+        ]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        if trace.profile:
+            st.caption(f"Profile: {trace.profile}")
+
 def main():
     """Main application function"""
-    # Initialize session state
-    init_session_state()
-    
-    # Setup UI
-    setup_ui()
-    
-    # Apply theme
-    apply_theme(st.session_state.dark_mode)
-    
-    # Render sidebar and get settings
-    sidebar_data = render_sidebar()
-    
-    # Render report form
-    form_data = render_report_form(
-        template=sidebar_data['template'],
-        uploaded_file=sidebar_data['uploaded_file']
-    )
-    
-    # Generate report button
-    if st.button("Generate Report", type="primary", key="generate_btn"):
-        report = generate_report(form_data)
-        if report:
-            st.session_state.generated_report = report
-    
-    # Display generated report if available
-    if 'generated_report' in st.session_state and st.session_state.generated_report:
-        render_report(st.session_state.generated_report)
-    
-    # Display report history in sidebar
-    render_report_history()
+    # Each phase of the rerun is timed; see instrumentation.py
+    with default_recorder.trace('rerun', profiler=rerun_profiler) as trace_id, \
+            log_context(request_id=trace_id or None):
+        # Initialize session state
+        with span('rerun.init_session_state'):
+            init_session_state()
+        previous_trace = st.session_state.get('rerun_trace_id')
+        st.session_state.rerun_trace_id = trace_id
+        
+        # Setup UI
+        with span('rerun.setup_ui'):
+            setup_ui()
+        
+        # Apply theme
+        with span('rerun.apply_theme'):
+            apply_theme(st.session_state.dark_mode)
+        
+        # Render sidebar and get settings
+        with span('rerun.sidebar'):
+            sidebar_data = render_sidebar()
+        
+        # Render report form
+        with span('rerun.report_form'):
+            form_data = render_report_form(
+                template=sidebar_data['template'],
+                uploaded_files=sidebar_data['uploaded_files'],
+                use_cache=sidebar_data['use_cache']
+            )
+        
+        # Generate report button
+        streamed = False
+        with span('rerun.generate'):
+            if st.button("Generate Report", type="primary", key="generate_btn"):
+                if JOBS_ENABLED:
+                    # A background worker generates the report; its status is
+                    # shown below until it is ready
+                    enqueue_report(form_data)
+                else:
+                    # A new report is rendered while it streams in
+                    report = generate_report(form_data)
+                    if report:
+                        st.session_state.generated_report = report
+                    streamed = True
+        if JOBS_ENABLED:
+            with span('rerun.job_status'):
+                render_job_status()
+        
+        if not streamed and st.session_state.get('generated_report'):
+            # Display generated report if available
+            with span('rerun.report'):
+                render_report(st.session_state.generated_report)
+        
+        # Display report history in sidebar
+        with span('rerun.history'):
+            render_report_history()
+        
+        if debug_panel_enabled():
+            render_debug_panel(previous_trace)
 
 def apply_theme(dark_mode: bool = False):
     """Apply the selected theme"""
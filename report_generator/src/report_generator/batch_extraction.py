@@ -0,0 +1,63 @@
+import time
+from pathlib import Path
+from typing import List, Any, Optional, NamedTuple, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionResult(NamedTuple):
+    """Outcome of extracting one file of a batch; exactly one of text and error is set"""
+    index: int
+    name: str
+    text: Optional[str]
+    error: Optional[Exception]
+    elapsed: float
+    cached: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def extract_timed(
+    name: str,
+    suffix: str,
+    source: Union[Path, bytes],
+    max_pages: Optional[int] = None,
+    pdf_workers: Optional[int] = None,
+    registry: Any = None
+) -> Tuple[Optional[str], Optional[Exception], float]:
+    """
+    Extract one file, returning (text, error, seconds) instead of raising
+
+    Runs in pool workers, so one failing file does not fail the batch.
+    """
+    from .file_utils import FileProcessor
+
+    start = time.perf_counter()
+    try:
+        text = FileProcessor.extract_source(
+            source, suffix, name=name, max_pages=max_pages,
+            pdf_workers=pdf_workers, registry=registry
+        )
+        return text, None, time.perf_counter() - start
+    except Exception as e:
+        return None, e, time.perf_counter() - start
+
+
+def merge_extractions(results: List[ExtractionResult]) -> str:
+    """
+    Merge batch results into one document, one heading per file in input order
+
+    Args:
+        results: Results of FileProcessor.extract_batch or extract_uploads
+
+    Returns:
+        Markdown with each file's text, or its error, under a heading
+    """
+    sections = []
+    for result in sorted(results, key=lambda result: result.index):
+        body = result.text.strip() if result.ok else f"_Could not extract this file: {result.error}_"
+        sections.append(f"# {result.name}\n\n{body}")
+    return '\n\n'.join(sections)
@@ -0,0 +1,162 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, NamedTuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token for budgeting, in characters
+CHARS_PER_TOKEN = 4
+
+# HTTP status codes worth retrying: rate limited or a transient server error
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# google.api_core exception names for the same conditions
+RETRYABLE_ERROR_NAMES = {
+    'ResourceExhausted', 'TooManyRequests', 'InternalServerError',
+    'ServiceUnavailable', 'DeadlineExceeded', 'BadGateway', 'GatewayTimeout',
+}
+
+
+class GenerationJob(NamedTuple):
+    """One report to generate in a batch"""
+    content: str
+    template: str = 'default'
+    job_id: Optional[str] = None
+
+
+class GenerationResult(NamedTuple):
+    """Outcome of a batch job; exactly one of text and error is set"""
+    index: int
+    job: GenerationJob
+    text: Optional[str]
+    error: Optional[Exception]
+    attempts: int
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests per minute and tokens per minute.
+
+    Each bucket holds up to one minute of budget and refills continuously.
+    A request waits until both buckets can cover it, so short bursts run at
+    full speed while the sustained rate stays within the API quota.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Maximum sustained request rate
+            tokens_per_minute: Maximum sustained token rate (None for no token limit)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._lock = threading.Lock()
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def _reserve(self, tokens: int) -> float:
+        """Take budget for one request if available; otherwise return how long to wait"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._updated = now
+            self._requests = min(
+                self.requests_per_minute,
+                self._requests + elapsed * self.requests_per_minute / 60.0
+            )
+            if self.tokens_per_minute:
+                self._tokens = min(
+                    self.tokens_per_minute,
+                    self._tokens + elapsed * self.tokens_per_minute / 60.0
+                )
+                # A request larger than the whole bucket only waits for a full bucket
+                tokens = min(tokens, self.tokens_per_minute)
+
+            wait = 0.0
+            if self._requests < 1:
+                wait = (1 - self._requests) * 60.0 / self.requests_per_minute
+            if self.tokens_per_minute and self._tokens < tokens:
+                wait = max(wait, (tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+            if wait > 0:
+                return wait
+
+            self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
+            return 0.0
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until a request of ``tokens`` tokens fits in the budget
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                break
+            time.sleep(wait)
+            waited += wait
+        self._record_wait(waited)
+        return waited
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        """Async version of :meth:`acquire` that does not block the event loop"""
+        waited = 0.0
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+        self._record_wait(waited)
+        return waited
+
+    def _record_wait(self, waited: float) -> None:
+        if waited > 0:
+            with self._lock:
+                self.waits += 1
+                self.wait_time += waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how often and how long requests were throttled"""
+        with self._lock:
+            return {'waits': self.waits, 'wait_time': self.wait_time}
+
+
+def estimate_tokens(prompt: str, max_output_tokens: int) -> int:
+    """Rough token cost of a request: ~4 characters per prompt token plus the output budget"""
+    return len(prompt) // CHARS_PER_TOKEN + max_output_tokens
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Return True for rate-limit (429) and transient server (5xx) errors"""
+    for attr in ('code', 'status_code'):
+        code = getattr(error, attr, None)
+        if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+            return True
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """
+    Delay before retry number ``attempt`` (starting at 1)
+
+    Uses exponential backoff with full jitter so concurrent workers that
+    failed together do not retry in lockstep.
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
@@ -0,0 +1,283 @@
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Callable, Iterator, Tuple
+import logging
+
+from .batch_generation import CHARS_PER_TOKEN, estimate_tokens
+from .response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Lines that open a new section: Markdown headings, setext/horizontal rules
+# and page breaks
+_SECTION_START = re.compile(r'^\s*(#{1,6}\s|[=\-_*]{3,}\s*$|\f)')
+_PARAGRAPH_BREAK = re.compile(r'(\n[ \t]*\n+)')
+_SENTENCE_END = re.compile(r'((?<=[.!?])\s+)')
+
+# On average one unit in this many is a content-defined cut point, so chunk
+# boundaries resynchronise shortly after an edit instead of shifting through
+# the rest of the document
+ANCHOR_EVERY = 8
+
+MAP_PROMPT = (
+    "Summarize the following excerpt from a larger document. Keep every fact, "
+    "figure, name, date, decision, issue and action item; drop filler. "
+    "Reply with concise Markdown bullet points.\n\n"
+    "Excerpt:\n{content}"
+)
+REDUCE_PROMPT = (
+    "Merge the following partial summaries of one document into a single summary. "
+    "Remove duplicates but keep every distinct fact, figure, decision and action item. "
+    "Reply with concise Markdown bullet points.\n\n"
+    "Partial summaries:\n{content}"
+)
+
+
+def _split_keeping(pattern: 're.Pattern', text: str) -> List[str]:
+    """Split text on a pattern with one capture group, keeping each separator
+    at the end of the piece before it"""
+    parts = pattern.split(text)
+    pieces = [parts[i] + (parts[i + 1] if i + 1 < len(parts) else '')
+              for i in range(0, len(parts), 2)]
+    return [piece for piece in pieces if piece]
+
+
+def _units(text: str, budget: int) -> Iterator[Tuple[str, bool]]:
+    """Yield (piece, starts_section) units no longer than budget characters"""
+    for paragraph in _split_keeping(_PARAGRAPH_BREAK, text):
+        starts_section = bool(_SECTION_START.match(paragraph))
+        if len(paragraph) <= budget:
+            yield paragraph, starts_section
+            continue
+        for line in paragraph.splitlines(keepends=True):
+            line_starts_section = bool(_SECTION_START.match(line))
+            if len(line) <= budget:
+                yield line, line_starts_section
+                continue
+            for sentence in _split_keeping(_SENTENCE_END, line):
+                for start in range(0, len(sentence), budget):
+                    yield sentence[start:start + budget], line_starts_section and start == 0
+                line_starts_section = False
+
+
+def _is_anchor(unit: str) -> bool:
+    digest = hashlib.sha1(unit.encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % ANCHOR_EVERY == 0
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[str]:
+    """
+    Split text into chunks of at most ``max_tokens`` on structural boundaries
+
+    Text is cut between paragraphs, falling back to lines, sentences and
+    finally fixed-size slices for oversized pieces. A new chunk is started at
+    section headings and page breaks once the current chunk is a quarter
+    full, and at content-defined anchor paragraphs once it is half full, so
+    an edit only changes the chunks around it. Joining the chunks gives back
+    the original text.
+
+    Args:
+        text: Text to split
+        max_tokens: Token budget per chunk
+
+    Returns:
+        List of chunks in document order
+    """
+    budget = max(1, max_tokens * CHARS_PER_TOKEN)
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+
+    for unit, starts_section in _units(text, budget):
+        if current and (size + len(unit) > budget or (starts_section and size >= budget // 4)):
+            chunks.append(''.join(current))
+            current, size = [], 0
+        current.append(unit)
+        size += len(unit)
+        if size >= budget // 2 and _is_anchor(unit):
+            chunks.append(''.join(current))
+            current, size = [], 0
+
+    if current:
+        chunks.append(''.join(current))
+    return chunks
+
+
+class ChunkedSummarizer:
+    """
+    Map-reduce summarization for inputs too large for a single prompt.
+
+    Large inputs are split into chunks, each chunk is summarized in parallel
+    (map), and the partial summaries are merged level by level (reduce) until
+    they fit the input budget. The condensed notes are then turned into the
+    final template-specific report by the generator as usual.
+
+    Chunk and merge summaries are cached by a hash of their input, so
+    re-running on a slightly edited document only re-summarizes the chunks
+    that changed.
+    """
+
+    def __init__(
+        self,
+        generator: Any,
+        chunk_tokens: int = 8000,
+        max_input_tokens: int = 32000,
+        summary_tokens: int = 1024,
+        max_workers: int = 4,
+        temperature: float = 0.2,
+        cache: Optional[ResponseCache] = None
+    ):
+        """
+        Initialize the summarizer
+
+        Args:
+            generator: GeminiReportGenerator used for every model call
+            chunk_tokens: Token budget of each chunk and merge group
+            max_input_tokens: Inputs up to this size are used as-is
+            summary_tokens: Output budget of each partial summary
+            max_workers: Maximum number of summaries generated in parallel
+            temperature: Sampling temperature of the partial summaries
+            cache: Cache of partial summaries keyed by their input
+        """
+        self.generator = generator
+        self.chunk_tokens = chunk_tokens
+        self.max_input_tokens = max_input_tokens
+        self.summary_tokens = summary_tokens
+        self.max_workers = max_workers
+        self.temperature = temperature
+        self.cache = cache
+
+        self._lock = threading.Lock()
+        self.summaries_generated = 0
+        self.summaries_cached = 0
+
+    def needs_chunking(self, content: str) -> bool:
+        """Return True if the content is too large to send in one prompt"""
+        return estimate_tokens(content, 0) > self.max_input_tokens
+
+    def condense(
+        self,
+        content: str,
+        use_cache: bool = True,
+        progress: Optional[Callable[[str, int, int], None]] = None
+    ) -> str:
+        """
+        Reduce content to fit the input budget
+
+        Args:
+            content: Full input text
+            use_cache: Reuse cached partial summaries
+            progress: Called as progress(stage, done, total) after each summary
+
+        Returns:
+            The content unchanged if it already fits, otherwise merged summaries
+        """
+        if not self.needs_chunking(content):
+            return content
+
+        chunks = [chunk.strip() for chunk in split_into_chunks(content, self.chunk_tokens)]
+        chunks = [chunk for chunk in chunks if chunk]
+        logger.info(f"Summarizing {len(chunks)} chunks of a {len(content)}-character input")
+        summaries = self._run_stage('map', MAP_PROMPT, chunks, use_cache, progress)
+
+        level = 0
+        while len(summaries) > 1 and estimate_tokens('\n\n'.join(summaries), 0) > self.max_input_tokens:
+            level += 1
+            groups = ['\n\n'.join(group) for group in self._group(summaries)]
+            logger.info(f"Merging {len(summaries)} summaries into {len(groups)} (level {level})")
+            summaries = self._run_stage(f'reduce {level}', REDUCE_PROMPT, groups, use_cache, progress)
+
+        return '\n\n'.join(summaries)
+
+    def summarize(
+        self,
+        content: str,
+        template: str = "default",
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Generate a template report from content of any size
+
+        Returns:
+            Generated report as a string
+        """
+        condensed = self.condense(content, use_cache=use_cache)
+        return self.generator.generate_report(condensed, template, max_tokens, temperature, use_cache)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many partial summaries were generated and reused"""
+        with self._lock:
+            return {
+                'summaries_generated': self.summaries_generated,
+                'summaries_cached': self.summaries_cached,
+            }
+
+    def _group(self, summaries: List[str]) -> List[List[str]]:
+        """Pack consecutive summaries into merge groups within the chunk budget"""
+        budget = self.chunk_tokens * CHARS_PER_TOKEN
+        groups: List[List[str]] = []
+        current: List[str] = []
+        size = 0
+        for summary in summaries:
+            # Every group holds at least two summaries so each level shrinks
+            if len(current) >= 2 and size + len(summary) > budget:
+                groups.append(current)
+                current, size = [], 0
+            current.append(summary)
+            size += len(summary)
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        elif current:
+            groups.append(current)
+        return groups
+
+    def _run_stage(
+        self,
+        stage: str,
+        prompt_template: str,
+        texts: List[str],
+        use_cache: bool,
+        progress: Optional[Callable[[str, int, int], None]]
+    ) -> List[str]:
+        """Summarize texts in parallel, preserving their order"""
+        summaries: List[Optional[str]] = [None] * len(texts)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self._summarize_piece, prompt_template.format(content=text), use_cache
+                ): index
+                for index, text in enumerate(texts)
+            }
+            # Progress is reported from the calling thread so UI callbacks are safe
+            for done, future in enumerate(as_completed(futures), start=1):
+                summaries[futures[future]] = future.result()
+                if progress is not None:
+                    progress(stage, done, len(texts))
+        return summaries
+
+    def _summarize_piece(self, prompt: str, use_cache: bool) -> str:
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = ResponseCache.make_key(
+                prompt,
+                self.generator.model_name,
+                {'temperature': self.temperature, 'max_output_tokens': self.summary_tokens}
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                with self._lock:
+                    self.summaries_cached += 1
+                return cached
+
+        summary = self.generator.complete(
+            prompt, self.summary_tokens, self.temperature, use_cache=False
+        )
+        with self._lock:
+            self.summaries_generated += 1
+        if cache_key is not None:
+            self.cache.set(cache_key, summary)
+        return summary
@@ -0,0 +1,612 @@
+"""
+Generate reports for every file in a directory, without the Streamlit UI.
+
+Files are extracted and sent to Gemini concurrently (bounded by
+--extract-workers and --concurrency), and the reports are saved to the
+report store in batches. Inputs whose content already produced a report
+with the same template are skipped, so the command can run from cron over
+a growing folder of notes.
+
+Usage:
+    python -m src.report_generator.cli generate -i NOTES_DIR [-t development] [--recursive]
+    python -m src.report_generator.cli list-templates
+"""
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Iterable, Sequence, Tuple
+import logging
+
+from .batch_extraction import ExtractionResult
+from .batch_generation import GenerationJob
+from .storage_utils import file_lock
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES = ['default', 'operations', 'development', 'meetings']
+
+# A date in a file name (daily-2024-05-01.md) is used as the report date
+DATE_IN_NAME = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+
+
+def hash_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_inputs(
+    directory: Path,
+    suffixes: Iterable[str],
+    pattern: str = '*',
+    recursive: bool = False
+) -> List[Path]:
+    """
+    List the files of a directory that an extractor supports
+
+    Args:
+        directory: Directory to walk
+        suffixes: File extensions to include
+        pattern: Glob pattern the file names must match
+        recursive: Include subdirectories
+
+    Returns:
+        Matching files in path order; hidden files and directories are skipped
+    """
+    suffixes = {suffix.lower() for suffix in suffixes}
+    paths = directory.rglob(pattern) if recursive else directory.glob(pattern)
+    return sorted(
+        path for path in paths
+        if path.is_file()
+        and path.suffix.lower() in suffixes
+        and not any(part.startswith('.') for part in path.relative_to(directory).parts)
+    )
+
+
+def report_date(path: Path) -> str:
+    """Return the ISO date in a file's name, else the date it was last modified"""
+    match = DATE_IN_NAME.search(path.stem)
+    if match:
+        try:
+            return date(*(int(part) for part in match.groups())).isoformat()
+        except ValueError:
+            pass
+    return date.fromtimestamp(path.stat().st_mtime).isoformat()
+
+
+class ProcessedIndex:
+    """
+    Record of the inputs that already have a report.
+
+    Entries are keyed by template and the SHA-256 of the input's content, so
+    a renamed or copied file is not generated twice while an edited one is.
+    They live in an append-only JSON-lines file that is only written after
+    the reports are saved, so an interrupted run repeats work rather than
+    losing it.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Load the index
+
+        Args:
+            path: JSON-lines file holding the entries (created on first write)
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._entries: Dict[str, str] = {}
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from an interrupted run
+                        continue
+                    self._entries[entry['key']] = entry['report_id']
+
+    @staticmethod
+    def make_key(template: str, digest: str) -> str:
+        """Return the key of an input for a template"""
+        return f"{template}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the ID of the report generated for a key, if any"""
+        return self._entries.get(key)
+
+    def add_many(self, entries: Sequence[Tuple[str, str, str]]) -> None:
+        """
+        Append (key, report_id, source) entries with one write
+
+        Args:
+            entries: Entries for reports that have been saved
+        """
+        if not entries:
+            return
+        lines = ''.join(
+            json.dumps({
+                'key': key,
+                'report_id': report_id,
+                'source': source,
+                'at': datetime.now().isoformat()
+            }, ensure_ascii=False) + '\n'
+            for key, report_id, source in entries
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path), open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+        for key, report_id, _ in entries:
+            self._entries[key] = report_id
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RunSummary:
+    """Counters and per-stage timings of a batch run"""
+
+    def __init__(self):
+        self.found = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.extract_failed = 0
+        self.generate_failed = 0
+        self.saved = 0
+        self.input_bytes = 0
+        self.stage_seconds = {'hash': 0.0, 'extract': 0.0, 'generate': 0.0, 'save': 0.0}
+        self.elapsed = 0.0
+        self.failures: List[Tuple[str, str]] = []
+
+    @property
+    def failed(self) -> int:
+        return self.extract_failed + self.generate_failed
+
+    def format(self) -> str:
+        """Return a human-readable summary with throughput figures"""
+        minutes = self.elapsed / 60 if self.elapsed > 0 else 0
+        rate = f"{self.saved / minutes:.1f} reports/min" if minutes and self.saved else "n/a"
+        stages = ', '.join(
+            f"{stage} {seconds:.2f}s" for stage, seconds in self.stage_seconds.items()
+        )
+        lines = [
+            f"Found {self.found} files: {self.skipped} already processed, "
+            f"{self.duplicates} duplicates, {self.saved} reports saved, {self.failed} failed",
+            f"Elapsed {self.elapsed:.2f}s ({rate}, "
+            f"{self.input_bytes / 1024 / 1024:.1f} MB of input)",
+            f"Stage time: {stages}",
+        ]
+        lines.extend(f"  failed: {name}: {error}" for name, error in self.failures)
+        return '\n'.join(lines)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'found': self.found,
+            'skipped': self.skipped,
+            'duplicates': self.duplicates,
+            'saved': self.saved,
+            'extract_failed': self.extract_failed,
+            'generate_failed': self.generate_failed,
+            'input_bytes': self.input_bytes,
+            'elapsed': self.elapsed,
+            'stage_seconds': dict(self.stage_seconds),
+            'failures': [{'name': name, 'error': error} for name, error in self.failures],
+        }
+
+
+class BatchRunner:
+    """Runs extract -> generate -> save over a set of input files"""
+
+    def __init__(
+        self,
+        generator: Any,
+        report_manager: Any,
+        file_processor: Any,
+        processed: ProcessedIndex,
+        summarizer: Any = None,
+        template: str = 'default',
+        priority: str = 'Medium',
+        batch_size: int = 20,
+        extract_workers: int = 4,
+        generate_workers: int = 4,
+        max_retries: int = 4,
+        retry_base_delay: float = 1.0,
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+        model_name: Optional[str] = None,
+        use_cache: bool = True,
+        output_dir: Optional[Path] = None
+    ):
+        """
+        Initialize the runner
+
+        Args:
+            generator: GeminiReportGenerator used for every report
+            report_manager: ReportManager the reports are saved to
+            file_processor: FileProcessor used to extract the inputs
+            processed: Index of inputs that already have a report
+            summarizer: ChunkedSummarizer for inputs too large for one prompt
+            template: Report template
+            priority: Priority recorded on the reports
+            batch_size: Files per extract/generate/save round; the next
+                round's files are extracted while this one is generated
+            extract_workers: Files extracted at once
+            generate_workers: Gemini requests in flight
+            max_retries: Retries per report on 429/5xx errors
+            retry_base_delay: Backoff before the first retry, in seconds
+            max_tokens: Maximum number of tokens to generate per report
+            temperature: Controls randomness (0.0 to 1.0)
+            model_name: Model recorded in the report metadata
+            use_cache: Reuse cached responses for identical requests
+            output_dir: Also write each report as Markdown under this
+                directory, named after its input
+        """
+        self.generator = generator
+        self.report_manager = report_manager
+        self.file_processor = file_processor
+        self.processed = processed
+        self.summarizer = summarizer
+        self.template = template
+        self.priority = priority
+        self.batch_size = max(1, batch_size)
+        self.extract_workers = extract_workers
+        self.generate_workers = generate_workers
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.model_name = model_name or getattr(generator, 'model_name', None)
+        self.use_cache = use_cache
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+
+    def run(
+        self,
+        paths: Sequence[Path],
+        root: Optional[Path] = None,
+        force: bool = False,
+        dry_run: bool = False,
+        progress: Optional[Callable[[str, str], None]] = None
+    ) -> RunSummary:
+        """
+        Generate and save a report for each new input
+
+        Args:
+            paths: Input files
+            root: Directory the files are named relative to in reports
+            force: Regenerate inputs that already have a report
+            dry_run: Only hash and count the inputs that would be processed
+            progress: Called as progress(name, status) when a file is done
+
+        Returns:
+            Counters and timings of the run
+        """
+        summary = RunSummary()
+        start = time.perf_counter()
+        summary.found = len(paths)
+
+        pending = self._select_pending(paths, root, force, summary)
+        if dry_run:
+            for name, _, _ in pending:
+                if progress is not None:
+                    progress(name, 'pending')
+            summary.elapsed = time.perf_counter() - start
+            return summary
+
+        batches = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+        # Extraction of the next batch overlaps generation of the current one,
+        # which waits on the API most of the time
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='batch-extract') as prefetch:
+            next_extraction = prefetch.submit(self._extract, batches[0]) if batches else None
+            for number, batch in enumerate(batches):
+                extracted, seconds = next_extraction.result()
+                summary.stage_seconds['extract'] += seconds
+                if number + 1 < len(batches):
+                    next_extraction = prefetch.submit(self._extract, batches[number + 1])
+                self._generate_and_save(batch, extracted, summary, progress)
+
+        summary.elapsed = time.perf_counter() - start
+        return summary
+
+    def _select_pending(
+        self,
+        paths: Sequence[Path],
+        root: Optional[Path],
+        force: bool,
+        summary: RunSummary
+    ) -> List[Tuple[str, Path, str]]:
+        """Hash the inputs and return (name, path, key) for those still to do"""
+        hash_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, self.extract_workers)) as executor:
+            digests = list(executor.map(hash_file, paths))
+        summary.stage_seconds['hash'] += time.perf_counter() - hash_start
+
+        pending = []
+        seen = set()
+        for path, digest in zip(paths, digests):
+            name = str(path.relative_to(root)) if root is not None else path.name
+            key = ProcessedIndex.make_key(self.template, digest)
+            if key in seen:
+                summary.duplicates += 1
+                logger.info(f"Skipping {name}: same content as another input")
+                continue
+            seen.add(key)
+            if not force and self.processed.get(key) is not None:
+                summary.skipped += 1
+                continue
+            summary.input_bytes += path.stat().st_size
+            pending.append((name, path, key))
+        return pending
+
+    def _extract(self, batch: List[Tuple[str, Path, str]]) -> Tuple[List[ExtractionResult], float]:
+        start = time.perf_counter()
+        results = self.file_processor.extract_batch(
+            [path for _, path, _ in batch],
+            names=[name for name, _, _ in batch],
+            max_workers=self.extract_workers
+        )
+        return results, time.perf_counter() - start
+
+    def _generate_and_save(
+        self,
+        batch: List[Tuple[str, Path, str]],
+        extracted: List[ExtractionResult],
+        summary: RunSummary,
+        progress: Optional[Callable[[str, str], None]]
+    ) -> None:
+        """Generate reports for one batch of extracted files and save them together"""
+        jobs = []
+        for (name, path, key), result in zip(batch, extracted):
+            error = result.error
+            if error is None and not (result.text or '').strip():
+                error = ValueError("no text could be extracted")
+            if error is not None:
+                summary.extract_failed += 1
+                summary.failures.append((name, str(error)))
+                if progress is not None:
+                    progress(name, 'failed')
+                continue
+            jobs.append((name, path, key, result.text))
+
+        generate_start = time.perf_counter()
+        jobs = self._condense(jobs, summary, progress)
+        prompts = [GenerationJob(text, self.template, job_id=name) for name, _, _, text in jobs]
+
+        reports = []
+        entries = []
+        for result in self.generator.generate_batch(
+            prompts,
+            max_tokens=self.max_tokens,
+            temperature=self.temperature,
+            max_workers=self.generate_workers,
+            max_retries=self.max_retries,
+            retry_base_delay=self.retry_base_delay,
+            use_cache=self.use_cache
+        ):
+            name, path, key, _ = jobs[result.index]
+            if not result.ok:
+                summary.generate_failed += 1
+                summary.failures.append((name, str(result.error)))
+                if progress is not None:
+                    progress(name, 'failed')
+                continue
+            reports.append(self._build_report(name, path, key, result.text))
+            entries.append((key, name))
+        summary.stage_seconds['generate'] += time.perf_counter() - generate_start
+
+        if not reports:
+            return
+        save_start = time.perf_counter()
+        report_ids = self.report_manager.save_reports(reports)
+        self.processed.add_many([
+            (key, report_id, name) for (key, name), report_id in zip(entries, report_ids)
+        ])
+        if self.output_dir is not None:
+            for report, (_, name) in zip(reports, entries):
+                path = self.output_dir / Path(name).with_suffix('.md')
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(report['content'], encoding='utf-8')
+        summary.stage_seconds['save'] += time.perf_counter() - save_start
+        summary.saved += len(reports)
+        if progress is not None:
+            for _, name in entries:
+                progress(name, 'saved')
+
+    def _condense(
+        self,
+        jobs: List[Tuple[str, Path, str, str]],
+        summary: RunSummary,
+        progress: Optional[Callable[[str, str], None]]
+    ) -> List[Tuple[str, Path, str, str]]:
+        """Summarize inputs too large for one prompt on the generation workers;
+        an input that cannot be summarized is counted as failed and dropped"""
+        if self.summarizer is None:
+            return jobs
+        large = [i for i, (_, _, _, text) in enumerate(jobs) if self.summarizer.needs_chunking(text)]
+        if not large:
+            return jobs
+
+        jobs = list(jobs)
+        failed = set()
+        workers = max(1, min(self.generate_workers, len(large)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch-condense') as executor:
+            futures = {}
+            for i in large:
+                logger.info(f"Summarizing large input {jobs[i][0]} in chunks")
+                futures[executor.submit(self.summarizer.condense, jobs[i][3], use_cache=self.use_cache)] = i
+            for future in as_completed(futures):
+                i = futures[future]
+                name, path, key, _ = jobs[i]
+                try:
+                    jobs[i] = (name, path, key, future.result())
+                except Exception as e:
+                    logger.warning(f"Failed to summarize {name}: {str(e)}")
+                    summary.generate_failed += 1
+                    summary.failures.append((name, str(e)))
+                    failed.add(i)
+                    if progress is not None:
+                        progress(name, 'failed')
+        return [job for i, job in enumerate(jobs) if i not in failed]
+
+    def _build_report(self, name: str, path: Path, key: str, content: str) -> Dict[str, Any]:
+        """Return a report in the shape the Streamlit app saves"""
+        day = report_date(path)
+        return {
+            'title': f"{self.template.capitalize()} Report - {day}",
+            'content': content,
+            'template': self.template,
+            'date': day,
+            'priority': self.priority,
+            'created_at': datetime.now().isoformat(),
+            'metadata': {
+                'model': self.model_name,
+                'max_tokens': self.max_tokens,
+                'temperature': self.temperature,
+                'source': name,
+                'source_sha256': key.split(':', 1)[1],
+            }
+        }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the command-line parser"""
+    from .config import (
+        BATCH_SAVE_SIZE, GEMINI_BATCH_CONCURRENCY, GEMINI_MAX_RETRIES,
+        GEMINI_MAX_TOKENS, GEMINI_TEMPERATURE, UPLOAD_BATCH_CONCURRENCY
+    )
+
+    parser = argparse.ArgumentParser(
+        prog='report-generator-batch',
+        description=__doc__.strip().split('\n\n')[0]
+    )
+    parser.add_argument('-v', '--verbose', action='store_true', help='log progress to stderr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='generate reports from input files')
+    generate.add_argument('-i', '--input', type=Path, required=True, help='input file or directory')
+    generate.add_argument('-o', '--output', type=Path,
+                          help='also write each report as Markdown into this directory')
+    generate.add_argument('-t', '--template', choices=TEMPLATES, default='default',
+                          help='report template (default: %(default)s)')
+    generate.add_argument('--priority', choices=['Low', 'Medium', 'High'], default='Medium')
+    generate.add_argument('--max-tokens', type=int, default=GEMINI_MAX_TOKENS,
+                          help='maximum number of tokens per report (default: %(default)s)')
+    generate.add_argument('--temperature', type=float, default=GEMINI_TEMPERATURE,
+                          help='temperature for generation (default: %(default)s)')
+    generate.add_argument('--glob', default='*', help='only process file names matching this pattern')
+    generate.add_argument('-r', '--recursive', action='store_true', help='include subdirectories')
+    generate.add_argument('--batch-size', type=int, default=BATCH_SAVE_SIZE,
+                          help='reports saved per write (default: %(default)s)')
+    generate.add_argument('--concurrency', type=int, default=GEMINI_BATCH_CONCURRENCY,
+                          help='Gemini requests in flight (default: %(default)s)')
+    generate.add_argument('--extract-workers', type=int, default=UPLOAD_BATCH_CONCURRENCY,
+                          help='files extracted at once (default: %(default)s)')
+    generate.add_argument('--max-retries', type=int, default=GEMINI_MAX_RETRIES,
+                          help='retries per report on rate-limit and server errors (default: %(default)s)')
+    generate.add_argument('--force', action='store_true', help='regenerate inputs that already have a report')
+    generate.add_argument('--no-cache', action='store_true', help='do not reuse cached model responses')
+    generate.add_argument('--dry-run', action='store_true', help='list the files that would be processed')
+    generate.add_argument('--json', action='store_true', help='print the summary as JSON')
+
+    commands.add_parser('list-templates', help='list available report templates')
+    return parser
+
+
+def run_generate(args: argparse.Namespace) -> int:
+    """Run the generate command; returns the exit status"""
+    from .config import GEMINI_API_KEY, GEMINI_MODEL, MODEL_BACKEND, BATCH_PROCESSED_FILE
+    from .file_utils import FileProcessor
+    from .services import (
+        build_generator, build_summarizer, build_report_manager, build_file_processor
+    )
+
+    source = args.input
+    if source.is_dir():
+        root = source
+        paths = find_inputs(source, FileProcessor.SUPPORTED_EXTENSIONS, args.glob, args.recursive)
+    elif source.is_file():
+        root = source.parent
+        paths = [source]
+    else:
+        print(f"Error: {source} does not exist", file=sys.stderr)
+        return 2
+
+    generator = report_manager = summarizer = None
+    if not args.dry_run:
+        if not GEMINI_API_KEY and MODEL_BACKEND == 'gemini':
+            # Without a key the generator would prompt for one in the Streamlit UI
+            print("Error: set GEMINI_API_KEY to generate reports", file=sys.stderr)
+            return 2
+        generator = build_generator(GEMINI_API_KEY)
+        summarizer = build_summarizer(generator, max_workers=args.concurrency)
+        report_manager = build_report_manager()
+
+    runner = BatchRunner(
+        generator,
+        report_manager,
+        build_file_processor(),
+        ProcessedIndex(BATCH_PROCESSED_FILE),
+        summarizer=summarizer,
+        template=args.template,
+        priority=args.priority,
+        batch_size=args.batch_size,
+        extract_workers=args.extract_workers,
+        generate_workers=args.concurrency,
+        max_retries=args.max_retries,
+        max_tokens=args.max_tokens,
+        temperature=args.temperature,
+        model_name=GEMINI_MODEL,
+        use_cache=not args.no_cache,
+        output_dir=args.output
+    )
+    try:
+        summary = runner.run(
+            paths,
+            root=root,
+            force=args.force,
+            dry_run=args.dry_run,
+            progress=(lambda name, status: print(f"{status}: {name}")) if args.dry_run else None
+        )
+    finally:
+        if report_manager is not None:
+            report_manager.close()
+
+    if args.json:
+        print(json.dumps(summary.as_dict(), indent=2))
+    else:
+        print(summary.format())
+    return 1 if summary.failed else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the command line
+
+    Args:
+        argv: Command-line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Exit status: 0 when every input was processed, 1 if some failed,
+        2 for usage errors
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        stream=sys.stderr
+    )
+    if args.command == 'list-templates':
+        print('\n'.join(TEMPLATES))
+        return 0
+    return run_generate(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -17,16 +17,156 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 for directory in [DATA_DIR, LOG_DIR, TEMPLATES_DIR]:
     directory.mkdir(parents=True, exist_ok=True)
 
+# Uploaded files are stored once per content hash, with their extracted text
+# cached. Files unused for UPLOAD_STORE_MAX_AGE_DAYS, then the least recently
+# used ones beyond UPLOAD_STORE_MAX_BYTES, are removed at startup.
+UPLOAD_STORE_DIR = DATA_DIR / 'uploads'
+UPLOAD_STORE_MAX_BYTES = int(os.getenv('UPLOAD_STORE_MAX_BYTES', 1024 * 1024 * 1024))
+UPLOAD_STORE_MAX_AGE_DAYS = float(os.getenv('UPLOAD_STORE_MAX_AGE_DAYS', 7))
+
+# Only extract the first PDF_MAX_PAGES pages of uploaded PDFs (0 for all)
+PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', 0)) or None
+
+# CSV/Excel uploads are read TABLE_CHUNK_ROWS rows at a time and reduced to
+# column profiles, anomalies and a sample of TABLE_SAMPLE_ROWS rows
+TABLE_CHUNK_ROWS = int(os.getenv('TABLE_CHUNK_ROWS', 50000))
+TABLE_SAMPLE_ROWS = int(os.getenv('TABLE_SAMPLE_ROWS', 20))
+
+# Uploads up to UPLOAD_SPOOL_MAX_BYTES are parsed straight from memory;
+# larger ones are written to the upload store first. Text files of at least
+# TEXT_MMAP_MIN_BYTES on disk are decoded from a memory map.
+UPLOAD_SPOOL_MAX_BYTES = int(os.getenv('UPLOAD_SPOOL_MAX_BYTES', 32 * 1024 * 1024))
+TEXT_MMAP_MIN_BYTES = int(os.getenv('TEXT_MMAP_MIN_BYTES', 8 * 1024 * 1024))
+
+# Text files are decoded with the first of these encodings that fits their
+# first bytes (after checking for a byte order mark), else as latin-1
+TEXT_ENCODINGS = [e.strip() for e in os.getenv('TEXT_ENCODINGS', 'utf-8,cp1252').split(',') if e.strip()]
+
+# Inputs larger than EXTRACT_MAX_FILE_BYTES, or than the limit for their
+# format (EXTRACT_MAX_BYTES_<FORMAT>), are rejected before they are parsed
+EXTRACT_MAX_FILE_BYTES = int(os.getenv('EXTRACT_MAX_FILE_BYTES', 512 * 1024 * 1024))
+EXTRACT_MAX_BYTES = {
+    name: int(os.getenv(f'EXTRACT_MAX_BYTES_{name.upper()}', default))
+    for name, default in {
+        'text': 256 * 1024 * 1024,
+        'csv': 512 * 1024 * 1024,
+        'docx': 100 * 1024 * 1024,
+        'xlsx': 100 * 1024 * 1024,
+        'xls': 50 * 1024 * 1024,
+        'pdf': 256 * 1024 * 1024,
+    }.items()
+}
+
+# Files of a multi-file upload extracted at once
+UPLOAD_BATCH_CONCURRENCY = int(os.getenv('UPLOAD_BATCH_CONCURRENCY', 4))
+
 # Gemini API Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 GEMINI_MODEL = 'gemini-pro'  # or 'gemini-ultra' when available
 GEMINI_TEMPERATURE = 0.7
 GEMINI_MAX_TOKENS = 2048
 
+# 'gemini' calls the Gemini API; 'fake' answers from a local simulated model
+# (no API key, no network) with the latency, throughput and failure rates
+# below, for load tests and demos
+MODEL_BACKEND = os.getenv('MODEL_BACKEND', 'gemini').lower()
+FAKE_MODEL_LATENCY = float(os.getenv('FAKE_MODEL_LATENCY', 0.5))
+FAKE_MODEL_LATENCY_DISTRIBUTION = os.getenv('FAKE_MODEL_LATENCY_DISTRIBUTION', 'lognormal')
+FAKE_MODEL_LATENCY_SPREAD = float(os.getenv('FAKE_MODEL_LATENCY_SPREAD', 0.5))
+FAKE_MODEL_TOKENS_PER_SECOND = float(os.getenv('FAKE_MODEL_TOKENS_PER_SECOND', 100))
+FAKE_MODEL_OUTPUT_TOKENS = int(os.getenv('FAKE_MODEL_OUTPUT_TOKENS', 500))
+FAKE_MODEL_ERROR_RATE = float(os.getenv('FAKE_MODEL_ERROR_RATE', 0.0))
+FAKE_MODEL_RATE_LIMIT_RATE = float(os.getenv('FAKE_MODEL_RATE_LIMIT_RATE', 0.0))
+FAKE_MODEL_SEED = int(os.getenv('FAKE_MODEL_SEED', 0))
+
+# The Gemini client connects lazily on first use. When enabled, a cheap
+# model-metadata request runs in the background at startup so a bad key or
+# network problem is reported before the first report is generated.
+GEMINI_HEALTH_CHECK = os.getenv('GEMINI_HEALTH_CHECK', 'true').lower() in ('1', 'true', 'yes')
+
+# Client-side API quota shared by interactive and batch generation
+GEMINI_REQUESTS_PER_MINUTE = float(os.getenv('GEMINI_REQUESTS_PER_MINUTE', 15))
+GEMINI_TOKENS_PER_MINUTE = float(os.getenv('GEMINI_TOKENS_PER_MINUTE', 1_000_000))
+# Batch generation: requests in flight and retries on 429/5xx errors
+GEMINI_BATCH_CONCURRENCY = int(os.getenv('GEMINI_BATCH_CONCURRENCY', 4))
+GEMINI_MAX_RETRIES = int(os.getenv('GEMINI_MAX_RETRIES', 4))
+
+# Reports are generated by background workers that take jobs from a
+# persistent queue, so a refresh or restart does not lose them. Each user may
+# have JOB_MAX_PER_USER jobs running and JOB_MAX_QUEUED_PER_USER waiting.
+JOB_QUEUE_ENABLED = os.getenv('JOB_QUEUE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+JOB_QUEUE_FILE = DATA_DIR / 'jobs.db'
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+JOB_MAX_PER_USER = int(os.getenv('JOB_MAX_PER_USER', 1))
+JOB_MAX_QUEUED_PER_USER = int(os.getenv('JOB_MAX_QUEUED_PER_USER', 5))
+# A running job whose worker has not renewed its lease for this long is
+# handed to another worker; after JOB_MAX_ATTEMPTS attempts it is failed
+JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', 60))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+JOB_RETENTION_DAYS = float(os.getenv('JOB_RETENTION_DAYS', 7))
+
+# Headless batch command (python -m src.report_generator.cli): reports saved
+# per write, and the record of inputs (by content hash) that have a report
+BATCH_SAVE_SIZE = int(os.getenv('BATCH_SAVE_SIZE', 20))
+BATCH_PROCESSED_FILE = DATA_DIR / 'batch_processed.jsonl'
+
+# HTTP API (python -m src.report_generator.api_server). Requests beyond
+# API_MAX_REQUESTS in flight, streamed generations beyond
+# API_MAX_GENERATIONS and jobs beyond API_MAX_QUEUE_DEPTH get 429.
+API_HOST = os.getenv('API_HOST', '127.0.0.1')
+API_PORT = int(os.getenv('API_PORT', 8600))
+API_MAX_REQUESTS = int(os.getenv('API_MAX_REQUESTS', 64))
+API_MAX_GENERATIONS = int(os.getenv('API_MAX_GENERATIONS', GEMINI_BATCH_CONCURRENCY))
+API_MAX_QUEUE_DEPTH = int(os.getenv('API_MAX_QUEUE_DEPTH', 100))
+API_MAX_UPLOAD_BYTES = int(os.getenv('API_MAX_UPLOAD_BYTES', 64 * 1024 * 1024))
+API_KEEP_ALIVE_SECONDS = int(os.getenv('API_KEEP_ALIVE_SECONDS', 15))
+
+# Inputs larger than SUMMARY_MAX_INPUT_TOKENS are split into chunks of
+# SUMMARY_CHUNK_TOKENS, summarized in parallel and merged before the final
+# report is generated. Partial summaries are cached by content hash.
+SUMMARY_MAX_INPUT_TOKENS = int(os.getenv('SUMMARY_MAX_INPUT_TOKENS', 32000))
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', 8000))
+SUMMARY_OUTPUT_TOKENS = int(os.getenv('SUMMARY_OUTPUT_TOKENS', 1024))
+SUMMARY_CACHE_DIR = DATA_DIR / 'summary_cache'
+SUMMARY_CACHE_TTL = float(os.getenv('SUMMARY_CACHE_TTL', 30 * 24 * 60 * 60))
+
+# Cache of model responses keyed by prompt, model and generation settings.
+# Identical requests within the TTL are answered without calling the API.
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+RESPONSE_CACHE_DIR = DATA_DIR / 'response_cache'
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', 24 * 60 * 60))
+RESPONSE_CACHE_MAX_MEMORY_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_MEMORY_BYTES', 32 * 1024 * 1024))
+# Expired entries of the response and summary caches are deleted from disk at
+# startup and then every RESPONSE_CACHE_PRUNE_INTERVAL seconds (0 disables)
+RESPONSE_CACHE_PRUNE_INTERVAL = float(os.getenv('RESPONSE_CACHE_PRUNE_INTERVAL', 60 * 60))
+
 # Report settings
 DEFAULT_REPORT_TEMPLATE = 'default.md'
 REPORT_HISTORY_FILE = DATA_DIR / 'report_history.json'
 
+# Report storage backend ('json', 'journal' or 'sqlite'). The journal and
+# SQLite backends migrate an existing REPORT_HISTORY_FILE on first start.
+REPORT_STORAGE_BACKEND = os.getenv('REPORT_STORAGE_BACKEND', 'journal')
+# Keep generated report content compressed in a separate body store so
+# listing reports only touches the compact metadata
+REPORT_SPLIT_BODIES = os.getenv('REPORT_SPLIT_BODIES', 'true').lower() in ('1', 'true', 'yes')
+
+# Full-text search index over report titles and content
+REPORT_SEARCH_ENABLED = os.getenv('REPORT_SEARCH_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Writes arriving within REPORT_GROUP_COMMIT_MS share one fsync (0 disables)
+REPORT_GROUP_COMMIT_MS = float(os.getenv('REPORT_GROUP_COMMIT_MS', 2))
+REPORT_STORAGE_OPTIONS = {
+    'json': {
+        'group_commit_ms': REPORT_GROUP_COMMIT_MS,
+    },
+    'journal': {
+        'segment_max_bytes': int(os.getenv('REPORT_JOURNAL_SEGMENT_BYTES', 4 * 1024 * 1024)),
+        'compact_ratio': float(os.getenv('REPORT_JOURNAL_COMPACT_RATIO', 0.5)),
+        'group_commit_ms': REPORT_GROUP_COMMIT_MS,
+    },
+}
+
 # UI Settings
 DEFAULT_THEME = 'light'
 THEMES = {
@@ -42,7 +182,45 @@ THEMES = {
     }
 }
 
-# Logging configuration
+# Timing spans around each phase of a Streamlit rerun and the file, storage
+# and model calls it makes. The last INSTRUMENTATION_BUFFER_SIZE spans are
+# kept in memory; totals are served in the Prometheus text format on
+# METRICS_PORT (0 disables the endpoint) and on the HTTP API's /metrics.
+INSTRUMENTATION_ENABLED = os.getenv('INSTRUMENTATION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+INSTRUMENTATION_BUFFER_SIZE = int(os.getenv('INSTRUMENTATION_BUFFER_SIZE', 4096))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+# Reruns slower than PROFILE_SLOW_RERUN_MS are sampled and their stacks
+# written to PROFILE_DIR in the collapsed (flame graph) format; 0 disables
+PROFILE_SLOW_RERUN_MS = float(os.getenv('PROFILE_SLOW_RERUN_MS', 0))
+PROFILE_DIR = LOG_DIR / 'profiles'
+# Show the timings of the previous rerun in the sidebar (also with ?debug=1)
+DEBUG_PANEL = os.getenv('DEBUG_PANEL', 'false').lower() in ('1', 'true', 'yes')
+
+# Logging. Records are written by a background thread (see logging_utils),
+# to logs/app.log as one JSON object per line (LOG_FILE_FORMAT 'text' for
+# the plain format) and to the console. The file is rotated at
+# LOG_MAX_BYTES, or at LOG_ROTATE_WHEN ('midnight', 'H', ...) when set,
+# keeping LOG_BACKUP_COUNT gzipped files.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FILE_FORMAT = os.getenv('LOG_FILE_FORMAT', 'json').lower()
+LOG_MAX_BYTES = int(os.getenv('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_ROTATE_WHEN = os.getenv('LOG_ROTATE_WHEN', '')
+LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', 10))
+LOG_COMPRESS = os.getenv('LOG_COMPRESS', 'true').lower() in ('1', 'true', 'yes')
+# Fraction of DEBUG records kept when LOG_LEVEL is above DEBUG, so debug
+# logging of busy paths can stay on without flooding the disk (0 disables)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', 0))
+# Records waiting to be written; beyond this they are dropped, not waited on
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+
+if LOG_ROTATE_WHEN:
+    _LOG_ROTATION = {'class': 'logging.handlers.TimedRotatingFileHandler', 'when': LOG_ROTATE_WHEN}
+else:
+    _LOG_ROTATION = {'class': 'logging.handlers.RotatingFileHandler', 'maxBytes': LOG_MAX_BYTES}
+
+# Logging configuration (applied by logging_utils.configure_logging, which
+# also defines the 'json' formatter)
 LOGGING_CONFIG = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -53,9 +231,11 @@ LOGGING_CONFIG = {
     },
     'handlers': {
         'file': {
-            'class': 'logging.FileHandler',
-            'filename': LOG_DIR / 'app.log',
-            'formatter': 'standard',
+            **_LOG_ROTATION,
+            'filename': str(LOG_DIR / 'app.log'),
+            'backupCount': LOG_BACKUP_COUNT,
+            'encoding': 'utf-8',
+            'formatter': 'json' if LOG_FILE_FORMAT == 'json' else 'standard',
         },
         'console': {
             'class': 'logging.StreamHandler',
@@ -65,7 +245,7 @@ LOGGING_CONFIG = {
     'loggers': {
         '': {
             'handlers': ['file', 'console'],
-            'level': 'INFO',
+            'level': LOG_LEVEL,
             'propagate': True
         },
     },
@@ -0,0 +1,199 @@
+import re
+import zipfile
+from pathlib import Path
+from typing import List, Dict, Iterator, Tuple, Union, BinaryIO
+from xml.etree import ElementTree
+import logging
+
+logger = logging.getLogger(__name__)
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+_HEADING_STYLE = re.compile(r'^(?:heading|berschrift|titre)\s*(\d)$', re.IGNORECASE)
+_LIST_STYLE = re.compile(r'^list(bullet|number)(\d?)$', re.IGNORECASE)
+
+
+def _numbering_formats(archive: zipfile.ZipFile) -> Dict[Tuple[str, str], str]:
+    """Map (numId, ilvl) to its number format ('bullet', 'decimal', ...)"""
+    try:
+        data = archive.read('word/numbering.xml')
+    except KeyError:
+        return {}
+    root = ElementTree.fromstring(data)
+    abstract_formats: Dict[str, Dict[str, str]] = {}
+    for abstract in root.iter(f'{_W}abstractNum'):
+        levels = {}
+        for level in abstract.iter(f'{_W}lvl'):
+            fmt = level.find(f'{_W}numFmt')
+            levels[level.get(f'{_W}ilvl')] = fmt.get(f'{_W}val') if fmt is not None else 'decimal'
+        abstract_formats[abstract.get(f'{_W}abstractNumId')] = levels
+
+    formats = {}
+    for num in root.iter(f'{_W}num'):
+        abstract_id = num.find(f'{_W}abstractNumId')
+        if abstract_id is None:
+            continue
+        for ilvl, fmt in abstract_formats.get(abstract_id.get(f'{_W}val'), {}).items():
+            formats[(num.get(f'{_W}numId'), ilvl)] = fmt
+    return formats
+
+
+def _text(element: ElementTree.Element) -> str:
+    """Visible text of a paragraph or cell, skipping compatibility fallbacks"""
+    parts = []
+    for child in element:
+        tag = child.tag
+        if tag == f'{_W}t':
+            parts.append(child.text or '')
+        elif tag == f'{_W}tab':
+            parts.append('\t')
+        elif tag in (f'{_W}br', f'{_W}cr'):
+            parts.append('\n')
+        elif tag == f'{_W}noBreakHyphen':
+            parts.append('-')
+        elif tag == f'{_W}p':
+            parts.append(_text(child) + '\n')
+        elif tag != _MC_FALLBACK:
+            parts.append(_text(child))
+    return ''.join(parts)
+
+
+def _paragraph(paragraph: ElementTree.Element, numbering: Dict[Tuple[str, str], str]) -> str:
+    """Render a paragraph as a Markdown heading, list item or plain text"""
+    text = _text(paragraph)
+    properties = paragraph.find(f'{_W}pPr')
+    if properties is None:
+        return text
+
+    style = properties.find(f'{_W}pStyle')
+    style = style.get(f'{_W}val', '') if style is not None else ''
+    if style.lower() == 'title':
+        return f"# {text}" if text else text
+    heading = _HEADING_STYLE.match(style)
+    if heading and text:
+        return f"{'#' * min(int(heading.group(1)), 6)} {text}"
+
+    num = properties.find(f'{_W}numPr')
+    if num is not None:
+        num_id = num.find(f'{_W}numId')
+        ilvl = num.find(f'{_W}ilvl')
+        num_id = num_id.get(f'{_W}val') if num_id is not None else None
+        level = ilvl.get(f'{_W}val', '0') if ilvl is not None else '0'
+        if num_id and num_id != '0':
+            marker = '-' if numbering.get((num_id, level), 'bullet') in ('bullet', 'none') else '1.'
+            return f"{'  ' * int(level)}{marker} {text}"
+
+    list_style = _LIST_STYLE.match(style)
+    if list_style:
+        level = max(int(list_style.group(2) or 1) - 1, 0)
+        marker = '-' if list_style.group(1).lower() == 'bullet' else '1.'
+        return f"{'  ' * level}{marker} {text}"
+    return text
+
+
+def _cell_text(text: str) -> str:
+    return ' '.join(text.split()).replace('|', '\\|')
+
+
+def _table(table: ElementTree.Element) -> str:
+    """Render a table as a Markdown table, its first row as the header"""
+    rows: List[List[str]] = []
+    nested = _nested_rows(table)
+    for row in table.iter(f'{_W}tr'):
+        if row in nested:
+            continue
+        cells = []
+        for cell in row.findall(f'{_W}tc'):
+            properties = cell.find(f'{_W}tcPr')
+            span = 1
+            continued = False
+            if properties is not None:
+                grid_span = properties.find(f'{_W}gridSpan')
+                if grid_span is not None:
+                    span = int(grid_span.get(f'{_W}val', '1'))
+                merge = properties.find(f'{_W}vMerge')
+                continued = merge is not None and merge.get(f'{_W}val') != 'restart'
+            cells.append('' if continued else _cell_text(_text(cell)))
+            cells.extend([''] * (span - 1))
+        rows.append(cells)
+
+    if not rows:
+        return ''
+    width = max(len(row) for row in rows)
+    rows = [row + [''] * (width - len(row)) for row in rows]
+    lines = ['| ' + ' | '.join(rows[0]) + ' |', '|' + '---|' * width]
+    lines += ['| ' + ' | '.join(row) + ' |' for row in rows[1:]]
+    return '\n'.join(lines)
+
+
+def _nested_rows(table: ElementTree.Element) -> set:
+    """Rows belonging to tables nested in cells, rendered as cell text instead"""
+    nested = set()
+    for cell in table.iter(f'{_W}tc'):
+        for inner in cell.findall(f'{_W}tbl'):
+            nested.update(inner.iter(f'{_W}tr'))
+    return nested
+
+
+def _blocks(element: ElementTree.Element, numbering: Dict[Tuple[str, str], str]) -> Iterator[str]:
+    tag = element.tag
+    if tag == f'{_W}p':
+        yield _paragraph(element, numbering)
+    elif tag == f'{_W}tbl':
+        table = _table(element)
+        if table:
+            # Blank lines around tables so they render as Markdown
+            yield f"\n{table}\n"
+    elif tag == f'{_W}sdt':
+        content = element.find(f'{_W}sdtContent')
+        for child in (content if content is not None else []):
+            yield from _blocks(child, numbering)
+
+
+def iter_docx_blocks(file_path: Union[str, Path, BinaryIO]) -> Iterator[str]:
+    """
+    Yield the blocks of a Word document in document order
+
+    ``word/document.xml`` is parsed incrementally straight from the zip and
+    each top-level paragraph or table is released once rendered, so memory
+    is bounded by the largest single block rather than the document.
+    Headings become Markdown headings, list paragraphs become list items and
+    tables become Markdown tables.
+
+    Args:
+        file_path: Path to the .docx file, or a binary file object
+
+    Yields:
+        One string per paragraph or table
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        numbering = _numbering_formats(archive)
+        with archive.open('word/document.xml') as stream:
+            depth = 0
+            body = None
+            for event, element in ElementTree.iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and element.tag == f'{_W}body':
+                        body = element
+                    continue
+                depth -= 1
+                if depth == 2 and body is not None:
+                    yield from _blocks(element, numbering)
+                    # Children end before the next one starts, so this only
+                    # drops blocks that were already rendered
+                    body.clear()
+
+
+def extract_docx_text(file_path: Union[str, Path, BinaryIO]) -> str:
+    """
+    Extract the text of a Word document as Markdown
+
+    Args:
+        file_path: Path to the .docx file, or a binary file object
+
+    Returns:
+        Paragraphs one per line, with headings, lists and tables in Markdown
+    """
+    return '\n'.join(iter_docx_blocks(file_path))
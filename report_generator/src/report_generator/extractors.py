@@ -0,0 +1,321 @@
+import codecs
+import io
+import mmap
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, NamedTuple, Sequence, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Cost classes, used by FileProcessor to route a file to an executor
+CHEAP = 'cheap'            # I/O or C-level parsing: thread pool
+CPU_HEAVY = 'cpu'          # pure-Python parsing: process pool
+MEMORY_HEAVY = 'memory'    # loads the whole document: one at a time
+
+# Bytes read from the start of a file to recognise its format and encoding
+SNIFF_BYTES = 64 * 1024
+
+# Byte order marks, longest first since the UTF-32 LE mark starts with UTF-16's
+_BOMS = (
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+Source = Union[Path, bytes]
+
+
+class UnsupportedFileError(ValueError):
+    """Raised when a file's content cannot be extracted by any extractor"""
+
+
+class FileTooLargeError(ValueError):
+    """Raised when a file exceeds the size limit of its extractor"""
+
+
+class Extractor(NamedTuple):
+    """
+    A format extractor.
+
+    ``extract(source, name, **options)`` receives a Path or the file's bytes
+    and returns its text; options it does not use are ignored. A file is
+    handled by an extractor when its content starts with one of ``magic``,
+    or, for extractors without magic bytes, when its suffix matches.
+    """
+    name: str
+    extract: Callable[..., str]
+    suffixes: Tuple[str, ...] = ()
+    magic: Tuple[bytes, ...] = ()
+    cost: str = CHEAP
+    max_bytes: Optional[int] = None
+
+
+class ExtractorRegistry:
+    """Chooses the extractor for a file by its suffix and magic bytes"""
+
+    def __init__(self, fallback: Optional[Extractor] = None):
+        """
+        Initialize an empty registry
+
+        Args:
+            fallback: Extractor for files no registered extractor claims
+        """
+        self.fallback = fallback
+        self._extractors: List[Extractor] = []
+        self._by_suffix: Dict[str, Extractor] = {}
+
+    def register(self, extractor: Extractor) -> Extractor:
+        """Add an extractor; later registrations win for a shared suffix"""
+        self._extractors.append(extractor)
+        for suffix in extractor.suffixes:
+            self._by_suffix[suffix.lower()] = extractor
+        return extractor
+
+    def for_suffix(self, suffix: str) -> Optional[Extractor]:
+        """Return the extractor registered for a file extension"""
+        return self._by_suffix.get(suffix.lower())
+
+    def cost(self, suffix: str) -> str:
+        """Return the cost class of a file, judged by its extension"""
+        extractor = self.for_suffix(suffix) or self.fallback
+        return extractor.cost if extractor is not None else CHEAP
+
+    def suffixes(self) -> List[str]:
+        """Return every registered file extension"""
+        return sorted(self._by_suffix)
+
+    def select(self, suffix: str, head: bytes) -> Extractor:
+        """
+        Choose the extractor for a file
+
+        Magic bytes take precedence over the suffix, so a PDF saved as
+        .txt is still read as a PDF, while a .pdf that is not one is rejected
+        instead of being handed to the PDF parser.
+
+        Args:
+            suffix: File extension
+            head: First bytes of the file
+
+        Returns:
+            The matching extractor
+        """
+        by_suffix = self.for_suffix(suffix)
+        by_magic = [
+            extractor for extractor in self._extractors
+            if any(head.startswith(magic) for magic in extractor.magic)
+        ]
+        if by_suffix is not None and (by_suffix in by_magic or not (by_suffix.magic or by_magic)):
+            return by_suffix
+        if len(by_magic) == 1:
+            if by_suffix is not None:
+                logger.info(f"Content of {suffix} file is {by_magic[0].name}; extracting it as such")
+            return by_magic[0]
+        if by_magic:
+            raise UnsupportedFileError(
+                f"Cannot tell the format of a {suffix or 'suffixless'} file "
+                f"({' or '.join(extractor.name for extractor in by_magic)})"
+            )
+        if by_suffix is not None:
+            raise UnsupportedFileError(f"Content is not a valid {by_suffix.name} file")
+        if self.fallback is None:
+            raise UnsupportedFileError(f"No extractor for {suffix or 'suffixless'} files")
+        return self.fallback
+
+    def extract(
+        self,
+        source: Source,
+        suffix: str,
+        name: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        **options: Any
+    ) -> str:
+        """
+        Extract text with the extractor chosen for a file
+
+        Sizes are checked before any content is parsed: against max_bytes
+        first, then against the chosen extractor's own limit.
+
+        Args:
+            source: Path of the file, or its bytes
+            suffix: File extension
+            name: File name used in messages and digests
+            max_bytes: Size limit for any file (None for no limit)
+            **options: Passed to the extractor (progress, max_pages, ...)
+
+        Returns:
+            Extracted text as a string
+        """
+        name = name or (source.name if isinstance(source, Path) else f"upload{suffix}")
+        size = source.stat().st_size if isinstance(source, Path) else len(source)
+        _check_size(name, size, max_bytes)
+
+        extractor = self.select(suffix, read_head(source))
+        _check_size(name, size, extractor.max_bytes)
+        return extractor.extract(source, name, **options)
+
+
+def _check_size(name: str, size: int, limit: Optional[int]) -> None:
+    if limit is not None and size > limit:
+        raise FileTooLargeError(
+            f"{name} is {size / 1024 / 1024:.1f} MB, over the {limit / 1024 / 1024:.0f} MB limit"
+        )
+
+
+def read_head(source: Source, size: int = SNIFF_BYTES) -> bytes:
+    """Return the first bytes of a file or of in-memory content"""
+    if isinstance(source, Path):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    return bytes(source[:size])
+
+
+def open_source(source: Source) -> Union[Path, io.BytesIO]:
+    """Return a path as-is, or a file object over in-memory content"""
+    # BytesIO shares the bytes object instead of copying it until written to
+    return source if isinstance(source, Path) else io.BytesIO(source)
+
+
+def sniff_encoding(head: bytes, candidates: Sequence[str] = ('utf-8', 'cp1252')) -> str:
+    """
+    Guess the encoding of text from its first bytes
+
+    A byte order mark decides outright. Otherwise each candidate's
+    incremental decoder is fed the head, which tolerates a multi-byte
+    character cut off at its end; the first that accepts it wins, with
+    latin-1 (which accepts anything) as the last resort.
+
+    Args:
+        head: First bytes of the text
+        candidates: Encodings to try, in order of preference
+
+    Returns:
+        Name of the encoding
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    if b'\x00' in head:
+        raise UnsupportedFileError("Content looks binary, not text")
+    for encoding in candidates:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(head, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+
+def decode_text(data: Any, candidates: Sequence[str] = ('utf-8', 'cp1252')) -> str:
+    """
+    Decode a bytes-like object (bytes, mmap) with a sniffed encoding
+
+    If the rest of the text turns out not to match the encoding sniffed
+    from its head, the next candidate is tried.
+    """
+    encoding = sniff_encoding(bytes(data[:SNIFF_BYTES]), candidates)
+    later = list(candidates[list(candidates).index(encoding) + 1:]) if encoding in candidates else []
+    for encoding in [encoding] + later:
+        try:
+            return str(data, encoding)
+        except UnicodeDecodeError as e:
+            logger.info(f"Text is not {encoding} at byte {e.start}; trying the next encoding")
+    return str(data, 'latin-1')
+
+
+def extract_plain_text(source: Source, name: str, **options: Any) -> str:
+    """Decode a text file; large files are decoded from a memory map"""
+    from .config import TEXT_ENCODINGS, TEXT_MMAP_MIN_BYTES
+    if not isinstance(source, Path):
+        return decode_text(source, TEXT_ENCODINGS)
+    with open(source, 'rb') as f:
+        size = f.seek(0, io.SEEK_END)
+        f.seek(0)
+        if size < TEXT_MMAP_MIN_BYTES:
+            return decode_text(f.read(), TEXT_ENCODINGS)
+        # Decoding from the page cache avoids holding a bytes copy of
+        # the file next to the decoded text
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode_text(mapped, TEXT_ENCODINGS)
+
+
+def extract_docx(source: Source, name: str, **options: Any) -> str:
+    """Extract paragraphs, lists and tables from a Word document, streaming its XML"""
+    from .docx_extraction import extract_docx_text
+    return extract_docx_text(open_source(source))
+
+
+def extract_excel(source: Source, name: str, **options: Any) -> str:
+    """Profile every sheet of an Excel file, streaming its rows"""
+    from .config import TABLE_CHUNK_ROWS, TABLE_SAMPLE_ROWS
+    from .table_extraction import describe_excel
+    return describe_excel(
+        open_source(source), name=name,
+        chunksize=TABLE_CHUNK_ROWS, sample_rows=TABLE_SAMPLE_ROWS
+    )
+
+
+def extract_csv(source: Source, name: str, **options: Any) -> str:
+    """Profile a CSV file chunk by chunk"""
+    from .config import TABLE_CHUNK_ROWS, TABLE_SAMPLE_ROWS
+    from .table_extraction import describe_csv
+    return describe_csv(
+        open_source(source), name=name,
+        chunksize=TABLE_CHUNK_ROWS, sample_rows=TABLE_SAMPLE_ROWS
+    )
+
+
+def extract_pdf(
+    source: Source,
+    name: str,
+    progress: Optional[Callable[[int, int], None]] = None,
+    max_pages: Optional[int] = None,
+    pdf_workers: Optional[int] = None,
+    **options: Any
+) -> str:
+    """Extract text from PDF files, page ranges in parallel"""
+    try:
+        from .pdf_extraction import extract_pdf_text
+    except ImportError:
+        logger.warning("PyPDF2 is required for PDF processing. Install with: pip install PyPDF2")
+        return ""
+    return extract_pdf_text(source, max_pages=max_pages, workers=pdf_workers, progress=progress)
+
+
+def build_default_registry() -> ExtractorRegistry:
+    """Return a registry of the built-in extractors with configured size limits"""
+    from .config import EXTRACT_MAX_BYTES
+
+    registry = ExtractorRegistry(
+        fallback=Extractor('text', extract_plain_text, max_bytes=EXTRACT_MAX_BYTES['text'])
+    )
+    registry.register(Extractor(
+        'text', extract_plain_text, suffixes=('.txt', '.md', '.markdown'),
+        max_bytes=EXTRACT_MAX_BYTES['text']
+    ))
+    registry.register(Extractor(
+        'CSV', extract_csv, suffixes=('.csv',), max_bytes=EXTRACT_MAX_BYTES['csv']
+    ))
+    registry.register(Extractor(
+        'Word document', extract_docx, suffixes=('.docx',), magic=(b'PK\x03\x04',),
+        max_bytes=EXTRACT_MAX_BYTES['docx']
+    ))
+    registry.register(Extractor(
+        'Excel workbook', extract_excel, suffixes=('.xlsx',), magic=(b'PK\x03\x04',),
+        cost=CPU_HEAVY, max_bytes=EXTRACT_MAX_BYTES['xlsx']
+    ))
+    registry.register(Extractor(
+        'legacy Excel workbook', extract_excel, suffixes=('.xls',),
+        magic=(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+        cost=MEMORY_HEAVY, max_bytes=EXTRACT_MAX_BYTES['xls']
+    ))
+    registry.register(Extractor(
+        'PDF', extract_pdf, suffixes=('.pdf',), magic=(b'%PDF-',),
+        cost=CPU_HEAVY, max_bytes=EXTRACT_MAX_BYTES['pdf']
+    ))
+    return registry
+
+
+# Registry used by FileProcessor unless it is given another one
+default_registry = build_default_registry()
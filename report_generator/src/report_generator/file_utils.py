@@ -1,22 +1,188 @@
-import os
+import multiprocessing
 import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Union, Dict, Any, Optional
+from typing import Union, Dict, Any, Optional, Callable, List, Sequence
 import logging
-import docx
-import pandas as pd
+
+from .batch_extraction import ExtractionResult, extract_timed
+from .extractors import CPU_HEAVY, MEMORY_HEAVY, ExtractorRegistry, default_registry
+from .upload_store import UploadStore
 
 logger = logging.getLogger(__name__)
 
 class FileProcessor:
     """Handles file uploads and processing"""
     
-    SUPPORTED_EXTENSIONS = [
-        '.txt', '.md', '.markdown',  # Text files
-        '.docx',  # Word documents
-        '.csv', '.xlsx', '.xls',  # Spreadsheets
-        '.pdf'  # PDF files (requires additional dependencies)
-    ]
+    # Text, Word, spreadsheet and PDF files; see extractors.build_default_registry
+    SUPPORTED_EXTENSIONS = default_registry.suffixes()
+    
+    # Bump an extractor's version when its output changes so cached text
+    # extracted by the old version is not reused
+    EXTRACTOR_VERSIONS = {
+        '.docx': 2,
+        '.csv': 2,
+        '.xlsx': 2,
+        '.xls': 2,
+        '.pdf': 2,
+    }
+    DEFAULT_EXTRACTOR_VERSION = 1
+    
+    def __init__(
+        self,
+        store: Optional[UploadStore] = None,
+        pdf_max_pages: Optional[int] = None,
+        spool_max_bytes: Optional[int] = 32 * 1024 * 1024,
+        registry: Optional[ExtractorRegistry] = None
+    ):
+        """
+        Initialize the file processor
+        
+        Args:
+            store: Content-addressed store used by extract_upload to skip
+                parsing files it has already seen
+            pdf_max_pages: Only extract the first pages of uploaded PDFs
+            spool_max_bytes: Uploads up to this size are extracted straight
+                from memory; larger ones are written to disk first (None
+                keeps every upload in memory)
+            registry: Extractors to choose from (defaults to the built-in
+                ones); extract functions must be importable module-level
+                functions for files routed to the process pool
+        """
+        self.store = store
+        self.pdf_max_pages = pdf_max_pages
+        self.spool_max_bytes = spool_max_bytes
+        self.registry = registry or default_registry
+    
+    @classmethod
+    def extractor_version(cls, suffix: str) -> str:
+        """Return the cache version tag of the extractor for a file extension"""
+        suffix = suffix.lower()
+        version = cls.EXTRACTOR_VERSIONS.get(suffix, cls.DEFAULT_EXTRACTOR_VERSION)
+        return f"{suffix.lstrip('.') or 'txt'}-v{version}"
+    
+    def extract_upload(
+        self,
+        uploaded_file,
+        directory: Union[str, Path, None] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> str:
+        """
+        Extract the text of an uploaded file, reusing earlier work
+        
+        The upload is parsed from the bytes already in memory; only uploads
+        larger than spool_max_bytes are written to disk and parsed from
+        there. With a store, identical content is only parsed once; later
+        calls cost one SHA-256 of the bytes.
+        
+        Args:
+            uploaded_file: File object from Streamlit's file_uploader
+            directory: Where to spill large files when no store is configured
+            progress: Called as progress(done, total) while pages are extracted
+            
+        Returns:
+            Extracted text as a string
+        """
+        digest, version, text, source = self._prepare_upload(uploaded_file, directory)
+        if text is not None:
+            return text
+        
+        suffix = Path(uploaded_file.name).suffix
+        text = self.extract_source(
+            source, suffix, name=uploaded_file.name, progress=progress,
+            max_pages=self.pdf_max_pages, registry=self.registry
+        )
+        if text and digest is not None:
+            self.store.put_text(digest, version, text)
+        return text
+    
+    def _prepare_upload(self, uploaded_file, directory: Union[str, Path, None] = None) -> tuple:
+        """Return (digest, version, cached text, source) for an upload. The
+        source is the upload's bytes, or the path it was spilled to when it
+        is too large to parse in memory; it is None when text was cached."""
+        # getvalue() of an in-memory upload shares its buffer rather than copying it
+        data = uploaded_file.getvalue()
+        suffix = Path(uploaded_file.name).suffix.lower()
+        digest = version = None
+        if self.store is not None:
+            digest = self.store.hash_bytes(data)
+            version = self.extractor_version(suffix)
+            if suffix == '.pdf' and self.pdf_max_pages:
+                version += f"-first{self.pdf_max_pages}"
+            text = self.store.get_text(digest, version)
+            if text is not None:
+                return digest, version, text, None
+        
+        if self.spool_max_bytes is None or len(data) <= self.spool_max_bytes:
+            return digest, version, None, data
+        if self.store is not None:
+            return digest, version, None, self.store.put(data, suffix, digest=digest)
+        return digest, version, None, self.save_uploaded_file(uploaded_file, directory or 'uploads')
+    
+    def extract_uploads(
+        self,
+        uploaded_files: Sequence[Any],
+        directory: Union[str, Path, None] = None,
+        max_workers: int = 4,
+        progress: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[ExtractionResult]:
+        """
+        Extract several uploaded files concurrently
+        
+        Uploads whose text is already in the store are answered from it;
+        the rest are extracted as one batch (see extract_batch) and their
+        text is cached.
+        
+        Args:
+            uploaded_files: File objects from Streamlit's file_uploader
+            directory: Where to spill large files when no store is configured
+            max_workers: Maximum number of files extracted at once
+            progress: Called as progress(done, total, name) after each file
+            
+        Returns:
+            ExtractionResult per upload, in upload order
+        """
+        results: List[Optional[ExtractionResult]] = [None] * len(uploaded_files)
+        pending = []  # (index, source, digest, version)
+        for index, uploaded_file in enumerate(uploaded_files):
+            start = time.perf_counter()
+            try:
+                digest, version, text, source = self._prepare_upload(uploaded_file, directory)
+            except Exception as e:
+                results[index] = ExtractionResult(
+                    index, uploaded_file.name, None, e, time.perf_counter() - start
+                )
+                continue
+            if text is not None:
+                results[index] = ExtractionResult(
+                    index, uploaded_file.name, text, None, time.perf_counter() - start, cached=True
+                )
+            else:
+                pending.append((index, source, digest, version))
+        
+        done = 0
+        if progress is not None:
+            for result in results:
+                if result is not None:
+                    done += 1
+                    progress(done, len(uploaded_files), result.name)
+        
+        batch = self._extract_concurrently(
+            [
+                (uploaded_files[index].name, Path(uploaded_files[index].name).suffix.lower(), source)
+                for index, source, _, _ in pending
+            ],
+            max_workers,
+            progress and (
+                lambda batch_done, _, name: progress(done + batch_done, len(uploaded_files), name)
+            )
+        )
+        for (index, _, digest, version), result in zip(pending, batch):
+            if result.ok and result.text and digest is not None:
+                self.store.put_text(digest, version, result.text)
+            results[index] = result._replace(index=index)
+        return results
     
     @staticmethod
     def save_uploaded_file(uploaded_file, directory: Union[str, Path]) -> Path:
@@ -52,73 +218,194 @@ class FileProcessor:
             logger.error(f"Failed to save uploaded file: {str(e)}")
             raise
     
+    def extract_batch(
+        self,
+        file_paths: Sequence[Union[str, Path]],
+        names: Optional[Sequence[str]] = None,
+        max_workers: int = 4,
+        progress: Optional[Callable[[int, int, str], None]] = None
+    ) -> List[ExtractionResult]:
+        """
+        Extract several files concurrently
+        
+        Files are routed by the cost class of their extractor. When a batch
+        holds more than one CPU-heavy file (PDF, .xlsx), those are extracted
+        in a process pool, one file per process (in-memory uploads are
+        spilled to a temporary file first); memory-heavy ones (.xls)
+        run one at a time; everything else is extracted on a thread pool,
+        where parsing mostly waits on I/O or runs in C. A file that fails is
+        returned with its error rather than failing the batch.
+        
+        Args:
+            file_paths: Files to extract
+            names: Names reported for the files (defaults to their file names)
+            max_workers: Maximum number of files extracted at once per pool
+            progress: Called as progress(done, total, name) after each file,
+                from the calling thread
+            
+        Returns:
+            ExtractionResult per file, in input order; merge_extractions
+            combines them under per-file headings
+        """
+        paths = [Path(path) for path in file_paths]
+        names = list(names) if names is not None else [path.name for path in paths]
+        return self._extract_concurrently(
+            [(name, path.suffix.lower(), path) for name, path in zip(names, paths)],
+            max_workers,
+            progress
+        )
+    
+    def _extract_concurrently(
+        self,
+        items: List[tuple],
+        max_workers: int,
+        progress: Optional[Callable[[int, int, str], None]]
+    ) -> List[ExtractionResult]:
+        """Extract (name, suffix, source) items, routed by the cost class of
+        their extractor: several CPU-heavy files go to a process pool,
+        memory-heavy ones run one at a time and the rest on threads"""
+        costs = [self.registry.cost(suffix) for _, suffix, _ in items]
+        heavy = [i for i, cost in enumerate(costs) if cost == CPU_HEAVY]
+        if len(heavy) < 2 or max_workers < 2:
+            heavy = []
+        large = [i for i, cost in enumerate(costs) if cost == MEMORY_HEAVY]
+        light = sorted(set(range(len(items))) - set(heavy) - set(large))
+        results: List[Optional[ExtractionResult]] = [None] * len(items)
+        if not items:
+            return results
+        
+        # Workers get paths rather than the bytes of in-memory uploads, which
+        # would otherwise be pickled whole through the pool's pipe
+        spill_dir = None
+        if any(isinstance(items[i][2], bytes) for i in heavy):
+            spill_dir = tempfile.TemporaryDirectory(prefix='extract-')
+            items = list(items)
+            for i in heavy:
+                name, suffix, source = items[i]
+                if isinstance(source, bytes):
+                    path = Path(spill_dir.name) / f"{i}{suffix}"
+                    path.write_bytes(source)
+                    items[i] = (name, suffix, path)
+        
+        thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        memory_pool = ThreadPoolExecutor(max_workers=1) if large else None
+        # Spawned rather than forked: the caller is usually the multi-threaded
+        # Streamlit or API server, whose locks a forked child could inherit held
+        process_pool = ProcessPoolExecutor(
+            max_workers=min(max_workers, len(heavy)),
+            mp_context=multiprocessing.get_context('spawn')
+        ) if heavy else None
+        try:
+            futures = {
+                # One process per file already keeps the cores busy, so PDFs
+                # in the process pool do not start a page pool of their own
+                process_pool.submit(extract_timed, *items[i], self.pdf_max_pages, 1, self.registry): i
+                for i in heavy
+            }
+            futures.update({
+                memory_pool.submit(extract_timed, *items[i], self.pdf_max_pages, None, self.registry): i
+                for i in large
+            })
+            futures.update({
+                thread_pool.submit(extract_timed, *items[i], self.pdf_max_pages, None, self.registry): i
+                for i in light
+            })
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                name = items[index][0]
+                try:
+                    text, error, elapsed = future.result()
+                except Exception as e:
+                    # The worker process died (e.g. out of memory)
+                    text, error, elapsed = None, e, 0.0
+                if error is not None:
+                    logger.warning(f"Failed to extract {name}: {str(error)}")
+                results[index] = ExtractionResult(index, name, text, error, elapsed)
+                if progress is not None:
+                    progress(done, len(items), name)
+        finally:
+            thread_pool.shutdown(wait=True, cancel_futures=True)
+            if memory_pool is not None:
+                memory_pool.shutdown(wait=True, cancel_futures=True)
+            if process_pool is not None:
+                process_pool.shutdown(wait=True, cancel_futures=True)
+            if spill_dir is not None:
+                spill_dir.cleanup()
+        
+        logger.info(
+            f"Extracted {sum(result.ok for result in results)} of {len(items)} files: "
+            + ', '.join(f"{result.name} {result.elapsed:.2f}s" for result in results)
+        )
+        return results
+    
     @staticmethod
-    def extract_text(file_path: Union[str, Path]) -> str:
+    def extract_text(
+        file_path: Union[str, Path],
+        progress: Optional[Callable[[int, int], None]] = None,
+        max_pages: Optional[int] = None,
+        pdf_workers: Optional[int] = None
+    ) -> str:
         """
         Extract text from various file formats
         
         Args:
             file_path: Path to the file to extract text from
+            progress: Called as progress(done, total) while pages are extracted
+            max_pages: Only extract the first pages of a PDF
+            pdf_workers: Processes extracting PDF pages (defaults to the CPU count)
             
         Returns:
             Extracted text as a string
         """
         file_path = Path(file_path)
-        if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+        return FileProcessor.extract_source(
+            file_path, file_path.suffix, progress=progress, max_pages=max_pages, pdf_workers=pdf_workers
+        )
+    
+    @staticmethod
+    def extract_source(
+        source: Union[Path, bytes],
+        suffix: str,
+        name: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        max_pages: Optional[int] = None,
+        pdf_workers: Optional[int] = None,
+        registry: Optional[ExtractorRegistry] = None
+    ) -> str:
+        """
+        Extract text from a file on disk or from file content held in memory
         
+        The extractor is chosen by the registry from the suffix and the
+        file's magic bytes, after checking the size limits. In-memory content
+        is parsed where it is, without writing it to disk first.
+        
+        Args:
+            source: Path of the file, or its bytes
+            suffix: File extension
+            name: File name used in digests (defaults to the path's name)
+            progress: Called as progress(done, total) while pages are extracted
+            max_pages: Only extract the first pages of a PDF
+            pdf_workers: Processes extracting PDF pages (defaults to the CPU count)
+            registry: Extractors to choose from (defaults to the built-in ones)
+            
+        Returns:
+            Extracted text as a string
+        """
+        from .config import EXTRACT_MAX_FILE_BYTES
+        if isinstance(source, Path):
+            if not source.exists():
+                raise FileNotFoundError(f"File not found: {source}")
+            name = name or source.name
+        name = name or f"upload{suffix.lower()}"
         try:
-            # Handle different file types
-            if file_path.suffix.lower() == '.docx':
-                return FileProcessor._extract_from_docx(file_path)
-            elif file_path.suffix.lower() in ['.xlsx', '.xls']:
-                return FileProcessor._extract_from_excel(file_path)
-            elif file_path.suffix.lower() == '.csv':
-                return FileProcessor._extract_from_csv(file_path)
-            elif file_path.suffix.lower() == '.pdf':
-                return FileProcessor._extract_from_pdf(file_path)
-            else:
-                # Default to reading as text
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
-                    
+            return (registry or default_registry).extract(
+                source, suffix, name=name, max_bytes=EXTRACT_MAX_FILE_BYTES,
+                progress=progress, max_pages=max_pages, pdf_workers=pdf_workers
+            )
         except Exception as e:
-            logger.error(f"Failed to extract text from {file_path}: {str(e)}")
+            logger.error(f"Failed to extract text from {name}: {str(e)}")
             raise
     
-    @staticmethod
-    def _extract_from_docx(file_path: Path) -> str:
-        """Extract text from a Word document"""
-        doc = docx.Document(file_path)
-        return '\n'.join([paragraph.text for paragraph in doc.paragraphs])
-    
-    @staticmethod
-    def _extract_from_excel(file_path: Path) -> str:
-        """Extract text from Excel files"""
-        df = pd.read_excel(file_path)
-        return df.to_string()
-    
-    @staticmethod
-    def _extract_from_csv(file_path: Path) -> str:
-        """Extract text from CSV files"""
-        df = pd.read_csv(file_path)
-        return df.to_string()
-    
-    @staticmethod
-    def _extract_from_pdf(file_path: Path) -> str:
-        """Extract text from PDF files"""
-        try:
-            import PyPDF2
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                text = []
-                for page in reader.pages:
-                    text.append(page.extract_text())
-                return '\n'.join(text)
-        except ImportError:
-            logger.warning("PyPDF2 is required for PDF processing. Install with: pip install PyPDF2")
-            return ""
-    
     @staticmethod
     def get_file_metadata(file_path: Union[str, Path]) -> Dict[str, Any]:
         """
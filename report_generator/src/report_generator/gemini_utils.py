@@ -1,20 +1,56 @@
 import os
-import google.generativeai as genai
-from typing import Dict, Any, Optional
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Optional, Iterable, Iterator, AsyncIterator, Tuple, Union
 import logging
 from pathlib import Path
 
+from .batch_generation import (
+    GenerationJob, GenerationResult, RateLimiter,
+    backoff_delay, estimate_tokens, is_retryable_error
+)
+from .model_backends import ModelBackend
+from .response_cache import ResponseCache
+
 logger = logging.getLogger(__name__)
 
+def _genai():
+    """Import the Gemini SDK on first use; it is slow to import"""
+    import google.generativeai as genai
+    return genai
+
 class GeminiReportGenerator:
     """Handles report generation using Google's Gemini API"""
     
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize the Gemini API client"""
+    MODEL_NAME = 'gemini-1.5-flash'
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        backend: Optional[ModelBackend] = None
+    ):
+        """
+        Initialize the Gemini API client
+
+        Args:
+            api_key: Gemini API key (defaults to the GEMINI_API_KEY env var)
+            cache: Response cache shared across requests (None disables caching)
+            rate_limiter: Request/token budget shared by every API call
+                (None for no client-side limit)
+            backend: Model used instead of the Gemini service, such as a
+                FakeModelBackend (no API key is needed then)
+        """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.backend = backend
         
         # If API key is not provided, prompt the user to enter it
-        if not self.api_key:
+        if not self.api_key and backend is None:
             import streamlit as st
             st.warning("Gemini API key not found in environment variables.")
             self.api_key = st.text_input(
@@ -25,22 +61,71 @@ class GeminiReportGenerator:
             if not self.api_key:
                 st.stop()
         
+        # The SDK is imported and configured on first use
+        self._model = None
+        self._connect_lock = threading.Lock()
+        self.health: Optional[Dict[str, Any]] = None
+    
+    @property
+    def model(self):
+        """The Gemini model, connected on first access (or the configured backend)"""
+        if self.backend is not None:
+            return self.backend
+        if self._model is None:
+            with self._connect_lock:
+                if self._model is None:
+                    genai = _genai()
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.MODEL_NAME)
+        return self._model
+    
+    @property
+    def model_name(self) -> str:
+        """Name of the model in use, which also keys cached responses"""
+        if self.backend is not None:
+            return self.backend.name
+        return self.MODEL_NAME
+    
+    def check_health(self, background: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Check that the API is reachable and the key is accepted
+        
+        Fetches the model's metadata rather than generating content, so the
+        check is cheap and consumes no generation quota.
+        
+        Args:
+            background: Run the check on a daemon thread and return immediately
+            
+        Returns:
+            Dict with 'ok', 'error' and 'latency' (None when run in the background);
+            the latest result is also kept in ``self.health``
+        """
+        if background:
+            threading.Thread(target=self.check_health, name='gemini-health-check', daemon=True).start()
+            return None
+        
+        start = time.monotonic()
         try:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-            # Test the connection
-            self.model.generate_content("Test connection")
+            if self.backend is not None:
+                self.backend.check()
+            else:
+                self.model  # configure the SDK with our key
+                _genai().get_model(f'models/{self.MODEL_NAME}')
+            health = {'ok': True, 'error': None}
         except Exception as e:
-            import streamlit as st
-            st.error(f"Failed to initialize Gemini API: {str(e)}")
-            st.stop()
+            logger.warning(f"Gemini health check failed: {str(e)}")
+            health = {'ok': False, 'error': str(e)}
+        health['latency'] = time.monotonic() - start
+        self.health = health
+        return health
     
     def generate_report(
         self,
         content: str,
         template: str = "default",
         max_tokens: int = 2048,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        use_cache: bool = True
     ) -> str:
         """
         Generate a report using the Gemini API
@@ -50,28 +135,339 @@ class GeminiReportGenerator:
             template: Type of report template to use
             max_tokens: Maximum number of tokens to generate
             temperature: Controls randomness (0.0 to 1.0)
+            use_cache: Reuse a cached response for an identical request
             
         Returns:
             Generated report as a string
         """
         try:
-            # Prepare the prompt based on the template
-            prompt = self._prepare_prompt(content, template)
+            return self._generate(content, template, max_tokens, temperature, use_cache)
+        except Exception as e:
+            logger.error(f"Error generating report: {str(e)}")
+            raise
+    
+    def generate_report_stream(
+        self,
+        content: str,
+        template: str = "default",
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+        use_cache: bool = True
+    ) -> Iterator[str]:
+        """
+        Generate a report, yielding text chunks as the model produces them
+        
+        A cached response is yielded as a single chunk. The complete text is
+        cached only if the stream is consumed to the end.
+        
+        Args:
+            content: Input content to generate report from
+            template: Type of report template to use
+            max_tokens: Maximum number of tokens to generate
+            temperature: Controls randomness (0.0 to 1.0)
+            use_cache: Reuse a cached response for an identical request
             
-            # Generate content
+        Yields:
+            Consecutive pieces of the generated report
+        """
+        prompt, generation_config = self._build_request(content, template, max_tokens, temperature)
+        
+        cache_key = self._cache_key(prompt, generation_config, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached report response")
+                yield cached
+                return
+        
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimate_tokens(prompt, max_tokens))
+        
+        start = time.monotonic()
+        first_chunk_at = None
+        chunks = []
+        try:
             response = self.model.generate_content(
                 prompt,
-                generation_config={
-                    'temperature': temperature,
-                    'max_output_tokens': max_tokens,
-                }
+                generation_config=generation_config,
+                stream=True
             )
-            
-            return response.text
-            
+            for chunk in response:
+                text = chunk.text
+                if not text:
+                    continue
+                if first_chunk_at is None:
+                    first_chunk_at = time.monotonic() - start
+                chunks.append(text)
+                yield text
         except Exception as e:
-            logger.error(f"Error generating report: {str(e)}")
+            logger.error(f"Error streaming report: {str(e)}")
             raise
+        
+        total = time.monotonic() - start
+        first_token = f"{first_chunk_at:.2f}s" if first_chunk_at is not None else "n/a"
+        logger.info(
+            f"Streamed report: time to first token {first_token}, total {total:.2f}s",
+            extra={
+                'duration_ms': round(total * 1000, 1),
+                'first_token_ms': round(first_chunk_at * 1000, 1) if first_chunk_at is not None else None
+            }
+        )
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, ''.join(chunks))
+    
+    def generate_batch(
+        self,
+        jobs: Iterable[Union[GenerationJob, Tuple[str, str]]],
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+        max_workers: int = 4,
+        max_retries: int = 4,
+        retry_base_delay: float = 1.0,
+        use_cache: bool = True
+    ) -> Iterator[GenerationResult]:
+        """
+        Generate many reports concurrently on a thread pool
+        
+        Requests share the generator's rate limiter, and rate-limit (429) or
+        server (5xx) errors are retried with jittered exponential backoff. A
+        job that still fails is returned with its error instead of raising,
+        so the rest of the batch completes.
+        
+        Args:
+            jobs: GenerationJob items or (content, template) tuples
+            max_tokens: Maximum number of tokens to generate per report
+            temperature: Controls randomness (0.0 to 1.0)
+            max_workers: Maximum number of requests in flight
+            max_retries: Retries per job after the first attempt
+            retry_base_delay: Backoff before the first retry, in seconds
+            use_cache: Reuse cached responses for identical requests
+            
+        Yields:
+            GenerationResult for each job, in completion order
+        """
+        jobs = [self._as_job(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._run_job, index, job, max_tokens, temperature,
+                    max_retries, retry_base_delay, use_cache
+                )
+                for index, job in enumerate(jobs)
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    
+    async def generate_batch_async(
+        self,
+        jobs: Iterable[Union[GenerationJob, Tuple[str, str]]],
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+        concurrency: int = 4,
+        max_retries: int = 4,
+        retry_base_delay: float = 1.0,
+        use_cache: bool = True
+    ) -> AsyncIterator[GenerationResult]:
+        """
+        Async version of :meth:`generate_batch` using the model's async API
+        
+        Args:
+            concurrency: Maximum number of requests in flight
+            (other arguments as for :meth:`generate_batch`)
+            
+        Yields:
+            GenerationResult for each job, in completion order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(index: int, job: GenerationJob) -> GenerationResult:
+            async with semaphore:
+                return await self._run_job_async(
+                    index, job, max_tokens, temperature,
+                    max_retries, retry_base_delay, use_cache
+                )
+        
+        tasks = [
+            asyncio.ensure_future(run(index, self._as_job(job)))
+            for index, job in enumerate(jobs)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    @staticmethod
+    def _as_job(job: Union[GenerationJob, Tuple[str, str]]) -> GenerationJob:
+        return job if isinstance(job, GenerationJob) else GenerationJob(*job)
+    
+    def _run_job(
+        self,
+        index: int,
+        job: GenerationJob,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        retry_base_delay: float,
+        use_cache: bool
+    ) -> GenerationResult:
+        """Run one batch job with retries; never raises"""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                text = self._generate(job.content, job.template, max_tokens, temperature, use_cache)
+                return GenerationResult(index, job, text, None, attempt, time.monotonic() - start)
+            except Exception as e:
+                if attempt > max_retries or not is_retryable_error(e):
+                    logger.error(f"Batch job {job.job_id or index} failed after {attempt} attempts: {str(e)}")
+                    return GenerationResult(index, job, None, e, attempt, time.monotonic() - start)
+                delay = backoff_delay(attempt, retry_base_delay)
+                logger.warning(f"Batch job {job.job_id or index} retrying in {delay:.1f}s: {str(e)}")
+                time.sleep(delay)
+    
+    async def _run_job_async(
+        self,
+        index: int,
+        job: GenerationJob,
+        max_tokens: int,
+        temperature: float,
+        max_retries: int,
+        retry_base_delay: float,
+        use_cache: bool
+    ) -> GenerationResult:
+        """Async version of :meth:`_run_job`"""
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                text = await self._generate_async(
+                    job.content, job.template, max_tokens, temperature, use_cache
+                )
+                return GenerationResult(index, job, text, None, attempt, time.monotonic() - start)
+            except Exception as e:
+                if attempt > max_retries or not is_retryable_error(e):
+                    logger.error(f"Batch job {job.job_id or index} failed after {attempt} attempts: {str(e)}")
+                    return GenerationResult(index, job, None, e, attempt, time.monotonic() - start)
+                delay = backoff_delay(attempt, retry_base_delay)
+                logger.warning(f"Batch job {job.job_id or index} retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+    
+    def _build_request(
+        self,
+        content: str,
+        template: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Return the prompt and generation config for a report request"""
+        # Prepare the prompt based on the template
+        prompt = self._prepare_prompt(content, template)
+        generation_config = {
+            'temperature': temperature,
+            'max_output_tokens': max_tokens,
+        }
+        return prompt, generation_config
+    
+    def _cache_key(self, prompt: str, generation_config: Dict[str, Any], use_cache: bool) -> Optional[str]:
+        if self.cache is None or not use_cache:
+            return None
+        return ResponseCache.make_key(prompt, self.model_name, generation_config)
+    
+    def _generate(
+        self,
+        content: str,
+        template: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool
+    ) -> str:
+        """Generate one report from its template prompt"""
+        return self.complete(
+            self._prepare_prompt(content, template), max_tokens, temperature, use_cache
+        )
+    
+    def complete(
+        self,
+        prompt: str,
+        max_tokens: int = 2048,
+        temperature: float = 0.7,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Run a raw prompt, consulting the cache and the rate limiter
+        
+        Args:
+            prompt: Complete prompt text
+            max_tokens: Maximum number of tokens to generate
+            temperature: Controls randomness (0.0 to 1.0)
+            use_cache: Reuse a cached response for an identical request
+            
+        Returns:
+            The model's response text
+        """
+        generation_config = {
+            'temperature': temperature,
+            'max_output_tokens': max_tokens,
+        }
+        
+        cache_key = self._cache_key(prompt, generation_config, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached report response")
+                return cached
+        
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(estimate_tokens(prompt, max_tokens))
+        
+        # Generate content
+        response = self.model.generate_content(
+            prompt,
+            generation_config=generation_config
+        )
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, response.text)
+        return response.text
+    
+    async def _generate_async(
+        self,
+        content: str,
+        template: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool
+    ) -> str:
+        """Async version of :meth:`_generate`"""
+        prompt, generation_config = self._build_request(content, template, max_tokens, temperature)
+        
+        cache_key = self._cache_key(prompt, generation_config, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Returning cached report response")
+                return cached
+        
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(estimate_tokens(prompt, max_tokens))
+        
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=generation_config
+        )
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, response.text)
+        return response.text
     
     def _prepare_prompt(self, content: str, template: str) -> str:
         """Prepare the prompt based on the template"""
@@ -102,10 +498,17 @@ class GeminiReportGenerator:
         template_prompt = templates.get(template.lower(), templates["default"])
         return template_prompt.format(content=content)
     
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return response cache hit/miss counters (empty when caching is off)"""
+        return self.cache.stats() if self.cache is not None else {}
+    
     def validate_api_key(self) -> bool:
         """Validate the Gemini API key"""
+        if self.backend is not None:
+            return True
         try:
-            models = genai.list_models()
+            self.model  # configure the SDK with our key
+            models = _genai().list_models()
             return len(list(models)) > 0
         except Exception as e:
             logger.error(f"API key validation failed: {str(e)}")
@@ -0,0 +1,455 @@
+import functools
+import inspect
+import json
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Callable, NamedTuple, Sequence
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the span duration histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = 'report_generator'
+
+
+class Span(NamedTuple):
+    """A timed piece of work"""
+    name: str
+    start: float
+    duration: float
+    trace_id: Optional[str]
+    parent: Optional[str]
+    depth: int
+    thread: str
+    error: Optional[str]
+    attrs: Dict[str, Any]
+
+
+class Trace(NamedTuple):
+    """The spans of one traced unit of work, such as a Streamlit rerun"""
+    id: str
+    name: str
+    start: float
+    duration: float
+    spans: List[Span]
+    profile: Optional[str]
+
+
+class _Histogram:
+    def __init__(self, buckets: Sequence[float]):
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+
+class SpanRecorder:
+    """
+    Records timing spans into a ring buffer and cumulative histograms
+
+    Spans opened on the same thread nest: a span started inside another is
+    recorded as its child and belongs to the same trace. The ring buffer
+    keeps the most recent spans for inspection; the histograms keep counts
+    and totals of every span since startup for the metrics endpoint.
+    """
+
+    def __init__(self, capacity: int = 4096, traces: int = 20, buckets: Sequence[float] = DEFAULT_BUCKETS, enabled: bool = True):
+        """
+        Initialize the recorder
+
+        Args:
+            capacity: Spans kept in the ring buffer
+            traces: Completed traces kept
+            buckets: Histogram bucket upper bounds in seconds
+            enabled: When False spans cost one attribute check and record nothing
+        """
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._spans: 'deque[Span]' = deque(maxlen=capacity)
+        self._traces: 'deque[Trace]' = deque(maxlen=traces)
+        self._histograms: Dict[str, _Histogram] = {}
+        self._gauges: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[list]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block
+
+        Yields a dict the block may add attributes to (sizes, cache hits).
+        An exception is recorded on the span and re-raised; control-flow
+        exceptions that are not ``Exception`` subclasses (Streamlit's rerun,
+        generator close) end the span without marking it as failed.
+        """
+        if not self.enabled:
+            yield attrs
+            return
+        stack = self._stack()
+        trace_id = getattr(self._local, 'trace_id', None)
+        parent = stack[-1][0] if stack else None
+        stack.append([name])
+        start = time.time()
+        began = time.perf_counter()
+        error = None
+        try:
+            yield attrs
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            self.record(Span(
+                name, start, time.perf_counter() - began, trace_id, parent, len(stack),
+                threading.current_thread().name, error, attrs
+            ))
+
+    @contextmanager
+    def trace(self, name: str, profiler: Optional['SlowRunProfiler'] = None) -> Iterator[str]:
+        """
+        Group the spans of the enclosed block into a trace
+
+        Args:
+            name: Name of the trace (also recorded as its root span)
+            profiler: Samples the block's stacks and keeps them if it was slow
+
+        Yields:
+            The trace ID
+        """
+        if not self.enabled:
+            yield ''
+            return
+        trace_id = uuid.uuid4().hex[:12]
+        previous = getattr(self._local, 'trace_id', None)
+        self._local.trace_id = trace_id
+        start = time.time()
+        began = time.perf_counter()
+        sampling = profiler.start() if profiler is not None else None
+        try:
+            with self.span(name):
+                yield trace_id
+        finally:
+            duration = time.perf_counter() - began
+            self._local.trace_id = previous
+            profile = profiler.stop(sampling, name, duration) if sampling is not None else None
+            with self._lock:
+                spans = [s for s in self._spans if s.trace_id == trace_id]
+                self._traces.append(Trace(trace_id, name, start, duration, spans, profile))
+
+    def record(self, span: Span) -> None:
+        """Add a finished span to the ring buffer and the histograms"""
+        with self._lock:
+            self._spans.append(span)
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = _Histogram(self.buckets)
+            index = 0
+            while index < len(self.buckets) and span.duration > self.buckets[index]:
+                index += 1
+            histogram.counts[index] += 1
+            histogram.total += span.duration
+            histogram.count += 1
+            if span.error:
+                histogram.errors += 1
+
+    def timed(self, name: str) -> Callable:
+        """Decorator recording every call of a function as a span"""
+        def decorate(function: Callable) -> Callable:
+            return self._wrap(function, name)
+        return decorate
+
+    def instrument(self, obj: Any, methods: Sequence[str], prefix: str) -> Any:
+        """
+        Record calls of ``obj``'s methods as spans named ``prefix.method``
+
+        Only this instance is changed. Methods returning a generator are
+        timed until the generator is exhausted or closed.
+
+        Returns:
+            ``obj`` (left untouched when the recorder is disabled)
+        """
+        if not self.enabled:
+            return obj
+        for method in methods:
+            bound = getattr(obj, method, None)
+            if bound is None or getattr(bound, '_instrumented', False):
+                continue
+            setattr(obj, method, self._wrap(bound, f"{prefix}.{method}"))
+        return obj
+
+    def _wrap(self, function: Callable, name: str) -> Callable:
+        if inspect.isgeneratorfunction(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                return self._timed_iterator(name, function(*args, **kwargs))
+        else:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+        wrapper._instrumented = True
+        return wrapper
+
+    def _timed_iterator(self, name: str, iterator: Iterator[Any]) -> Iterator[Any]:
+        """Wrap ``iterator`` in one span from this call to its last item"""
+        if not self.enabled:
+            return iterator
+        # The caller's span is the parent, wherever the items are consumed
+        stack = self._stack()
+        context = (
+            getattr(self._local, 'trace_id', None), stack[-1][0] if stack else None, len(stack),
+            time.time(), time.perf_counter()
+        )
+        return self._consume(name, iterator, context)
+
+    def _consume(self, name: str, iterator: Iterator[Any], context: tuple) -> Iterator[Any]:
+        trace_id, parent, depth, start, began = context
+        attrs: Dict[str, Any] = {'items': 0}
+        error = None
+        try:
+            for item in iterator:
+                if attrs['items'] == 0:
+                    attrs['first_item_s'] = time.perf_counter() - began
+                attrs['items'] += 1
+                yield item
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            # Recorded without joining the span stack: the consumer's own
+            # spans may open and close while this iterator is suspended
+            self.record(Span(
+                name, start, time.perf_counter() - began, trace_id, parent, depth,
+                threading.current_thread().name, error, attrs
+            ))
+
+    def register_gauge(self, name: str, help_text: str, callback: Callable[[], Any]) -> None:
+        """
+        Export a value read at scrape time
+
+        Args:
+            name: Metric name (prefixed with ``report_generator_``)
+            help_text: HELP line of the metric
+            callback: Returns a number, or a dict of label value to number
+                (exported with the label ``key``)
+        """
+        with self._lock:
+            self._gauges[name] = (help_text, callback)
+
+    def spans(self, limit: Optional[int] = None) -> List[Span]:
+        """Return the most recent spans, oldest first"""
+        with self._lock:
+            spans = list(self._spans)
+        return spans[-limit:] if limit else spans
+
+    def traces(self, name: Optional[str] = None) -> List[Trace]:
+        """Return completed traces, oldest first"""
+        with self._lock:
+            traces = list(self._traces)
+        return [t for t in traces if name is None or t.name == name]
+
+    def find_trace(self, trace_id: str) -> Optional[Trace]:
+        """Return the completed trace with the given ID, if it is still kept"""
+        with self._lock:
+            return next((t for t in self._traces if t.id == trace_id), None)
+
+    def last_trace(self, name: Optional[str] = None) -> Optional[Trace]:
+        """Return the latest completed trace (with the given name)"""
+        traces = self.traces(name)
+        return traces[-1] if traces else None
+
+    def reset(self) -> None:
+        """Forget every span, trace and histogram"""
+        with self._lock:
+            self._spans.clear()
+            self._traces.clear()
+            self._histograms.clear()
+
+    def prometheus_text(self) -> str:
+        """Return the histograms and gauges in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = {name: (list(h.counts), h.total, h.count, h.errors) for name, h in self._histograms.items()}
+            gauges = dict(self._gauges)
+
+        metric = f"{METRIC_PREFIX}_span_duration_seconds"
+        lines = [
+            f"# HELP {metric} Time spent in instrumented code",
+            f"# TYPE {metric} histogram",
+        ]
+        for name in sorted(histograms):
+            counts, total, count, _ = histograms[name]
+            label = _escape(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{span="{label}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{span="{label}",le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {total:.6f}')
+            lines.append(f'{metric}_count{{span="{label}"}} {count}')
+
+        errors = f"{METRIC_PREFIX}_span_errors_total"
+        lines += [f"# HELP {errors} Instrumented calls that raised", f"# TYPE {errors} counter"]
+        for name in sorted(histograms):
+            lines.append(f'{errors}{{span="{_escape(name)}"}} {histograms[name][3]}')
+
+        for name in sorted(gauges):
+            help_text, callback = gauges[name]
+            try:
+                value = callback()
+            except Exception as e:
+                logger.warning(f"Could not read metric {name}: {str(e)}")
+                continue
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines += [f"# HELP {full_name} {help_text}", f"# TYPE {full_name} gauge"]
+            if isinstance(value, dict):
+                for key in sorted(value):
+                    lines.append(f'{full_name}{{key="{_escape(str(key))}"}} {float(value[key]):g}')
+            else:
+                lines.append(f"{full_name} {float(value):g}")
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class SlowRunProfiler:
+    """
+    Sampling profiler that keeps the stacks of slow runs only
+
+    While a traced run is active a daemon thread samples the running
+    thread's stack every ``interval`` seconds, which costs the traced
+    thread nothing but the GIL hand-offs. When the run took longer than
+    ``threshold`` seconds the samples are written to ``directory`` in the
+    collapsed-stack format read by flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, directory: Path, threshold: float = 1.0, interval: float = 0.005, keep: int = 50):
+        """
+        Initialize the profiler
+
+        Args:
+            directory: Where profiles of slow runs are written
+            threshold: Runs slower than this many seconds are kept
+            interval: Seconds between samples
+            keep: Most recent profiles kept on disk
+        """
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.interval = interval
+        self.keep = keep
+
+    def start(self) -> Dict[str, Any]:
+        """Start sampling the calling thread"""
+        sampling = {
+            'thread_id': threading.get_ident(),
+            'samples': Counter(),
+            'stop': threading.Event(),
+        }
+        sampling['sampler'] = threading.Thread(
+            target=self._sample, args=(sampling,), name='slow-run-profiler', daemon=True
+        )
+        sampling['sampler'].start()
+        return sampling
+
+    def stop(self, sampling: Dict[str, Any], name: str, duration: float) -> Optional[str]:
+        """Stop sampling; return the path of the profile if the run was slow"""
+        sampling['stop'].set()
+        sampling['sampler'].join()
+        if duration < self.threshold or not sampling['samples']:
+            return None
+        try:
+            return str(self._write(sampling['samples'], name, duration))
+        except OSError as e:
+            logger.warning(f"Could not write profile: {str(e)}")
+            return None
+
+    def _sample(self, sampling: Dict[str, Any]) -> None:
+        thread_id = sampling['thread_id']
+        samples = sampling['samples']
+        while not sampling['stop'].wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                samples[';'.join(reversed(stack))] += 1
+
+    def _write(self, samples: Counter, name: str, duration: float) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        path = self.directory / f"{name}-{stamp}-{duration * 1000:.0f}ms.folded"
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        logger.info(f"Slow {name} ({duration:.2f}s): profile written to {path}")
+        profiles = sorted(self.directory.glob('*.folded'), key=lambda p: p.stat().st_mtime)
+        for old in profiles[:-self.keep]:
+            old.unlink(missing_ok=True)
+        return path
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1', recorder: Optional[SpanRecorder] = None):
+    """
+    Serve ``/metrics`` (Prometheus text) and ``/spans`` (recent spans as JSON)
+
+    Runs on a daemon thread with the standard library's HTTP server.
+
+    Returns:
+        The server; call ``shutdown()`` to stop it
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    recorder = recorder or default_recorder
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?', 1)[0]
+            if path == '/metrics':
+                body = recorder.prometheus_text().encode('utf-8')
+                content_type = 'text/plain; version=0.0.4; charset=utf-8'
+            elif path == '/spans':
+                body = json.dumps([s._asdict() for s in recorder.spans(500)], default=str).encode('utf-8')
+                content_type = 'application/json'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"Metrics request: {format % args}")
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    logger.info(f"Metrics served on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def _build_default_recorder() -> SpanRecorder:
+    from .config import INSTRUMENTATION_ENABLED, INSTRUMENTATION_BUFFER_SIZE
+
+    return SpanRecorder(capacity=INSTRUMENTATION_BUFFER_SIZE, enabled=INSTRUMENTATION_ENABLED)
+
+
+# Shared by the app, the services it builds and the metrics endpoint
+default_recorder = _build_default_recorder()
+span = default_recorder.span
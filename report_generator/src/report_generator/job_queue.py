@@ -0,0 +1,594 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, NamedTuple
+import logging
+
+from .batch_generation import backoff_delay, is_retryable_error
+from .logging_utils import log_context
+from .sqlite_utils import ThreadConnections
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    created_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user, status);
+"""
+
+# Jobs whose user already has this many jobs running are passed over
+_CLAIM_QUERY = """
+SELECT rowid, * FROM jobs
+WHERE (
+    (status = 'queued' AND available_at <= :now)
+    OR (status = 'running' AND lease_until < :now)
+)
+AND user NOT IN (
+    SELECT user FROM jobs
+    WHERE status = 'running' AND lease_until >= :now
+    GROUP BY user HAVING COUNT(*) >= :max_per_user
+)
+ORDER BY rowid
+LIMIT 1
+"""
+
+
+class QueueFullError(RuntimeError):
+    """Raised when a user already has the maximum number of jobs waiting"""
+
+
+class Job(NamedTuple):
+    """A queued unit of work and its outcome"""
+    id: str
+    user: str
+    kind: str
+    status: str
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    attempts: int
+    worker: Optional[str]
+    created_at: float
+    available_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+class _Transaction:
+    """BEGIN (IMMEDIATE) ... COMMIT/ROLLBACK on an autocommit connection"""
+
+    def __init__(self, conn: sqlite3.Connection, immediate: bool):
+        self.conn = conn
+        self.immediate = immediate
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE' if self.immediate else 'BEGIN')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.conn.execute('ROLLBACK' if exc_type is not None else 'COMMIT')
+
+
+class JobQueue:
+    """
+    Persistent queue of background jobs in a SQLite database.
+
+    Workers claim a job by taking a lease on it, which they renew while the
+    job runs. If the process dies, the lease runs out and the job is handed
+    to the next worker, so queued and interrupted jobs survive a restart.
+    A job whose user already has ``max_per_user`` jobs running is passed
+    over for other users' jobs.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        max_queued_per_user: Optional[int] = None,
+        timeout: float = 30.0
+    ):
+        """
+        Initialize the queue
+
+        Args:
+            db_path: Path to the SQLite database file
+            lease_seconds: How long a claimed job is reserved without a renewal
+            max_attempts: Attempts before a job that keeps failing with
+                retryable errors, or keeps losing its worker, is marked failed
+            max_queued_per_user: Jobs a user may have waiting (None for no limit)
+            timeout: Seconds to wait for a lock held by another connection
+        """
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.max_queued_per_user = max_queued_per_user
+        self.timeout = timeout
+        self._connections = ThreadConnections(self._connect)
+        self._listeners: List[threading.Event] = []
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Transactions are opened explicitly so claims can take the write
+        # lock before reading. Connections are only used by their own
+        # thread, but are closed on whichever thread ends them.
+        conn = sqlite3.connect(
+            self.db_path, timeout=self.timeout, isolation_level=None, check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        return self._connections.get()
+
+    def _transaction(self, immediate: bool = False):
+        return _Transaction(self._connection(), immediate)
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row['id'],
+            user=row['user'],
+            kind=row['kind'],
+            status=row['status'],
+            payload=json.loads(row['payload']),
+            result=json.loads(row['result']) if row['result'] else None,
+            error=row['error'],
+            attempts=row['attempts'],
+            worker=row['worker'],
+            created_at=row['created_at'],
+            available_at=row['available_at'],
+            started_at=row['started_at'],
+            finished_at=row['finished_at'],
+        )
+
+    def subscribe(self, event: threading.Event) -> None:
+        """Have an event set whenever a job is enqueued or a slot frees up"""
+        self._listeners.append(event)
+
+    def _notify(self) -> None:
+        for event in self._listeners:
+            event.set()
+
+    def enqueue(self, user: str, payload: Dict[str, Any], kind: str = 'report') -> str:
+        """
+        Add a job to the queue
+
+        Args:
+            user: Owner of the job, for per-user limits and listings
+            payload: JSON-serializable job input
+            kind: Job type, used to pick its handler
+
+        Returns:
+            The new job's ID
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction(immediate=True) as conn:
+            if self.max_queued_per_user is not None:
+                waiting = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE user = ? AND status = 'queued'", (user,)
+                ).fetchone()[0]
+                if waiting >= self.max_queued_per_user:
+                    raise QueueFullError(
+                        f"{user} already has {waiting} jobs waiting; try again when one has finished"
+                    )
+            conn.execute(
+                'INSERT INTO jobs (id, user, kind, status, payload, created_at, available_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, user, kind, QUEUED, json.dumps(payload), now, now)
+            )
+        self._notify()
+        return job_id
+
+    def claim(self, worker: str, max_per_user: int = 1) -> Optional[Job]:
+        """
+        Take the oldest runnable job and lease it to a worker
+
+        Jobs whose lease ran out (their worker died) are claimed again, or
+        failed once they have used up their attempts.
+
+        Args:
+            worker: Name of the claiming worker
+            max_per_user: Jobs one user may have running at once
+
+        Returns:
+            The claimed job, or None if none can run now
+        """
+        while True:
+            now = time.time()
+            with self._transaction(immediate=True) as conn:
+                row = conn.execute(
+                    _CLAIM_QUERY, {'now': now, 'max_per_user': max_per_user}
+                ).fetchone()
+                if row is None:
+                    return None
+                if row['status'] == RUNNING and row['attempts'] >= self.max_attempts:
+                    logger.error(f"Job {row['id']} lost its worker {row['attempts']} times; giving up")
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_until = NULL '
+                        'WHERE id = ?',
+                        (FAILED, 'The job was interrupted too many times', now, row['id'])
+                    )
+                    continue
+                if row['status'] == RUNNING:
+                    logger.warning(f"Job {row['id']} lease expired on {row['worker']}; retrying it")
+                conn.execute(
+                    'UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, '
+                    'started_at = ?, lease_until = ? WHERE id = ?',
+                    (RUNNING, worker, now, now + self.lease_seconds, row['id'])
+                )
+                return self._job(conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone())
+
+    def renew(self, job_ids: List[str], worker: str) -> None:
+        """Extend the leases a worker holds on running jobs"""
+        if not job_ids:
+            return
+        with self._transaction(immediate=True) as conn:
+            conn.executemany(
+                'UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?',
+                [(time.time() + self.lease_seconds, job_id, worker, RUNNING) for job_id in job_ids]
+            )
+
+    def complete(self, job_id: str, result: Any = None, worker: Optional[str] = None) -> bool:
+        """
+        Mark a running job as done with its JSON-serializable result
+
+        Args:
+            job_id: ID of the job
+            result: Outcome of the job
+            worker: Worker that ran the job; nothing is recorded if the job
+                has since been claimed by another worker
+
+        Returns:
+            False if the job was no longer running (for this worker)
+        """
+        return self._finish(job_id, DONE, worker, result=result)
+
+    def fail(self, job_id: str, error: Exception, worker: Optional[str] = None) -> bool:
+        """
+        Record a failed attempt of a running job
+
+        Retryable errors (rate limits, server errors) put the job back in
+        the queue after a backoff, until it has used up its attempts.
+
+        Returns:
+            False if the job was no longer running (for this worker)
+        """
+        job = self.get(job_id)
+        if job is not None and is_retryable_error(error) and job.attempts < self.max_attempts:
+            delay = backoff_delay(job.attempts)
+            logger.warning(f"Job {job_id} retrying in {delay:.1f}s: {str(error)}")
+            with self._transaction(immediate=True) as conn:
+                cursor = conn.execute(
+                    'UPDATE jobs SET status = ?, error = ?, available_at = ?, lease_until = NULL '
+                    'WHERE id = ? AND status = ? AND (? IS NULL OR worker = ?)',
+                    (QUEUED, str(error), time.time() + delay, job_id, RUNNING, worker, worker)
+                )
+            self._notify()
+            return cursor.rowcount > 0
+        logger.error(f"Job {job_id} failed: {str(error)}")
+        return self._finish(job_id, FAILED, worker, error=str(error))
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not started; returns False if it already has"""
+        with self._transaction(immediate=True) as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?',
+                (CANCELLED, time.time(), job_id, QUEUED)
+            )
+            return cursor.rowcount > 0
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        worker: Optional[str],
+        result: Any = None,
+        error: Optional[str] = None
+    ) -> bool:
+        with self._transaction(immediate=True) as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, lease_until = NULL '
+                'WHERE id = ? AND status = ? AND (? IS NULL OR worker = ?)',
+                (
+                    status, json.dumps(result) if result is not None else None, error,
+                    time.time(), job_id, RUNNING, worker, worker
+                )
+            )
+        self._notify()
+        if cursor.rowcount == 0:
+            logger.warning(f"Job {job_id} was no longer running on {worker}; its {status} result is dropped")
+        return cursor.rowcount > 0
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by ID"""
+        row = self._connection().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Return how many queued jobs are ahead of a queued job (None if it is not queued)"""
+        conn = self._connection()
+        row = conn.execute('SELECT rowid, status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None or row['status'] != QUEUED:
+            return None
+        return conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND rowid < ?", (row['rowid'],)
+        ).fetchone()[0]
+
+    def list_jobs(self, user: Optional[str] = None, limit: int = 20) -> List[Job]:
+        """Return the newest jobs, optionally only those of one user"""
+        if user is None:
+            rows = self._connection().execute(
+                'SELECT * FROM jobs ORDER BY rowid DESC LIMIT ?', (limit,)
+            ).fetchall()
+        else:
+            rows = self._connection().execute(
+                'SELECT * FROM jobs WHERE user = ? ORDER BY rowid DESC LIMIT ?', (user, limit)
+            ).fetchall()
+        return [self._job(row) for row in rows]
+
+    def stats(self, window_seconds: float = 3600.0) -> Dict[str, Any]:
+        """
+        Return queue depth and latency metrics
+
+        Args:
+            window_seconds: Period the wait and run time averages cover
+
+        Returns:
+            Job counts per status, the number of users with queued jobs,
+            the age of the oldest queued job, and the average queue wait and
+            run time of jobs finished within the window
+        """
+        conn = self._connection()
+        now = time.time()
+        counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED_STATES}
+        for row in conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status'):
+            counts[row['status']] = row['n']
+        waiting = conn.execute(
+            "SELECT COUNT(DISTINCT user), MIN(created_at) FROM jobs WHERE status = 'queued'"
+        ).fetchone()
+        recent = conn.execute(
+            'SELECT COUNT(*), AVG(started_at - created_at), AVG(finished_at - started_at) '
+            "FROM jobs WHERE status = 'done' AND finished_at >= ?",
+            (now - window_seconds,)
+        ).fetchone()
+        return {
+            'depth': counts[QUEUED],
+            'running': counts[RUNNING],
+            'counts': counts,
+            'waiting_users': waiting[0],
+            'oldest_wait': now - waiting[1] if waiting[1] is not None else 0.0,
+            'recent_done': recent[0],
+            'avg_wait': recent[1] or 0.0,
+            'avg_run': recent[2] or 0.0,
+        }
+
+    def depth(self) -> int:
+        """Return the number of queued jobs"""
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'queued'"
+        ).fetchone()[0]
+
+    def purge(self, older_than: float) -> int:
+        """
+        Delete finished jobs older than a number of seconds
+
+        Returns:
+            Number of jobs removed
+        """
+        with self._transaction(immediate=True) as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED_STATES))}) "
+                'AND finished_at < ?',
+                (*FINISHED_STATES, time.time() - older_than)
+            )
+            return cursor.rowcount
+
+    def close(self) -> None:
+        """Close every connection opened by this queue"""
+        self._connections.close()
+
+
+class JobWorkerPool:
+    """
+    Threads that claim jobs from a JobQueue and run their handlers.
+
+    Each handler is called as ``handler(job)`` and returns the job's
+    JSON-serializable result; an exception fails (or, when retryable,
+    requeues) the job. Leases on running jobs are renewed by a heartbeat
+    thread so long generations are not mistaken for dead workers.
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        handlers: Dict[str, Callable[[Job], Any]],
+        workers: int = 2,
+        max_per_user: int = 1,
+        poll_interval: float = 1.0,
+        name: Optional[str] = None
+    ):
+        """
+        Initialize the pool (call start() to run it)
+
+        Args:
+            queue: Queue to take jobs from
+            handlers: Handler per job kind
+            workers: Jobs run at once by this pool
+            max_per_user: Jobs one user may have running at once
+            poll_interval: Seconds between checks for jobs that became
+                runnable without a notification (retries, expired leases)
+            name: Prefix of the worker names (defaults to a random one)
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.workers = workers
+        self.max_per_user = max_per_user
+        self.poll_interval = poll_interval
+        self.name = name or f"jobs-{uuid.uuid4().hex[:6]}"
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._running: Dict[str, str] = {}
+        self._running_lock = threading.Lock()
+        self.processed = 0
+        queue.subscribe(self._wake)
+
+    def start(self) -> 'JobWorkerPool':
+        """Start the worker and heartbeat threads"""
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, args=(f"{self.name}-{number}",),
+                name=f"{self.name}-{number}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat, name=f"{self.name}-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming jobs and wait for running ones to finish"""
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def running(self) -> Dict[str, str]:
+        """Return the IDs of the jobs running in this pool, with their worker names"""
+        with self._running_lock:
+            return dict(self._running)
+
+    def _work(self, worker: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.queue.claim(worker, self.max_per_user)
+            except Exception as e:
+                logger.error(f"{worker} could not claim a job: {str(e)}")
+                job = None
+            if job is None:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+                continue
+            self._run(worker, job)
+
+    def _run(self, worker: str, job: Job) -> None:
+        with self._running_lock:
+            self._running[job.id] = worker
+        start = time.monotonic()
+        try:
+            with log_context(job_id=job.id, user=job.user):
+                try:
+                    handler = self.handlers.get(job.kind)
+                    if handler is None:
+                        raise ValueError(f"No handler for {job.kind} jobs")
+                    result = handler(job)
+                    self.queue.complete(job.id, result, worker=worker)
+                    elapsed = time.monotonic() - start
+                    logger.info(f"Job {job.id} done in {elapsed:.2f}s on {worker}",
+                                extra={'duration_ms': round(elapsed * 1000, 1)})
+                except Exception as e:
+                    logger.warning(f"Job {job.id} attempt {job.attempts} failed on {worker}: {str(e)}",
+                                   extra={'duration_ms': round((time.monotonic() - start) * 1000, 1)})
+                    try:
+                        self.queue.fail(job.id, e, worker=worker)
+                    except Exception as e:
+                        logger.error(f"Could not record failure of job {job.id}: {str(e)}")
+        finally:
+            with self._running_lock:
+                self._running.pop(job.id, None)
+            self.processed += 1
+
+    def _heartbeat(self) -> None:
+        interval = self.queue.lease_seconds / 3
+        while not self._stop.wait(interval):
+            with self._running_lock:
+                by_worker: Dict[str, List[str]] = {}
+                for job_id, worker in self._running.items():
+                    by_worker.setdefault(worker, []).append(job_id)
+            for worker, job_ids in by_worker.items():
+                try:
+                    self.queue.renew(job_ids, worker)
+                except Exception as e:
+                    logger.error(f"Could not renew job leases: {str(e)}")
+
+
+def report_job_handler(
+    generator: Any,
+    report_manager: Any,
+    summarizer: Any = None,
+    max_tokens: int = 2048,
+    temperature: float = 0.7
+) -> Callable[[Job], Dict[str, Any]]:
+    """
+    Return the handler for 'report' jobs
+
+    The job payload holds the report without its content ('report'), the
+    input text ('content') and 'use_cache'. The handler generates the
+    report, saves it and returns {'report_id': ...}. The report's ID should
+    be set when the job is queued, so a job retried after a restart
+    replaces rather than duplicates a report it had already saved.
+
+    Args:
+        generator: GeminiReportGenerator used for the report
+        report_manager: ReportManager the report is saved to
+        summarizer: ChunkedSummarizer for inputs too large for one prompt
+        max_tokens: Maximum number of tokens to generate
+        temperature: Controls randomness (0.0 to 1.0)
+    """
+    def handle(job: Job) -> Dict[str, Any]:
+        report = dict(job.payload['report'])
+        content = job.payload['content']
+        use_cache = job.payload.get('use_cache', True)
+        with log_context(report_id=report.get('id')):
+            if summarizer is not None and summarizer.needs_chunking(content):
+                content = summarizer.condense(content, use_cache=use_cache)
+            report['content'] = generator.generate_report(
+                content=content,
+                template=report.get('template', 'default'),
+                max_tokens=max_tokens,
+                temperature=temperature,
+                use_cache=use_cache
+            )
+            report.setdefault('metadata', {})['job_id'] = job.id
+            return {'report_id': report_manager.save_report(report)}
+
+    return handle
@@ -0,0 +1,233 @@
+import atexit
+import contextvars
+import copy
+import gzip
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import random
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Fields of the current request, report or job, added to every record
+_log_context: contextvars.ContextVar = contextvars.ContextVar('log_context', default={})
+
+# Attributes every LogRecord has; anything else was passed with extra=...
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional['ContextQueueHandler'] = None
+_configure_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Add fields (request_id, report_id, job_id, ...) to the records logged inside the block
+
+    The fields follow the context: they apply to this thread or task and to
+    the coroutines and thread-pool calls it starts, and nest with the
+    fields of enclosing blocks. None values are left out.
+    """
+    fields = {key: value for key, value in fields.items() if value is not None}
+    context = {**_log_context.get(), **fields}
+    token = _log_context.set(context)
+    try:
+        yield context
+    finally:
+        _log_context.reset(token)
+
+
+def current_log_context() -> Dict[str, Any]:
+    """Return the fields set by the enclosing log_context blocks"""
+    return dict(_log_context.get())
+
+
+class ContextFilter(logging.Filter):
+    """Copies the log context onto records, in the thread that logs them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _log_context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class SampledDebugFilter(logging.Filter):
+    """
+    Passes records at or above ``level`` and a sample of the DEBUG records
+
+    Sampled records carry ``sample_rate`` so counts can be scaled back up.
+    """
+
+    def __init__(self, level: int = logging.INFO, rate: float = 0.0):
+        super().__init__()
+        self.level = level
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.level:
+            return True
+        if record.levelno < logging.DEBUG or self.rate <= 0 or random.random() >= self.rate:
+            return False
+        record.sample_rate = self.rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line
+
+    Besides the time, level, logger and message, the object holds the log
+    context (request_id, report_id, ...) and any ``extra=`` fields such as
+    ``duration_ms``.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread instead of writing them
+
+    Messages and tracebacks are rendered here, where the arguments are still
+    valid, but the record keeps its extra fields for the JSON formatter. When
+    the queue is full (the disk has stalled) records are dropped and counted
+    rather than blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _gzip_namer(name: str) -> str:
+    return name + '.gz'
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def configure_logging(
+    config: Optional[Dict[str, Any]] = None,
+    level: Optional[str] = None,
+    debug_sample_rate: Optional[float] = None,
+    compress: Optional[bool] = None,
+    queue_size: Optional[int] = None
+) -> logging.handlers.QueueListener:
+    """
+    Configure logging so that callers never wait on the disk
+
+    The handlers of ``config`` (``LOGGING_CONFIG`` by default: a rotating
+    JSON file in logs/ and the console) are moved from the root logger to a
+    QueueListener thread; the root logger gets a QueueHandler in their
+    place. Calling it again returns the running listener.
+
+    Args:
+        config: logging.config.dictConfig dictionary
+        level: Root level (defaults to LOG_LEVEL)
+        debug_sample_rate: Fraction of DEBUG records kept when the level is
+            above DEBUG (defaults to LOG_DEBUG_SAMPLE_RATE)
+        compress: Gzip rotated log files (defaults to LOG_COMPRESS)
+        queue_size: Records waiting for the listener before new ones are
+            dropped (defaults to LOG_QUEUE_SIZE)
+
+    Returns:
+        The running QueueListener
+    """
+    global _listener, _queue_handler
+    from .config import LOGGING_CONFIG, LOG_LEVEL, LOG_DEBUG_SAMPLE_RATE, LOG_COMPRESS, LOG_QUEUE_SIZE
+
+    with _configure_lock:
+        if _listener is not None:
+            return _listener
+
+        config = copy.deepcopy(config if config is not None else LOGGING_CONFIG)
+        config.setdefault('formatters', {})['json'] = {'()': JsonFormatter}
+        logging.config.dictConfig(config)
+
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        for handler in handlers:
+            root.removeHandler(handler)
+            if isinstance(handler, logging.handlers.BaseRotatingHandler) and (LOG_COMPRESS if compress is None else compress):
+                handler.namer = _gzip_namer
+                handler.rotator = _gzip_rotator
+
+        threshold = logging.getLevelName((level or LOG_LEVEL).upper())
+        rate = LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate
+        log_queue = queue.Queue(LOG_QUEUE_SIZE if queue_size is None else queue_size)
+        _queue_handler = ContextQueueHandler(log_queue)
+        _queue_handler.addFilter(SampledDebugFilter(threshold, rate))
+        _queue_handler.addFilter(ContextFilter())
+        root.addHandler(_queue_handler)
+        # DEBUG records are only created when some of them are kept
+        root.setLevel(logging.DEBUG if rate > 0 else threshold)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging() -> None:
+    """Write the queued records, stop the listener and close its handlers"""
+    global _listener, _queue_handler
+    with _configure_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
+
+
+def dropped_records() -> int:
+    """Return the number of records dropped because the log queue was full"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
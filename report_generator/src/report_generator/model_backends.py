@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, Callable
+import logging
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+# Words the fake model writes its reports from
+_VOCABULARY = (
+    'summary', 'progress', 'completed', 'review', 'deployment', 'issue', 'metrics',
+    'team', 'release', 'blocked', 'next', 'steps', 'owner', 'customer', 'incident',
+    'resolved', 'pending', 'priority', 'testing', 'update', 'meeting', 'action',
+    'item', 'latency', 'throughput', 'budget', 'risk', 'plan', 'schedule', 'feedback',
+)
+
+
+class ModelBackend:
+    """
+    The part of the Gemini SDK's GenerativeModel the report generator uses
+
+    GeminiReportGenerator talks to any object with these methods, so a
+    backend can replace the Gemini service (see FakeModelBackend). Responses
+    and stream chunks only need a ``text`` attribute.
+    """
+
+    name = 'model'
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        """Return a response for the prompt, or an iterable of chunks when streaming"""
+        raise NotImplementedError
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        """Async version of :meth:`generate_content` (without streaming)"""
+        raise NotImplementedError
+
+    def check(self) -> None:
+        """Raise if the backend is unreachable; used by health checks"""
+
+
+class ModelResponse:
+    """A response or stream chunk"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ModelServiceError(RuntimeError):
+    """An error returned by a model service, with its HTTP status code"""
+
+    def __init__(self, message: str, code: int = 500):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeModelBackend(ModelBackend):
+    """
+    Local stand-in for the Gemini service with a configurable performance profile
+
+    Each call waits for a time to first token drawn from the latency
+    distribution, then produces ``output_tokens`` (capped by the request's
+    ``max_output_tokens``) at ``tokens_per_second``, in chunks when
+    streaming. Calls fail with a 429 at ``rate_limit_rate`` and with a 500
+    or 503 at ``error_rate``.
+
+    Draws are seeded by ``seed``, the prompt and how many times that prompt
+    has been sent, so a run is reproducible however threads interleave,
+    while a retried prompt still gets a fresh draw.
+    """
+
+    name = 'fake'
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        distribution: str = 'lognormal',
+        spread: float = 0.5,
+        tokens_per_second: float = 100.0,
+        output_tokens: int = 500,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        chunk_tokens: int = 20,
+        seed: int = 0,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize the fake backend
+
+        Args:
+            latency: Typical time to first token in seconds (the mean, or
+                the median for 'lognormal')
+            distribution: One of 'fixed', 'uniform', 'normal' or 'lognormal'
+            spread: Relative spread of the latency: the half-width for
+                'uniform', the standard deviation for 'normal' (both as a
+                fraction of ``latency``) and sigma for 'lognormal'
+            tokens_per_second: Output rate once the first token arrived
+                (0 for instant output)
+            output_tokens: Length of each response
+            error_rate: Fraction of calls failing with a server error
+            rate_limit_rate: Fraction of calls failing with a 429
+            chunk_tokens: Tokens per chunk when streaming
+            seed: Seed for latencies, failures and response text
+            sleep: Function used to wait (replaceable in tests)
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}'. Choose one of: {', '.join(LATENCY_DISTRIBUTIONS)}")
+        if not 0 <= error_rate + rate_limit_rate <= 1:
+            raise ValueError("error_rate and rate_limit_rate must add up to between 0 and 1")
+        self.latency = latency
+        self.distribution = distribution
+        self.spread = spread
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.seed = seed
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._sent: Dict[str, int] = {}
+        self._stats = {'calls': 0, 'errors': 0, 'rate_limited': 0, 'output_tokens': 0}
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        """Return a response after the simulated latency, or a stream of chunks"""
+        rng, words = self._start(prompt, generation_config)
+        first_token = self._draw_latency(rng)
+        self.sleep(first_token)
+        self._maybe_fail(rng)
+        if stream:
+            return self._stream(words)
+        self.sleep(self._output_seconds(len(words)))
+        self._count_output(len(words))
+        return ModelResponse(' '.join(words))
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        """Async version of :meth:`generate_content`, waiting without blocking the loop"""
+        rng, words = self._start(prompt, generation_config)
+        await asyncio.sleep(self._draw_latency(rng))
+        self._maybe_fail(rng)
+        await asyncio.sleep(self._output_seconds(len(words)))
+        self._count_output(len(words))
+        return ModelResponse(' '.join(words))
+
+    def stats(self) -> Dict[str, int]:
+        """Return call, failure and output token counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _start(self, prompt: str, generation_config: Optional[Dict[str, Any]]) -> tuple:
+        """Count the call and return its random generator and response words"""
+        with self._lock:
+            attempt = self._sent.get(prompt, 0)
+            self._sent[prompt] = attempt + 1
+            self._stats['calls'] += 1
+        rng = self._random(attempt, prompt)
+
+        tokens = self.output_tokens
+        max_tokens = (generation_config or {}).get('max_output_tokens')
+        if max_tokens:
+            tokens = min(tokens, int(max_tokens))
+        # Same text for the same prompt, whatever the attempt
+        text_rng = self._random(prompt)
+        words = [text_rng.choice(_VOCABULARY) for _ in range(max(1, tokens))]
+        return rng, words
+
+    def _random(self, *parts: Any) -> random.Random:
+        key = ':'.join(str(part) for part in (self.seed,) + parts)
+        return random.Random(int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:8], 'big'))
+
+    def _draw_latency(self, rng: random.Random) -> float:
+        if self.distribution == 'fixed':
+            value = self.latency
+        elif self.distribution == 'uniform':
+            value = rng.uniform(self.latency * (1 - self.spread), self.latency * (1 + self.spread))
+        elif self.distribution == 'normal':
+            value = rng.gauss(self.latency, self.latency * self.spread)
+        else:
+            value = self.latency * math.exp(rng.gauss(0.0, self.spread))
+        return max(0.0, value)
+
+    def _maybe_fail(self, rng: random.Random) -> None:
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self._stats['rate_limited'] += 1
+            raise ModelServiceError("Resource has been exhausted (e.g. check quota).", code=429)
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self._stats['errors'] += 1
+            code = 503 if rng.random() < 0.5 else 500
+            raise ModelServiceError("The model is overloaded. Please try again later.", code=code)
+
+    def _count_output(self, tokens: int) -> None:
+        with self._lock:
+            self._stats['output_tokens'] += tokens
+
+    def _output_seconds(self, tokens: int) -> float:
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return tokens / self.tokens_per_second
+
+    def _stream(self, words: List[str]) -> Iterator[ModelResponse]:
+        for start in range(0, len(words), self.chunk_tokens):
+            chunk = words[start:start + self.chunk_tokens]
+            self.sleep(self._output_seconds(len(chunk)))
+            self._count_output(len(chunk))
+            last = start + self.chunk_tokens >= len(words)
+            yield ModelResponse(' '.join(chunk) + ('' if last else ' '))
+
+    def __repr__(self) -> str:
+        return (
+            f"FakeModelBackend(latency={self.latency}, distribution='{self.distribution}', "
+            f"spread={self.spread}, tokens_per_second={self.tokens_per_second}, "
+            f"output_tokens={self.output_tokens}, error_rate={self.error_rate}, "
+            f"rate_limit_rate={self.rate_limit_rate}, seed={self.seed})"
+        )
@@ -0,0 +1,140 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Callable, Iterator, Tuple, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Separator between pages in extracted text; a blank line keeps page
+# boundaries visible to the chunker as paragraph breaks
+PAGE_SEPARATOR = '\n\n'
+
+
+# Reader opened by this worker process, reused across its page ranges so
+# the document structure is parsed once per worker rather than per range
+_worker_reader = None
+
+
+def _open_reader(source: Union[str, bytes]):
+    import PyPDF2
+    return PyPDF2.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _init_worker(source: Union[str, bytes]) -> None:
+    global _worker_reader
+    _worker_reader = _open_reader(source)
+
+
+def _extract_page_range(start: int, stop: int) -> List[str]:
+    """Extract pages [start, stop) in a worker process"""
+    return [_worker_reader.pages[index].extract_text() or '' for index in range(start, stop)]
+
+
+def iter_pdf_pages(
+    source: Union[str, Path, bytes],
+    first_page: int = 1,
+    last_page: Optional[int] = None,
+    max_pages: Optional[int] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 8,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    Yield the text of a PDF page by page, in page order
+
+    Small selections are extracted in-process. Larger ones are split into
+    page ranges of ``batch_size`` pages that a process pool extracts in
+    parallel; at most two ranges per worker are in flight, so memory stays
+    bounded however long the document is.
+
+    Args:
+        source: Path to the PDF, or its bytes (workers started by fork share
+            them without a copy)
+        first_page: First page to extract (1-based)
+        last_page: Last page to extract, inclusive (None for the last page)
+        max_pages: Maximum number of pages to extract
+        workers: Worker processes (defaults to the CPU count; 1 disables the pool)
+        batch_size: Pages per work item sent to a worker
+        progress: Called as progress(done, total) after each page, from the
+            calling thread
+
+    Yields:
+        (page_number, text) tuples
+    """
+    if not isinstance(source, bytes):
+        source = str(source)
+    reader = _open_reader(source)
+    page_count = len(reader.pages)
+    start = max(first_page, 1) - 1
+    stop = page_count if last_page is None else min(last_page, page_count)
+    if max_pages is not None:
+        stop = min(stop, start + max_pages)
+    total = max(0, stop - start)
+    workers = workers or os.cpu_count() or 1
+    done = 0
+
+    if workers <= 1 or total <= batch_size:
+        for index in range(start, stop):
+            text = reader.pages[index].extract_text() or ''
+            done += 1
+            if progress is not None:
+                progress(done, total)
+            yield index + 1, text
+        return
+
+    del reader
+    ranges = iter([(i, min(i + batch_size, stop)) for i in range(start, stop, batch_size)])
+    executor = ProcessPoolExecutor(
+        max_workers=min(workers, (total + batch_size - 1) // batch_size),
+        initializer=_init_worker,
+        initargs=(source,)
+    )
+    pending = deque()
+
+    def submit_next() -> None:
+        page_range = next(ranges, None)
+        if page_range is not None:
+            pending.append((page_range[0], executor.submit(_extract_page_range, *page_range)))
+
+    try:
+        for _ in range(workers * 2):
+            submit_next()
+        while pending:
+            range_start, future = pending.popleft()
+            texts = future.result()
+            submit_next()
+            for offset, text in enumerate(texts):
+                done += 1
+                if progress is not None:
+                    progress(done, total)
+                yield range_start + offset + 1, text
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def extract_pdf_text(
+    source: Union[str, Path, bytes],
+    max_pages: Optional[int] = None,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> str:
+    """
+    Extract the text of a PDF, pages separated by blank lines
+
+    Args:
+        source: Path to the PDF, or its bytes
+        max_pages: Only extract the first max_pages pages
+        workers: Worker processes (defaults to the CPU count)
+        progress: Called as progress(done, total) after each page
+
+    Returns:
+        Extracted text as a string
+    """
+    return PAGE_SEPARATOR.join(
+        text for _, text in iter_pdf_pages(
+            source, max_pages=max_pages, workers=workers, progress=progress
+        )
+    )
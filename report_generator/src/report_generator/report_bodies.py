@@ -0,0 +1,71 @@
+import hashlib
+import zlib
+from pathlib import Path
+from typing import Optional
+import logging
+
+from .storage_utils import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class ReportBodyStore:
+    """
+    Stores generated report bodies as individual zlib-compressed files.
+
+    Bodies are kept out of the report metadata so listing reports never reads
+    or parses them. Files are sharded by a hash of the report ID to keep
+    directories small and file names safe for any ID.
+    """
+
+    SUFFIX = '.md.z'
+
+    def __init__(self, body_dir: Path, compression_level: int = 6, fsync: bool = True):
+        """
+        Initialize the body store
+
+        Args:
+            body_dir: Directory holding the compressed bodies
+            compression_level: zlib compression level (1-9)
+            fsync: Flush every body to disk before acknowledging it
+        """
+        self.body_dir = Path(body_dir)
+        self.compression_level = compression_level
+        self.fsync = fsync
+        self.body_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, report_id: str) -> Path:
+        digest = hashlib.sha1(report_id.encode('utf-8')).hexdigest()
+        return self.body_dir / digest[:2] / f"{digest}{self.SUFFIX}"
+
+    def put(self, report_id: str, body: str) -> int:
+        """
+        Compress and store a report body
+
+        Returns:
+            Size of the compressed body in bytes
+        """
+        data = zlib.compress(body.encode('utf-8'), self.compression_level)
+        path = self._path(report_id)
+        path.parent.mkdir(exist_ok=True)
+        atomic_write_bytes(path, data, fsync=self.fsync)
+        return len(data)
+
+    def get(self, report_id: str) -> Optional[str]:
+        """Load and decompress a report body, or None if it is missing"""
+        try:
+            with open(self._path(report_id), 'rb') as f:
+                return zlib.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            return None
+        except zlib.error as e:
+            logger.error(f"Report body for {report_id} is corrupted: {str(e)}")
+            return None
+
+    def delete(self, report_id: str) -> bool:
+        """Remove a report body; returns False if it did not exist"""
+        try:
+            self._path(report_id).unlink()
+            return True
+        except FileNotFoundError:
+            return False
@@ -0,0 +1,536 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, NamedTuple, Iterator, Tuple
+import logging
+
+from .report_utils import SUMMARY_FIELDS, filter_reports, sort_and_page
+from .storage_utils import GroupCommitter, atomic_write_bytes, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class _IndexEntry(NamedTuple):
+    """Location of the latest record for a report inside the journal"""
+    segment: int
+    offset: int
+    length: int
+    summary: Dict[str, Any]
+
+
+class JournalReportStore:
+    """
+    Append-only JSONL journal of reports with an in-memory offset index.
+
+    Every save appends a single ``put`` record and every delete appends a
+    ``del`` tombstone, so writes cost O(record) instead of O(history). The
+    journal is split into numbered segment files; once a sealed segment
+    accumulates enough superseded records it is rewritten by a background
+    compactor.
+
+    Several processes may share one journal. Writes and compaction hold an
+    exclusive lock on ``LOCK``, reads hold a shared one, and every operation
+    first catches up on records appended by other processes. Compaction bumps
+    the number in ``GENERATION`` so other processes know to rebuild their
+    offset index.
+    """
+
+    SEGMENT_SUFFIX = '.jsonl'
+    LOCK_FILE = 'LOCK'
+    GENERATION_FILE = 'GENERATION'
+
+    def __init__(
+        self,
+        journal_dir: Path,
+        legacy_path: Optional[Path] = None,
+        segment_max_bytes: int = 4 * 1024 * 1024,
+        compact_ratio: float = 0.5,
+        background_compaction: bool = True,
+        fsync: bool = True,
+        group_commit_ms: float = 0.0
+    ):
+        """
+        Initialize the journal store
+
+        Args:
+            journal_dir: Directory holding the journal segments
+            legacy_path: JSON history file to migrate on first use
+            segment_max_bytes: Size at which the active segment is sealed
+            compact_ratio: Fraction of dead bytes that triggers compaction
+            background_compaction: Compact sealed segments in a daemon thread
+            fsync: Flush every commit to disk before acknowledging it
+            group_commit_ms: Batch writes arriving within this window into a
+                single append and fsync (0 disables group commit)
+        """
+        self.journal_dir = Path(journal_dir)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_ratio = compact_ratio
+        self.fsync = fsync
+        self._lock_path = self.journal_dir / self.LOCK_FILE
+        self._generation_path = self.journal_dir / self.GENERATION_FILE
+        self._generation = 0
+        self._committer = (
+            GroupCommitter(self._commit, window_ms=group_commit_ms)
+            if group_commit_ms > 0 else None
+        )
+
+        self._lock = threading.RLock()
+        self._index: Dict[str, _IndexEntry] = {}
+        self._segment_bytes: Dict[int, int] = {}
+        self._dead_bytes: Dict[int, int] = {}
+        self._active_segment = 1
+        self._active_file = None
+
+        self._compact_event = threading.Event()
+        self._closed = False
+        self._compactor: Optional[threading.Thread] = None
+
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        with self._lock, file_lock(self._lock_path):
+            self._load_index(repair=True)
+            self._migrate_legacy()
+
+        if background_compaction:
+            self._compactor = threading.Thread(
+                target=self._compaction_loop,
+                name='report-journal-compactor',
+                daemon=True
+            )
+            self._compactor.start()
+
+    # ------------------------------------------------------------------
+    # Public store API
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        """Return the number of live reports"""
+        with self._reading():
+            return len(self._index)
+
+    def put(self, report: Dict[str, Any]) -> None:
+        """Append a report record, replacing any earlier record with the same ID"""
+        self._write({'op': 'put', 'report': report})
+
+    def put_many(self, reports: List[Dict[str, Any]]) -> None:
+        """Append several report records with a single fsync"""
+        self._commit([{'op': 'put', 'report': report} for report in reports])
+
+    def delete(self, report_id: str) -> bool:
+        """Append a tombstone for a report; returns False if it does not exist"""
+        return self._write({'op': 'del', 'id': report_id})
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Read a single report using the offset index"""
+        with self._reading():
+            entry = self._index.get(report_id)
+            if entry is None:
+                return None
+            return self._read_record(entry)['report']
+
+    def list(
+        self,
+        limit: int,
+        offset: int,
+        sort_by: str,
+        descending: bool,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[Any, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Sort the in-memory summaries and return one page of them"""
+        with self._reading():
+            if sort_by in SUMMARY_FIELDS:
+                summaries = filter_reports(
+                    [e.summary for e in self._index.values()], filters
+                )
+                # Summaries are all a listing needs, so no record is read
+                page = sort_and_page(summaries, limit, offset, sort_by, descending, after)
+                return [dict(summary) for summary in page]
+
+            # Unindexed field: fall back to reading every live record
+            reports = filter_reports(self._all_records(), filters)
+            return sort_and_page(reports, limit, offset, sort_by, descending, after)
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Read every live report, in journal order"""
+        with self._reading():
+            return self._all_records()
+
+    def compact(self) -> int:
+        """
+        Rewrite sealed segments whose dead data exceeds the compaction ratio
+
+        Returns:
+            Number of bytes reclaimed
+        """
+        reclaimed = 0
+        with self._lock, file_lock(self._lock_path):
+            self._sync(repair=True)
+            for segment in sorted(self._segment_bytes):
+                if segment != self._active_segment and self._needs_compaction(segment):
+                    reclaimed += self._compact_segment(segment)
+            if reclaimed:
+                self._generation += 1
+                atomic_write_bytes(
+                    self._generation_path, str(self._generation).encode(), fsync=self.fsync
+                )
+        if reclaimed:
+            logger.info(f"Journal compaction reclaimed {reclaimed} bytes")
+        return reclaimed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return segment and dead-data statistics"""
+        with self._lock:
+            total = sum(self._segment_bytes.values())
+            dead = sum(self._dead_bytes.values())
+            stats = {
+                'reports': len(self._index),
+                'segments': len(self._segment_bytes),
+                'active_segment': self._active_segment,
+                'total_bytes': total,
+                'dead_bytes': dead,
+                'generation': self._generation,
+            }
+        if self._committer is not None:
+            stats['group_commit'] = self._committer.stats()
+        return stats
+
+    def close(self) -> None:
+        """Stop the compactor and close the active segment"""
+        self._closed = True
+        self._compact_event.set()
+        if self._compactor is not None:
+            self._compactor.join(timeout=5)
+        with self._lock:
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+
+    # ------------------------------------------------------------------
+    # Journal internals
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _reading(self) -> Iterator[None]:
+        """Hold the shared journal lock and catch up on other processes' writes"""
+        with self._lock, file_lock(self._lock_path, shared=True):
+            self._sync()
+            yield
+
+    def _write(self, record: Dict[str, Any]) -> Any:
+        if self._committer is not None:
+            return self._committer.submit(record)
+        result = self._commit([record])[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def _commit(self, records: List[Dict[str, Any]]) -> List[Any]:
+        """Durably append a batch of records under the exclusive journal lock"""
+        with self._lock, file_lock(self._lock_path):
+            self._sync(repair=True)
+            return self._append_records(records)
+
+    def _all_records(self) -> List[Dict[str, Any]]:
+        entries = sorted(self._index.values(), key=lambda e: (e.segment, e.offset))
+        return [self._read_record(e)['report'] for e in entries]
+
+    def _read_generation(self) -> int:
+        try:
+            return int(self._generation_path.read_text() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _reload(self, repair: bool) -> None:
+        """Discard the in-memory index and rebuild it from disk"""
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+        self._index.clear()
+        self._segment_bytes.clear()
+        self._dead_bytes.clear()
+        self._active_segment = 1
+        self._load_index(repair=repair)
+
+    def _sync(self, repair: bool = False) -> None:
+        """
+        Catch up with changes made by other processes
+
+        Must be called with the journal lock held. With ``repair`` (exclusive
+        lock only) a torn record left by a crashed writer is truncated.
+        """
+        if self._read_generation() != self._generation:
+            # Another process compacted the journal; offsets may have moved
+            self._reload(repair)
+            return
+
+        segment = self._active_segment
+        while True:
+            path = self._segment_path(segment)
+            known = self._segment_bytes.get(segment, 0)
+            if path.exists() and path.stat().st_size != known:
+                end = known
+                for offset, length, record in self._scan_segment(segment, start=known):
+                    self._apply(segment, offset, length, record)
+                    end = offset + length
+                self._segment_bytes[segment] = end
+                if repair and path.stat().st_size > end:
+                    logger.warning(f"Truncating incomplete record in journal segment {segment}")
+                    os.truncate(path, end)
+
+            if not self._segment_path(segment + 1).exists():
+                break
+            # Another process sealed this segment and started a new one
+            segment += 1
+            if self._active_file is not None:
+                self._active_file.close()
+                self._active_file = None
+            self._active_segment = segment
+            self._segment_bytes.setdefault(segment, 0)
+            self._dead_bytes.setdefault(segment, 0)
+
+    def _segment_path(self, segment: int) -> Path:
+        return self.journal_dir / f"{segment:06d}{self.SEGMENT_SUFFIX}"
+
+    def _existing_segments(self) -> List[int]:
+        segments = []
+        for path in self.journal_dir.glob(f"*{self.SEGMENT_SUFFIX}"):
+            try:
+                segments.append(int(path.stem))
+            except ValueError:
+                continue
+        return sorted(segments)
+
+    def _scan_segment(
+        self,
+        segment: int,
+        start: int = 0
+    ) -> Iterator[Tuple[int, int, Optional[Dict[str, Any]]]]:
+        """
+        Yield (offset, length, record) for every complete line in a segment
+
+        Corrupted lines are yielded with a record of None so callers can
+        still account for their bytes.
+        """
+        offset = start
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(start)
+            for line in f:
+                length = len(line)
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupted record in journal segment {segment}")
+                    record = None
+                yield offset, length, record
+                offset += length
+
+    def _load_index(self, repair: bool = False) -> None:
+        """Replay all segments to rebuild the offset index"""
+        self._generation = self._read_generation()
+        segments = self._existing_segments()
+        for segment in segments:
+            self._dead_bytes[segment] = 0
+            if repair:
+                self._segment_bytes[segment] = self._truncate_torn_tail(segment)
+            end = 0
+            for offset, length, record in self._scan_segment(segment):
+                self._apply(segment, offset, length, record)
+                end = offset + length
+            self._segment_bytes[segment] = end
+        if segments:
+            self._active_segment = segments[-1]
+        else:
+            self._segment_bytes[self._active_segment] = 0
+            self._dead_bytes[self._active_segment] = 0
+
+    def _truncate_torn_tail(self, segment: int) -> int:
+        """Drop a partially written record left by a crash; returns the valid size"""
+        path = self._segment_path(segment)
+        with open(path, 'rb+') as f:
+            data = f.read()
+            valid_size = data.rfind(b'\n') + 1
+            if valid_size < len(data):
+                logger.warning(f"Truncating incomplete record in journal segment {segment}")
+                f.truncate(valid_size)
+        return valid_size
+
+    def _apply(
+        self,
+        segment: int,
+        offset: int,
+        length: int,
+        record: Optional[Dict[str, Any]]
+    ) -> None:
+        """Apply a journal record to the in-memory index"""
+        if record is None:
+            return
+        if record.get('op') == 'put':
+            report = record.get('report') or {}
+            report_id = report.get('id')
+            if report_id is None:
+                return
+            self._mark_dead(report_id)
+            summary = {field: report.get(field) for field in SUMMARY_FIELDS}
+            self._index[report_id] = _IndexEntry(segment, offset, length, summary)
+        elif record.get('op') == 'del':
+            self._mark_dead(record.get('id'))
+            self._index.pop(record.get('id'), None)
+
+    def _mark_dead(self, report_id: Optional[str]) -> None:
+        previous = self._index.get(report_id)
+        if previous is not None:
+            self._dead_bytes[previous.segment] = (
+                self._dead_bytes.get(previous.segment, 0) + previous.length
+            )
+
+    def _append_records(self, records: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Write records to the active segment with one write and one fsync
+
+        Must be called with the exclusive journal lock held.
+
+        Returns:
+            One result per record: None for puts, True/False for deletes
+        """
+        if self._segment_bytes.get(self._active_segment, 0) >= self.segment_max_bytes:
+            self._roll_segment()
+
+        segment = self._active_segment
+        offset = self._segment_bytes.get(segment, 0)
+        results: List[Any] = []
+        lines = []
+        for record in records:
+            if record['op'] == 'del' and record['id'] not in self._index:
+                results.append(False)
+                continue
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            self._apply(segment, offset, len(line), record)
+            lines.append(line)
+            offset += len(line)
+            results.append(True if record['op'] == 'del' else None)
+
+        if not lines:
+            return results
+
+        try:
+            if self._active_file is None:
+                self._active_file = open(self._segment_path(segment), 'ab')
+            self._active_file.write(b''.join(lines))
+            self._active_file.flush()
+            if self.fsync:
+                os.fsync(self._active_file.fileno())
+        except Exception:
+            # The index already reflects the batch; rebuild it from disk
+            self._reload(repair=True)
+            raise
+        self._segment_bytes[segment] = offset
+
+        if any(
+            self._needs_compaction(s) for s in self._segment_bytes if s != self._active_segment
+        ):
+            self._compact_event.set()
+        return results
+
+    def _roll_segment(self) -> None:
+        """Seal the active segment and start a new one"""
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+        self._active_segment += 1
+        self._segment_bytes[self._active_segment] = 0
+        self._dead_bytes[self._active_segment] = 0
+
+    def _read_record(self, entry: _IndexEntry) -> Dict[str, Any]:
+        if entry.segment == self._active_segment and self._active_file is not None:
+            self._active_file.flush()
+        with open(self._segment_path(entry.segment), 'rb') as f:
+            f.seek(entry.offset)
+            return json.loads(f.read(entry.length))
+
+    def _needs_compaction(self, segment: int) -> bool:
+        total = self._segment_bytes.get(segment, 0)
+        return total > 0 and self._dead_bytes.get(segment, 0) / total >= self.compact_ratio
+
+    def _compact_segment(self, segment: int) -> int:
+        """Rewrite a sealed segment keeping only live records and needed tombstones"""
+        path = self._segment_path(segment)
+        oldest = segment == min(self._segment_bytes)
+
+        relocated: Dict[str, _IndexEntry] = {}
+        new_offset = 0
+        lines = []
+        for offset, length, record in self._scan_segment(segment):
+            if record is None:
+                continue
+            if record.get('op') == 'put':
+                report_id = record['report'].get('id')
+                entry = self._index.get(report_id)
+                if entry is None or (entry.segment, entry.offset) != (segment, offset):
+                    continue
+                relocated[report_id] = entry._replace(offset=new_offset)
+            elif oldest:
+                # Nothing older can be resurrected by dropping the tombstone
+                continue
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            lines.append(line)
+            new_offset += len(line)
+
+        reclaimed = self._segment_bytes[segment] - new_offset
+        if new_offset == 0:
+            path.unlink()
+            del self._segment_bytes[segment]
+            del self._dead_bytes[segment]
+        else:
+            atomic_write_bytes(path, b''.join(lines), fsync=self.fsync)
+            self._segment_bytes[segment] = new_offset
+            self._dead_bytes[segment] = 0
+        self._index.update(relocated)
+        return reclaimed
+
+    def _compaction_loop(self) -> None:
+        while not self._closed:
+            self._compact_event.wait()
+            self._compact_event.clear()
+            if self._closed:
+                break
+            try:
+                self.compact()
+            except Exception as e:
+                logger.error(f"Journal compaction failed: {str(e)}")
+
+    def _migrate_legacy(self) -> None:
+        """
+        Import an existing JSON history file into an empty journal
+
+        Called with the exclusive journal lock held, so only one process
+        performs the migration.
+        """
+        if self._index or self.legacy_path is None or not self.legacy_path.exists():
+            return
+        try:
+            with open(self.legacy_path, 'r') as f:
+                reports = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not migrate legacy report history: {str(e)}")
+            return
+        if not isinstance(reports, list):
+            return
+
+        self._append_records([
+            {'op': 'put', 'report': report}
+            for report in reports
+            if isinstance(report, dict) and report.get('id')
+        ])
+
+        migrated_path = self.legacy_path.with_name(self.legacy_path.name + '.migrated')
+        self.legacy_path.replace(migrated_path)
+        logger.info(
+            f"Migrated {len(self._index)} reports from {self.legacy_path} "
+            f"to journal {self.journal_dir}"
+        )
+
@@ -0,0 +1,250 @@
+import re
+import sqlite3
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable
+import logging
+
+from .sqlite_utils import ThreadConnections
+
+logger = logging.getLogger(__name__)
+
+# Title matches weigh more than body matches in the BM25 score
+TITLE_WEIGHT = 5.0
+CONTENT_WEIGHT = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_docs (
+    rowid INTEGER PRIMARY KEY,
+    report_id TEXT UNIQUE NOT NULL,
+    title TEXT,
+    template TEXT,
+    date TEXT,
+    priority TEXT,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_report_docs_date ON report_docs (date);
+CREATE INDEX IF NOT EXISTS idx_report_docs_template ON report_docs (template, date);
+CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5(
+    title, content, tokenize = 'porter unicode61'
+);
+"""
+
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchUnavailableError(RuntimeError):
+    """Raised when the SQLite build has no FTS5 support"""
+
+
+class ReportSearchIndex:
+    """
+    Persistent full-text index over report titles and content.
+
+    Backed by a SQLite FTS5 table, so postings are updated incrementally on
+    every save/delete and queries are ranked with BM25 without reading the
+    report store. Summary fields are kept alongside the index so results can
+    be filtered by date and template and returned without loading bodies.
+    """
+
+    def __init__(self, index_path: Path, max_candidates: int = 10000):
+        """
+        Open (or create) the search index
+
+        Args:
+            index_path: Path to the SQLite file holding the index
+            max_candidates: Number of matches BM25-ranked per window
+        """
+        self.index_path = Path(index_path)
+        self.max_candidates = max_candidates
+        self._connections = ThreadConnections(self._connect)
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with self._connection() as conn:
+                conn.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            if 'fts5' in str(e).lower():
+                raise SearchUnavailableError(
+                    "Full-text search requires SQLite with the FTS5 extension"
+                ) from e
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        return self._connections.get()
+
+    def count(self) -> int:
+        """Return the number of indexed reports"""
+        return self._connection().execute('SELECT COUNT(*) FROM report_docs').fetchone()[0]
+
+    def add(self, report: Dict[str, Any]) -> None:
+        """Index a report, replacing any previous version with the same ID"""
+        self.add_many([report])
+
+    def add_many(self, reports: Iterable[Dict[str, Any]]) -> None:
+        """Index several reports in one transaction"""
+        with self._connection() as conn:
+            for report in reports:
+                self._remove(conn, report['id'])
+                cursor = conn.execute(
+                    'INSERT INTO report_docs '
+                    '(report_id, title, template, date, priority, created_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (
+                        report['id'],
+                        report.get('title'),
+                        report.get('template'),
+                        report.get('date'),
+                        report.get('priority'),
+                        report.get('created_at'),
+                    )
+                )
+                conn.execute(
+                    'INSERT INTO report_fts (rowid, title, content) VALUES (?, ?, ?)',
+                    (cursor.lastrowid, report.get('title') or '', report.get('content') or '')
+                )
+
+    def remove(self, report_id: str) -> bool:
+        """Remove a report from the index; returns False if it was not indexed"""
+        with self._connection() as conn:
+            return self._remove(conn, report_id)
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, report_id: str) -> bool:
+        row = conn.execute(
+            'SELECT rowid FROM report_docs WHERE report_id = ?', (report_id,)
+        ).fetchone()
+        if row is None:
+            return False
+        conn.execute('DELETE FROM report_fts WHERE rowid = ?', (row['rowid'],))
+        conn.execute('DELETE FROM report_docs WHERE rowid = ?', (row['rowid'],))
+        return True
+
+    def clear(self) -> None:
+        """Drop every indexed report"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM report_fts')
+            conn.execute('DELETE FROM report_docs')
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        template: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run a ranked keyword search
+
+        Matches are ranked with BM25 in windows of ``max_candidates`` reports,
+        newest first. Rare terms are ranked exactly; for terms matching more
+        reports than one window, the best matches among the most recent
+        reports are returned first, which keeps query time bounded.
+
+        Args:
+            query: Free-text keywords (any keyword may match)
+            limit: Maximum number of results
+            template: Only include reports using this template
+            date_from: Only include reports dated on or after this ISO date
+            date_to: Only include reports dated on or before this ISO date
+
+        Returns:
+            Report summaries ordered by relevance, each with a 'score'
+            (higher is better)
+        """
+        match = self._match_expression(query)
+        if not match:
+            return []
+
+        filters = {'template': template, 'date_from': date_from, 'date_to': date_to}
+        results: List[Dict[str, Any]] = []
+        upper = None
+        while len(results) < limit:
+            lower = self._window_start(match, upper)
+            results.extend(
+                self._rank_window(match, lower, upper, filters, limit - len(results))
+            )
+            if lower is None:
+                break
+            upper = lower
+        return results
+
+    def _window_start(self, match: str, upper: Optional[int]) -> Optional[int]:
+        """Return the lowest rowid of the next window of matches, or None if it reaches the oldest"""
+        query = 'SELECT rowid FROM report_fts WHERE report_fts MATCH ?'
+        params: List[Any] = [match]
+        if upper is not None:
+            query += ' AND rowid < ?'
+            params.append(upper)
+        query += ' ORDER BY rowid DESC LIMIT 1 OFFSET ?'
+        params.append(self.max_candidates)
+        row = self._connection().execute(query, params).fetchone()
+        # The row found is the first one outside the window
+        return row[0] + 1 if row else None
+
+    def _rank_window(
+        self,
+        match: str,
+        lower: Optional[int],
+        upper: Optional[int],
+        filters: Dict[str, Any],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """BM25-rank the matches with lower <= rowid < upper"""
+        window_clauses = ['report_fts MATCH ?']
+        window_params: List[Any] = [match]
+        if lower is not None:
+            window_clauses.append('rowid >= ?')
+            window_params.append(lower)
+        if upper is not None:
+            window_clauses.append('rowid < ?')
+            window_params.append(upper)
+
+        clauses = []
+        params: List[Any] = []
+        if filters['template']:
+            clauses.append('d.template = ?')
+            params.append(filters['template'])
+        if filters['date_from']:
+            clauses.append('d.date >= ?')
+            params.append(filters['date_from'])
+        if filters['date_to']:
+            clauses.append('d.date <= ?')
+            params.append(filters['date_to'])
+
+        rows = self._connection().execute(
+            'SELECT d.report_id AS id, d.title, d.template, d.date, d.priority, '
+            'd.created_at, f.rank '
+            'FROM (SELECT rowid, bm25(report_fts, ?, ?) AS rank FROM report_fts '
+            f"WHERE {' AND '.join(window_clauses)}) AS f "
+            'JOIN report_docs d ON d.rowid = f.rowid '
+            + (f"WHERE {' AND '.join(clauses)} " if clauses else '')
+            + 'ORDER BY f.rank LIMIT ?',
+            [TITLE_WEIGHT, CONTENT_WEIGHT] + window_params + params + [limit]
+        ).fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(row)
+            # FTS5 ranks are negative, lower is better
+            result['score'] = -result.pop('rank')
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _match_expression(query: str) -> str:
+        """Turn free text into a safe FTS5 OR-query of quoted terms"""
+        tokens = _TOKEN_PATTERN.findall(query.lower())
+        return ' OR '.join(f'"{token}"' for token in dict.fromkeys(tokens))
+
+    def close(self) -> None:
+        """Close every connection opened by this index"""
+        self._connections.close()
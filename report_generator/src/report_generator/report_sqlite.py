@@ -0,0 +1,214 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+from .report_utils import SUMMARY_FIELDS
+from .sqlite_utils import ThreadConnections
+
+logger = logging.getLogger(__name__)
+
+# Summary columns that have their own column (and index) in the reports table
+INDEXED_COLUMNS = ('created_at', 'date', 'template', 'priority', 'title', 'id')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    template TEXT,
+    date TEXT,
+    priority TEXT,
+    created_at TEXT,
+    body TEXT NOT NULL
+);
+DROP INDEX IF EXISTS idx_reports_created_at;
+DROP INDEX IF EXISTS idx_reports_date;
+DROP INDEX IF EXISTS idx_reports_template;
+DROP INDEX IF EXISTS idx_reports_priority;
+CREATE INDEX IF NOT EXISTS idx_reports_created_at_key ON reports (COALESCE(created_at, ''), id);
+CREATE INDEX IF NOT EXISTS idx_reports_date_key ON reports (COALESCE(date, ''), id);
+CREATE INDEX IF NOT EXISTS idx_reports_template_key ON reports (template, COALESCE(created_at, ''), id);
+CREATE INDEX IF NOT EXISTS idx_reports_priority_key ON reports (priority, COALESCE(created_at, ''), id);
+"""
+
+
+class SqliteReportStore:
+    """
+    Stores reports in a SQLite database.
+
+    Summary fields live in indexed columns so sorting, filtering and
+    pagination run inside the query; the full report is kept as JSON in the
+    ``body`` column and is only read by ``get``.
+    """
+
+    def __init__(self, db_path: Path, legacy_path: Optional[Path] = None, timeout: float = 30.0):
+        """
+        Initialize the SQLite store
+
+        Args:
+            db_path: Path to the SQLite database file
+            legacy_path: JSON history file to migrate on first use
+            timeout: Seconds to wait for a lock held by another connection
+        """
+        self.db_path = Path(db_path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.timeout = timeout
+        self._connections = ThreadConnections(self._connect)
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+        self._migrate_legacy()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections are only used by their own thread, but are closed on
+        # whichever thread calls close() or collects them
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        # WAL lets Streamlit sessions read while another one writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        return self._connections.get()
+
+    def count(self) -> int:
+        """Return the number of stored reports"""
+        return self._connection().execute('SELECT COUNT(*) FROM reports').fetchone()[0]
+
+    def put(self, report: Dict[str, Any]) -> None:
+        """Insert or replace a report"""
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO reports '
+                '(id, title, template, date, priority, created_at, body) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self._row(report)
+            )
+
+    def put_many(self, reports: List[Dict[str, Any]]) -> None:
+        """Insert or replace several reports in one transaction"""
+        with self._connection() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO reports '
+                '(id, title, template, date, priority, created_at, body) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [self._row(report) for report in reports]
+            )
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Load the full report for an ID"""
+        row = self._connection().execute(
+            'SELECT body FROM reports WHERE id = ?', (report_id,)
+        ).fetchone()
+        return json.loads(row['body']) if row else None
+
+    def delete(self, report_id: str) -> bool:
+        """Delete a report; returns False if it does not exist"""
+        with self._connection() as conn:
+            cursor = conn.execute('DELETE FROM reports WHERE id = ?', (report_id,))
+            return cursor.rowcount > 0
+
+    def list(
+        self,
+        limit: int,
+        offset: int,
+        sort_by: str,
+        descending: bool,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[Any, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Run a single query that filters, sorts and pages report summaries"""
+        clauses = []
+        params: List[Any] = []
+
+        for column in ('template', 'priority'):
+            if filters.get(column):
+                clauses.append(f'{column} = ?')
+                params.append(filters[column])
+        if filters.get('date_from'):
+            clauses.append('date >= ?')
+            params.append(filters['date_from'])
+        if filters.get('date_to'):
+            clauses.append('date <= ?')
+            params.append(filters['date_to'])
+
+        if sort_by in INDEXED_COLUMNS:
+            # Missing values sort as '' like the other backends; the
+            # expression matches the indexes so SQLite can still walk them
+            sort_expr = f"COALESCE({sort_by}, '')"
+            sort_params: List[Any] = []
+        else:
+            # Fields without a column are sorted from the JSON body
+            sort_expr = "COALESCE(json_extract(body, ?), '')"
+            sort_params = [f'$.{sort_by}']
+
+        if after is not None:
+            comparison = '<' if descending else '>'
+            cursor = [after[0] or '', after[1] or '']
+            # The redundant single-column bound lets SQLite seek the
+            # expression index, which it does not do for row values
+            clauses.append(f'{sort_expr} {comparison}= ?')
+            clauses.append(f'({sort_expr}, id) {comparison} (?, ?)')
+            params.extend(sort_params + cursor[:1] + sort_params + cursor)
+
+        direction = 'DESC' if descending else 'ASC'
+        query = (
+            f"SELECT {', '.join(SUMMARY_FIELDS)} FROM reports"
+            + (f" WHERE {' AND '.join(clauses)}" if clauses else '')
+            + f" ORDER BY {sort_expr} {direction}, id {direction} LIMIT ? OFFSET ?"
+        )
+        params.extend(sort_params + [limit, offset])
+
+        rows = self._connection().execute(query, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Load every stored report in insertion order"""
+        rows = self._connection().execute('SELECT body FROM reports ORDER BY rowid').fetchall()
+        return [json.loads(row['body']) for row in rows]
+
+    def close(self) -> None:
+        """Close every connection opened by this store"""
+        self._connections.close()
+
+    @staticmethod
+    def _row(report: Dict[str, Any]) -> Tuple[Any, ...]:
+        return (
+            report['id'],
+            report.get('title'),
+            report.get('template'),
+            report.get('date'),
+            report.get('priority'),
+            report.get('created_at'),
+            json.dumps(report, ensure_ascii=False),
+        )
+
+    def _migrate_legacy(self) -> None:
+        """Import an existing JSON history file into an empty database"""
+        if self.legacy_path is None or not self.legacy_path.exists() or self.count():
+            return
+        try:
+            with open(self.legacy_path, 'r') as f:
+                reports = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Could not migrate legacy report history: {str(e)}")
+            return
+        if not isinstance(reports, list):
+            return
+
+        rows = [self._row(r) for r in reports if isinstance(r, dict) and r.get('id')]
+        with self._connection() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO reports '
+                '(id, title, template, date, priority, created_at, body) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+
+        migrated_path = self.legacy_path.with_name(self.legacy_path.name + '.migrated')
+        self.legacy_path.replace(migrated_path)
+        logger.info(f"Migrated {len(rows)} reports from {self.legacy_path} to {self.db_path}")
@@ -1,157 +1,636 @@
 import json
+import os
+import shutil
+import threading
+import uuid
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import logging
 
+from .storage_utils import GroupCommitter, atomic_write_bytes, file_lock
+
 logger = logging.getLogger(__name__)
 
+STORAGE_BACKENDS = ('json', 'journal', 'sqlite')
+
+# Fields that describe a report without its generated content
+SUMMARY_FIELDS = ('id', 'title', 'template', 'date', 'priority', 'created_at')
+
+# Marker stored in a metadata record whose content lives in the body store
+BODY_EXTERNAL_FIELD = 'body_external'
+
+def summarize_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the lightweight summary of a report record"""
+    return {field: report.get(field) for field in SUMMARY_FIELDS}
+
+def filter_reports(
+    reports: List[Dict[str, Any]],
+    filters: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    """
+    Apply list_reports filters to an in-memory list of reports
+
+    Args:
+        reports: Reports (or report summaries) to filter
+        filters: Dictionary with optional 'template', 'priority',
+            'date_from' and 'date_to' keys
+
+    Returns:
+        The reports matching every given filter
+    """
+    template = filters.get('template')
+    priority = filters.get('priority')
+    date_from = filters.get('date_from')
+    date_to = filters.get('date_to')
+
+    def matches(report: Dict[str, Any]) -> bool:
+        if template and report.get('template') != template:
+            return False
+        if priority and report.get('priority') != priority:
+            return False
+        if date_from and (report.get('date') or '') < date_from:
+            return False
+        if date_to and (report.get('date') or '') > date_to:
+            return False
+        return True
+
+    if not any((template, priority, date_from, date_to)):
+        return reports
+    return [r for r in reports if matches(r)]
+
+def sort_and_page(
+    reports: List[Dict[str, Any]],
+    limit: int,
+    offset: int,
+    sort_by: str,
+    descending: bool,
+    after: Optional[Tuple[Any, str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Sort reports in memory and return one page
+
+    Args:
+        reports: Reports (or report summaries) to page through
+        limit: Maximum number of reports to return
+        offset: Number of reports to skip
+        sort_by: Field to sort by
+        descending: Sort in descending order
+        after: Keyset cursor as (sort value, id) of the last report of the
+            previous page
+
+    Returns:
+        The requested page of reports
+    """
+    def key(report: Dict[str, Any]) -> Tuple[Any, str]:
+        return (report.get(sort_by) or '', report.get('id') or '')
+
+    try:
+        reports = sorted(reports, key=key, reverse=descending)
+        if after is not None:
+            cursor = (after[0] or '', after[1] or '')
+            if descending:
+                reports = [r for r in reports if key(r) < cursor]
+            else:
+                reports = [r for r in reports if key(r) > cursor]
+    except TypeError:
+        logger.warning(f"Could not sort by {sort_by}, using default sorting")
+
+    return reports[offset:offset + limit]
+
 class ReportManager:
     """Manages report storage and retrieval"""
-    
-    def __init__(self, storage_path: Path):
+
+    def __init__(
+        self,
+        storage_path: Path,
+        backend: str = 'json',
+        search: bool = False,
+        split_bodies: bool = False,
+        **backend_options: Any
+    ):
         """
         Initialize the ReportManager
-        
+
         Args:
             storage_path: Path to the JSON file where reports will be stored
+            backend: Storage backend to use ('json', 'journal' or 'sqlite')
+            search: Maintain a full-text search index next to the storage
+            split_bodies: Store report content compressed in a separate
+                body store, keeping only metadata in the report storage
+            **backend_options: Extra options passed to the storage backend
         """
-        self.storage_path = storage_path
-        self._ensure_storage_exists()
-    
-    def _ensure_storage_exists(self) -> None:
-        """Ensure the storage file and parent directory exist"""
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(
+                f"Unknown storage backend '{backend}'. "
+                f"Choose one of: {', '.join(STORAGE_BACKENDS)}"
+            )
+        self.storage_path = Path(storage_path)
+        self.backend = backend
+        self._store = self._create_store(backend, backend_options)
+        self._bodies = None
+        if split_bodies:
+            from .report_bodies import ReportBodyStore
+
+            self._bodies = ReportBodyStore(
+                self.storage_path.with_suffix('.bodies'),
+                fsync=backend_options.get('fsync', True)
+            )
+        self._search = self._open_search_index() if search else None
+
+    def _create_store(self, backend: str, options: Dict[str, Any]):
+        """Create the storage backend for this manager"""
         try:
-            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-            if not self.storage_path.exists():
-                with open(self.storage_path, 'w') as f:
-                    json.dump([], f)
+            if backend == 'journal':
+                from .report_journal import JournalReportStore
+
+                # The journal lives next to the legacy JSON file, which is
+                # migrated into it automatically on first use
+                return JournalReportStore(
+                    self.storage_path.with_suffix('.journal'),
+                    legacy_path=self.storage_path,
+                    **options
+                )
+            if backend == 'sqlite':
+                from .report_sqlite import SqliteReportStore
+
+                return SqliteReportStore(
+                    self.storage_path.with_suffix('.db'),
+                    legacy_path=self.storage_path,
+                    **options
+                )
+            return JsonReportStore(self.storage_path, **options)
         except Exception as e:
             logger.error(f"Failed to initialize report storage: {str(e)}")
             raise
-    
+
+    def _open_search_index(self):
+        """Open the full-text index, building it from storage the first time"""
+        from .report_search import ReportSearchIndex, SearchUnavailableError
+
+        try:
+            index = ReportSearchIndex(self.storage_path.with_suffix('.search.db'))
+        except SearchUnavailableError as e:
+            logger.warning(f"Report search disabled: {str(e)}")
+            return None
+
+        if index.count() == 0 and self._store.count() > 0:
+            logger.info("Building report search index")
+            index.add_many(self._attach_body(r) for r in self._store.all())
+        return index
+
+    def _attach_body(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a stored record into a full report, loading its body if needed"""
+        if not record.get(BODY_EXTERNAL_FIELD):
+            return record
+        report = {k: v for k, v in record.items() if k != BODY_EXTERNAL_FIELD}
+        body = self._bodies.get(record['id']) if self._bodies is not None else None
+        if body is None:
+            logger.error(f"Body of report {record['id']} is missing")
+        report['content'] = body or ''
+        return report
+
+    @property
+    def search_enabled(self) -> bool:
+        """Whether full-text search is available"""
+        return self._search is not None
+
     def save_report(self, report_data: Dict[str, Any]) -> str:
         """
         Save a report to the storage
-        
+
         Args:
-            report_data: Dictionary containing report data
-            
+            report_data: Dictionary containing report data. An existing
+                'id' or 'created_at' is kept, otherwise one is generated.
+
         Returns:
             The ID of the saved report
         """
         try:
-            # Load existing reports
-            reports = self._load_reports()
-            
-            # Generate a unique ID for the report
-            report_id = f"report_{len(reports) + 1}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            # Add metadata
-            report_data.update({
-                'id': report_id,
-                'created_at': datetime.now().isoformat(),
-            })
-            
-            # Add to reports
-            reports.append(report_data)
-            
-            # Save back to file
-            self._save_reports(reports)
-            
-            return report_id
-            
+            self._store.put(self._prepare_record(report_data))
+            self._index_reports([report_data])
+            return report_data['id']
+
         except Exception as e:
             logger.error(f"Failed to save report: {str(e)}")
             raise
-    
+
+    def save_reports(self, reports: List[Dict[str, Any]]) -> List[str]:
+        """
+        Save several reports with one storage write and one index update
+
+        Much cheaper than calling save_report in a loop: the JSON backend
+        rewrites its file once, the journal fsyncs once and SQLite commits
+        one transaction.
+
+        Args:
+            reports: Report dictionaries, completed as in save_report
+
+        Returns:
+            The IDs of the saved reports, in order
+        """
+        if not reports:
+            return []
+        try:
+            self._store.put_many([self._prepare_record(report) for report in reports])
+            self._index_reports(reports)
+            return [report['id'] for report in reports]
+
+        except Exception as e:
+            logger.error(f"Failed to save {len(reports)} reports: {str(e)}")
+            raise
+
+    def _prepare_record(self, report_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill in a report's ID and creation time and return the record to store"""
+        # Generate a unique ID for the report; the random suffix keeps IDs
+        # unique when several processes save within the same second
+        if not report_data.get('id'):
+            report_data['id'] = (
+                f"report_{self._store.count() + 1}_"
+                f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_"
+                f"{uuid.uuid4().hex[:6]}"
+            )
+
+        # Add metadata
+        report_data.setdefault('created_at', datetime.now().isoformat())
+
+        if self._bodies is None:
+            return dict(report_data)
+        # Write the body first so stored metadata never points at a
+        # missing body
+        record = {k: v for k, v in report_data.items() if k != 'content'}
+        self._bodies.put(report_data['id'], report_data.get('content') or '')
+        record[BODY_EXTERNAL_FIELD] = True
+        return record
+
+    def _index_reports(self, reports: List[Dict[str, Any]]) -> None:
+        if self._search is None:
+            return
+        try:
+            self._search.add_many(reports)
+        except Exception as e:
+            # The reports are saved; rebuild_search_index() can repair this
+            ids = ', '.join(report['id'] for report in reports)
+            logger.error(f"Failed to index reports {ids}: {str(e)}")
+
     def get_report(self, report_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve a report by ID
-        
+
         Args:
             report_id: ID of the report to retrieve
-            
+
         Returns:
             The report data or None if not found
         """
-        reports = self._load_reports()
-        for report in reports:
-            if report.get('id') == report_id:
-                return report
-        return None
-    
+        record = self._store.get(report_id)
+        return self._attach_body(record) if record is not None else None
+
     def list_reports(
-        self, 
-        limit: int = 10, 
+        self,
+        limit: int = 10,
         offset: int = 0,
         sort_by: str = 'created_at',
-        descending: bool = True
+        descending: bool = True,
+        template: Optional[str] = None,
+        priority: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[Any, str]] = None
     ) -> List[Dict[str, Any]]:
         """
-        List all reports with pagination and sorting
-        
+        List all reports with pagination, sorting and filtering
+
         Args:
             limit: Maximum number of reports to return
             offset: Number of reports to skip
             sort_by: Field to sort by
             descending: Sort in descending order
-            
+            template: Only include reports using this template
+            priority: Only include reports with this priority
+            date_from: Only include reports dated on or after this ISO date
+            date_to: Only include reports dated on or before this ISO date
+            after: Keyset cursor as (sort value, id) of the last report of
+                the previous page; more efficient than a large offset
+
         Returns:
-            List of report summaries
+            List of report summaries (see SUMMARY_FIELDS); use get_report
+            to load a report's content
         """
-        reports = self._load_reports()
-        
-        # Sort reports
-        try:
-            reports.sort(
-                key=lambda x: x.get(sort_by, ''), 
-                reverse=descending
-            )
-        except (KeyError, TypeError):
-            logger.warning(f"Could not sort by {sort_by}, using default sorting")
-        
-        # Apply pagination
-        return reports[offset:offset + limit]
-    
+        filters = {
+            'template': template,
+            'priority': priority,
+            'date_from': date_from,
+            'date_to': date_to,
+        }
+        return [
+            summarize_report(record)
+            for record in self._store.list(limit, offset, sort_by, descending, filters, after)
+        ]
+
     def delete_report(self, report_id: str) -> bool:
         """
         Delete a report by ID
-        
+
         Args:
             report_id: ID of the report to delete
-            
+
         Returns:
             True if deleted, False if not found
         """
-        reports = self._load_reports()
-        initial_count = len(reports)
-        
-        # Filter out the report to delete
-        reports = [r for r in reports if r.get('id') != report_id]
-        
-        if len(reports) < initial_count:
-            self._save_reports(reports)
-            return True
-        return False
-    
-    def _load_reports(self) -> List[Dict[str, Any]]:
-        """Load all reports from storage"""
+        deleted = self._store.delete(report_id)
+        if deleted and self._bodies is not None:
+            self._bodies.delete(report_id)
+        if self._search is not None:
+            try:
+                self._search.remove(report_id)
+            except Exception as e:
+                logger.error(f"Failed to remove report {report_id} from search index: {str(e)}")
+        return deleted
+
+    def search_reports(
+        self,
+        query: str,
+        limit: int = 10,
+        template: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search report titles and content, ranked by relevance (BM25)
+
+        Args:
+            query: Free-text keywords
+            limit: Maximum number of results
+            template: Only include reports using this template
+            date_from: Only include reports dated on or after this ISO date
+            date_to: Only include reports dated on or before this ISO date
+
+        Returns:
+            Report summaries with a relevance 'score', best match first
+        """
+        if self._search is None:
+            raise RuntimeError("Search is not enabled for this ReportManager")
+        return self._search.search(
+            query,
+            limit=limit,
+            template=template,
+            date_from=date_from,
+            date_to=date_to
+        )
+
+    def rebuild_search_index(self) -> int:
+        """
+        Re-index every stored report
+
+        Returns:
+            Number of reports indexed
+        """
+        if self._search is None:
+            raise RuntimeError("Search is not enabled for this ReportManager")
+        reports = [self._attach_body(r) for r in self._store.all()]
+        self._search.clear()
+        self._search.add_many(reports)
+        return len(reports)
+
+    def get_report_count(self) -> int:
+        """Get the total number of reports"""
+        return self._store.count()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get read cache statistics for the storage backend
+
+        Returns:
+            Hit/miss counters, or an empty dict if the backend has no cache
+        """
+        cache_stats = getattr(self._store, 'cache_stats', None)
+        return cache_stats() if cache_stats is not None else {}
+
+    def close(self) -> None:
+        """Release any resources held by the storage backend"""
+        close = getattr(self._store, 'close', None)
+        if close is not None:
+            close()
+        if self._search is not None:
+            self._search.close()
+
+
+class JsonReportStore:
+    """
+    Stores the whole report history as a single JSON array.
+
+    Parsed reports are cached in memory together with an id -> report map.
+    The cache is keyed on the file's (mtime_ns, size, inode), so the file is
+    only re-parsed when another process has changed it.
+
+    Writes are safe across processes: each commit holds an exclusive lock on
+    ``<file>.lock``, re-reads the latest history, and replaces the file
+    atomically with write-to-temp-and-rename.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path,
+        cache: bool = True,
+        fsync: bool = True,
+        group_commit_ms: float = 0.0
+    ):
+        """
+        Initialize the JSON store
+
+        Args:
+            storage_path: Path to the JSON file where reports will be stored
+            cache: Keep the parsed history in memory between calls
+            fsync: Flush every commit to disk before acknowledging it
+            group_commit_ms: Batch writes arriving within this window into a
+                single rewrite and fsync (0 disables group commit)
+        """
+        self.storage_path = storage_path
+        self.lock_path = storage_path.with_name(storage_path.name + '.lock')
+        self.fsync = fsync
+        self._committer = (
+            GroupCommitter(self._commit, window_ms=group_commit_ms)
+            if group_commit_ms > 0 else None
+        )
+        self.cache_enabled = cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache_lock = threading.Lock()
+        self._cached_signature: Optional[Tuple[int, int, int]] = None
+        self._cached_reports: List[Dict[str, Any]] = []
+        self._cached_by_id: Dict[str, Dict[str, Any]] = {}
+        self._ensure_storage_exists()
+
+    def _ensure_storage_exists(self) -> None:
+        """Ensure the storage file and parent directory exist"""
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.storage_path.exists():
+            with file_lock(self.lock_path):
+                if not self.storage_path.exists():
+                    atomic_write_bytes(self.storage_path, b'[]', fsync=self.fsync)
+
+    def count(self) -> int:
+        """Return the number of stored reports"""
+        return len(self._load_reports())
+
+    def put(self, report: Dict[str, Any]) -> None:
+        """Add a report, replacing any existing report with the same ID"""
+        self._write(('put', report))
+
+    def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Find a report by ID"""
+        self._load_reports()
+        report = self._cached_by_id.get(report_id)
+        return dict(report) if report is not None else None
+
+    def list(
+        self,
+        limit: int,
+        offset: int,
+        sort_by: str,
+        descending: bool,
+        filters: Dict[str, Any],
+        after: Optional[Tuple[Any, str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Filter and sort all reports and return one page"""
+        reports = filter_reports(self._load_reports(), filters)
+        page = sort_and_page(reports, limit, offset, sort_by, descending, after)
+        # Copies keep callers from mutating the cached history
+        return [dict(report) for report in page]
+
+    def put_many(self, reports: List[Dict[str, Any]]) -> None:
+        """Add several reports with one locked rewrite"""
+        self._commit([('put', report) for report in reports])
+
+    def delete(self, report_id: str) -> bool:
+        """Remove a report; returns False if it does not exist"""
+        return self._write(('delete', report_id))
+
+    def all(self) -> List[Dict[str, Any]]:
+        """Return every stored report"""
+        return [dict(report) for report in self._load_reports()]
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return read cache hit/miss counters"""
+        lookups = self.cache_hits + self.cache_misses
+        stats = {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / lookups if lookups else 0.0,
+            'cached_reports': len(self._cached_reports),
+        }
+        if self._committer is not None:
+            stats['group_commit'] = self._committer.stats()
+        return stats
+
+    def _write(self, operation: Tuple[str, Any]) -> Any:
+        if self._committer is not None:
+            return self._committer.submit(operation)
+        result = self._commit([operation])[0]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def _commit(self, operations: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Apply a batch of put/delete operations with one locked, atomic rewrite
+
+        Returns:
+            One result per operation: None for puts, True/False for deletes
+        """
+        with file_lock(self.lock_path):
+            # Re-read under the lock so writes from other processes are kept
+            reports = list(self._load_reports())
+            results: List[Any] = []
+            changed = False
+            for action, value in operations:
+                if action == 'put':
+                    reports = [r for r in reports if r.get('id') != value['id']]
+                    reports.append(value)
+                    changed = True
+                    results.append(None)
+                else:
+                    remaining = [r for r in reports if r.get('id') != value]
+                    deleted = len(remaining) < len(reports)
+                    reports = remaining
+                    changed = changed or deleted
+                    results.append(deleted)
+            if changed:
+                self._save_reports(reports)
+            return results
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """Return (mtime_ns, size, inode) of the storage file"""
         try:
-            if not self.storage_path.exists():
-                return []
-                
-            with open(self.storage_path, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            logger.warning("Report storage file is corrupted or not found, starting fresh")
-            return []
-    
+            stat = os.stat(self.storage_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _update_cache(
+        self,
+        signature: Optional[Tuple[int, int, int]],
+        reports: List[Dict[str, Any]]
+    ) -> None:
+        self._cached_signature = signature
+        self._cached_reports = reports
+        self._cached_by_id = {r.get('id'): r for r in reports}
+
+    def _load_reports(self) -> List[Dict[str, Any]]:
+        """
+        Load all reports from storage
+
+        The returned list is shared with the cache and must not be mutated.
+        """
+        signature = self._file_signature()
+        with self._cache_lock:
+            if (
+                self.cache_enabled
+                and signature is not None
+                and signature == self._cached_signature
+            ):
+                self.cache_hits += 1
+                return self._cached_reports
+            self.cache_misses += 1
+
+            try:
+                if signature is None:
+                    reports = []
+                else:
+                    with open(self.storage_path, 'r') as f:
+                        reports = json.load(f)
+            except FileNotFoundError:
+                reports = []
+                signature = None
+            except json.JSONDecodeError:
+                # Writes are atomic, so this is outside damage; keep a copy
+                # before the next save replaces the file
+                backup_path = self.storage_path.with_name(
+                    f"{self.storage_path.name}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                )
+                shutil.copy2(self.storage_path, backup_path)
+                logger.error(
+                    f"Report storage file is corrupted, starting fresh; "
+                    f"a copy was kept at {backup_path}"
+                )
+                # Cache the empty history under the damaged file's signature
+                # so the copy is only made once
+                reports = []
+
+            self._update_cache(signature, reports)
+            return reports
+
     def _save_reports(self, reports: List[Dict[str, Any]]) -> None:
-        """Save reports to storage"""
+        """Save reports to storage; the caller must hold the file lock"""
         try:
-            with open(self.storage_path, 'w') as f:
-                json.dump(reports, f, indent=2)
+            atomic_write_bytes(
+                self.storage_path,
+                json.dumps(reports, indent=2).encode('utf-8'),
+                fsync=self.fsync
+            )
+            with self._cache_lock:
+                self._update_cache(self._file_signature(), reports)
         except Exception as e:
             logger.error(f"Failed to save reports: {str(e)}")
             raise
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+import logging
+
+from .storage_utils import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Two-tier cache of model responses.
+
+    Entries are kept in an in-memory LRU bounded by total text size and,
+    optionally, on disk so they survive restarts and are shared between
+    server processes. Every entry expires after ``ttl_seconds``; expired
+    files that are never read again are removed by ``prune``, which can run
+    periodically in a daemon thread.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl_seconds: float = 24 * 60 * 60,
+        max_memory_bytes: int = 32 * 1024 * 1024,
+        enabled: bool = True,
+        prune_interval: Optional[float] = None
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir: Directory for the on-disk tier (None keeps it memory-only)
+            ttl_seconds: How long a response stays valid
+            max_memory_bytes: Size limit of the in-memory tier
+            enabled: When False every lookup misses and nothing is stored
+            prune_interval: Seconds between background prunes of the disk
+                tier, the first one at startup (None never prunes)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._memory: 'OrderedDict[str, Tuple[float, str, int]]' = OrderedDict()
+        self._memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._closed = threading.Event()
+        self._pruner: Optional[threading.Thread] = None
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            if prune_interval:
+                self._pruner = threading.Thread(
+                    target=self._prune_loop,
+                    args=(prune_interval,),
+                    name='response-cache-pruner',
+                    daemon=True
+                )
+                self._pruner.start()
+
+    @staticmethod
+    def make_key(prompt: str, model: str, generation_config: Dict[str, Any]) -> str:
+        """Build a cache key from the exact prompt, model and generation settings"""
+        payload = json.dumps(
+            {'prompt': prompt, 'model': model, 'config': generation_config},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Returns:
+            The cached text, or None on a miss or expired entry
+        """
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, text, _ = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return text
+                self._evict(key)
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        # Keep the stored expiry so reloading an entry does not extend it
+        expires_at, text = entry
+        self._remember(key, text, expires_at)
+        return text
+
+    def set(self, key: str, text: str) -> None:
+        """Store a response in both tiers"""
+        if not self.enabled or not text:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, text, expires_at)
+        if self.cache_dir is not None:
+            try:
+                data = json.dumps({'expires_at': expires_at, 'text': text}, ensure_ascii=False)
+                path = self._disk_path(key)
+                path.parent.mkdir(exist_ok=True)
+                atomic_write_bytes(path, data.encode('utf-8'), fsync=False)
+            except OSError as e:
+                logger.warning(f"Could not write response cache entry: {str(e)}")
+
+    def clear(self) -> None:
+        """Drop every cached response from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob('*/*.json'):
+                path.unlink(missing_ok=True)
+
+    def prune(self) -> int:
+        """
+        Delete expired entries from the on-disk tier
+
+        Returns:
+            Number of entries removed
+        """
+        if self.cache_dir is None:
+            return 0
+        removed = 0
+        now = time.time()
+        for path in self.cache_dir.glob('*/*.json'):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    expired = json.load(f).get('expires_at', 0) <= now
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError):
+                expired = True
+            if expired:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def close(self) -> None:
+        """Stop the background pruner"""
+        self._closed.set()
+        if self._pruner is not None:
+            self._pruner.join(timeout=5)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+            }
+
+    def _prune_loop(self, interval: float) -> None:
+        while not self._closed.is_set():
+            try:
+                removed = self.prune()
+                if removed:
+                    logger.info(f"Pruned {removed} expired entries from {self.cache_dir}")
+            except OSError as e:
+                logger.warning(f"Could not prune {self.cache_dir}: {str(e)}")
+            self._closed.wait(interval)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, str]]:
+        if self.cache_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable response cache entry {path.name}: {str(e)}")
+            return None
+        expires_at = entry.get('expires_at', 0)
+        if expires_at <= now:
+            path.unlink(missing_ok=True)
+            return None
+        text = entry.get('text')
+        return (expires_at, text) if text else None
+
+    def _remember(self, key: str, text: str, expires_at: float) -> None:
+        size = len(text.encode('utf-8'))
+        if size > self.max_memory_bytes:
+            return
+        with self._lock:
+            self._evict(key)
+            self._memory[key] = (expires_at, text, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_memory_bytes:
+                oldest = next(iter(self._memory))
+                self._evict(oldest)
+                self.evictions += 1
+
+    def _evict(self, key: str) -> None:
+        """Remove a key from the memory tier; the caller holds the lock"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry[2]
@@ -0,0 +1,158 @@
+from typing import Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Methods timed by the instrumentation (see instrumentation.py)
+REPORT_MANAGER_SPANS = ('save_report', 'save_reports', 'get_report', 'list_reports', 'search_reports', 'delete_report')
+GENERATOR_SPANS = ('generate_report', 'generate_report_stream', 'complete')
+FILE_PROCESSOR_SPANS = ('extract_upload', 'extract_uploads', 'extract_batch')
+
+
+def _instrument(obj: Any, methods: Any, prefix: str) -> Any:
+    from .instrumentation import default_recorder
+
+    return default_recorder.instrument(obj, methods, prefix)
+
+
+def build_report_manager():
+    """Return the ReportManager for the configured storage backend"""
+    from .config import (
+        REPORT_HISTORY_FILE, REPORT_STORAGE_BACKEND, REPORT_STORAGE_OPTIONS,
+        REPORT_SEARCH_ENABLED, REPORT_SPLIT_BODIES
+    )
+    from .report_utils import ReportManager
+
+    manager = ReportManager(
+        REPORT_HISTORY_FILE,
+        backend=REPORT_STORAGE_BACKEND,
+        search=REPORT_SEARCH_ENABLED,
+        split_bodies=REPORT_SPLIT_BODIES,
+        **REPORT_STORAGE_OPTIONS.get(REPORT_STORAGE_BACKEND, {})
+    )
+    return _instrument(manager, REPORT_MANAGER_SPANS, 'reports')
+
+
+def build_model_backend():
+    """Return the configured model backend, or None for the Gemini API"""
+    from .config import (
+        MODEL_BACKEND, FAKE_MODEL_LATENCY, FAKE_MODEL_LATENCY_DISTRIBUTION, FAKE_MODEL_LATENCY_SPREAD,
+        FAKE_MODEL_TOKENS_PER_SECOND, FAKE_MODEL_OUTPUT_TOKENS, FAKE_MODEL_ERROR_RATE,
+        FAKE_MODEL_RATE_LIMIT_RATE, FAKE_MODEL_SEED
+    )
+
+    if MODEL_BACKEND == 'gemini':
+        return None
+    if MODEL_BACKEND != 'fake':
+        raise ValueError(f"Unknown model backend '{MODEL_BACKEND}'. Choose 'gemini' or 'fake'")
+    from .model_backends import FakeModelBackend
+
+    logger.warning("Using the fake model backend; reports are not generated by Gemini")
+    return FakeModelBackend(
+        latency=FAKE_MODEL_LATENCY,
+        distribution=FAKE_MODEL_LATENCY_DISTRIBUTION,
+        spread=FAKE_MODEL_LATENCY_SPREAD,
+        tokens_per_second=FAKE_MODEL_TOKENS_PER_SECOND,
+        output_tokens=FAKE_MODEL_OUTPUT_TOKENS,
+        error_rate=FAKE_MODEL_ERROR_RATE,
+        rate_limit_rate=FAKE_MODEL_RATE_LIMIT_RATE,
+        seed=FAKE_MODEL_SEED
+    )
+
+
+def build_generator(api_key: Optional[str] = None):
+    """
+    Return a GeminiReportGenerator with the configured backend, cache and rate limit
+
+    Args:
+        api_key: Gemini API key (defaults to GEMINI_API_KEY; without one the
+            generator asks for it in the Streamlit UI, unless MODEL_BACKEND
+            is 'fake')
+    """
+    from .config import (
+        GEMINI_API_KEY, GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE,
+        RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_DIR, RESPONSE_CACHE_TTL,
+        RESPONSE_CACHE_MAX_MEMORY_BYTES, RESPONSE_CACHE_PRUNE_INTERVAL
+    )
+    from .batch_generation import RateLimiter
+    from .gemini_utils import GeminiReportGenerator
+    from .response_cache import ResponseCache
+
+    generator = GeminiReportGenerator(
+        api_key or GEMINI_API_KEY,
+        cache=ResponseCache(
+            RESPONSE_CACHE_DIR,
+            ttl_seconds=RESPONSE_CACHE_TTL,
+            max_memory_bytes=RESPONSE_CACHE_MAX_MEMORY_BYTES,
+            enabled=RESPONSE_CACHE_ENABLED,
+            prune_interval=RESPONSE_CACHE_PRUNE_INTERVAL
+        ),
+        rate_limiter=RateLimiter(GEMINI_REQUESTS_PER_MINUTE, GEMINI_TOKENS_PER_MINUTE),
+        backend=build_model_backend()
+    )
+    return _instrument(generator, GENERATOR_SPANS, 'model')
+
+
+def build_summarizer(generator: Any, max_workers: Optional[int] = None):
+    """Return the ChunkedSummarizer used for inputs too large for one prompt"""
+    from .config import (
+        GEMINI_BATCH_CONCURRENCY, RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_PRUNE_INTERVAL,
+        SUMMARY_MAX_INPUT_TOKENS, SUMMARY_CHUNK_TOKENS, SUMMARY_OUTPUT_TOKENS,
+        SUMMARY_CACHE_DIR, SUMMARY_CACHE_TTL
+    )
+    from .chunked_summary import ChunkedSummarizer
+    from .response_cache import ResponseCache
+
+    return ChunkedSummarizer(
+        generator,
+        chunk_tokens=SUMMARY_CHUNK_TOKENS,
+        max_input_tokens=SUMMARY_MAX_INPUT_TOKENS,
+        summary_tokens=SUMMARY_OUTPUT_TOKENS,
+        max_workers=max_workers or GEMINI_BATCH_CONCURRENCY,
+        cache=ResponseCache(
+            SUMMARY_CACHE_DIR,
+            ttl_seconds=SUMMARY_CACHE_TTL,
+            enabled=RESPONSE_CACHE_ENABLED,
+            prune_interval=RESPONSE_CACHE_PRUNE_INTERVAL
+        )
+    )
+
+
+def build_upload_store():
+    """Return the UploadStore for uploaded files and their extracted text"""
+    from .config import UPLOAD_STORE_DIR, UPLOAD_STORE_MAX_BYTES, UPLOAD_STORE_MAX_AGE_DAYS
+    from .upload_store import UploadStore
+
+    return UploadStore(
+        UPLOAD_STORE_DIR,
+        max_bytes=UPLOAD_STORE_MAX_BYTES,
+        max_age_seconds=UPLOAD_STORE_MAX_AGE_DAYS * 24 * 60 * 60
+    )
+
+
+def build_file_processor(store: Any = None):
+    """Return a FileProcessor with the configured PDF and spooling limits"""
+    from .config import PDF_MAX_PAGES, UPLOAD_SPOOL_MAX_BYTES
+    from .file_utils import FileProcessor
+
+    processor = FileProcessor(
+        store=store,
+        pdf_max_pages=PDF_MAX_PAGES,
+        spool_max_bytes=UPLOAD_SPOOL_MAX_BYTES
+    )
+    return _instrument(processor, FILE_PROCESSOR_SPANS, 'files')
+
+
+def build_job_queue():
+    """Return the persistent queue of background generation jobs"""
+    from .config import (
+        JOB_QUEUE_FILE, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_MAX_QUEUED_PER_USER
+    )
+    from .job_queue import JobQueue
+
+    return JobQueue(
+        JOB_QUEUE_FILE,
+        lease_seconds=JOB_LEASE_SECONDS,
+        max_attempts=JOB_MAX_ATTEMPTS,
+        max_queued_per_user=JOB_MAX_QUEUED_PER_USER
+    )
@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+import weakref
+from typing import Callable, Set
+
+
+class _Holder:
+    """Thread-local slot whose collection, when its thread ends, closes the connection"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+class ThreadConnections:
+    """
+    One SQLite connection per thread, closed when the thread ends
+
+    Streamlit runs every rerun on a new script thread and the metrics server
+    serves each scrape on a new thread, so connections kept until ``close()``
+    would pile up with their file descriptors. Each connection is held in a
+    thread-local slot instead and closed once its thread is gone.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection]):
+        """
+        Args:
+            connect: Opens and configures a new connection
+        """
+        self._connect = connect
+        self._local = threading.local()
+        self._open: Set[sqlite3.Connection] = set()
+        # Reentrant: a finalizer may run during garbage collection on a
+        # thread that already holds the lock
+        self._lock = threading.RLock()
+
+    def get(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            conn = self._connect()
+            holder = _Holder(conn)
+            with self._lock:
+                self._open.add(conn)
+            weakref.finalize(holder, self._release, conn)
+            self._local.holder = holder
+        return holder.conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._open.discard(conn)
+        # Connections are only used by their own thread, but are closed
+        # wherever the thread's slot is collected
+        conn.close()
+
+    def count(self) -> int:
+        """Return the number of open connections"""
+        with self._lock:
+            return len(self._open)
+
+    def close(self) -> None:
+        """Close every open connection"""
+        with self._lock:
+            for conn in self._open:
+                conn.close()
+            self._open.clear()
+        self._local = threading.local()
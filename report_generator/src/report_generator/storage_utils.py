@@ -0,0 +1,202 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Iterator, Union
+import logging
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def file_lock(lock_path: Union[str, Path], shared: bool = False) -> Iterator[None]:
+    """
+    Hold an advisory lock on a lock file for the duration of the block
+
+    Args:
+        lock_path: Path of the lock file (created if missing)
+        shared: Take a shared (reader) lock instead of an exclusive one.
+            Windows only supports exclusive locks.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        elif msvcrt is not None:  # pragma: no cover - Windows
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:  # pragma: no cover - Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def fsync_directory(directory: Union[str, Path]) -> None:
+    """Flush a directory entry so a rename survives a crash (no-op where unsupported)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes, fsync: bool = True) -> None:
+    """
+    Replace a file atomically by writing a temp file and renaming it
+
+    Readers see either the old or the new content, never a partial write.
+
+    Args:
+        path: Destination file
+        data: Full new file content
+        fsync: Flush the data and directory entry to disk before returning
+    """
+    path = Path(path)
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.unlink(temp_name)
+        except OSError:
+            pass
+        raise
+    if fsync:
+        fsync_directory(path.parent)
+
+
+class _PendingCommit:
+    """A write request waiting for its batch to be committed"""
+
+    __slots__ = ('item', 'result', 'done')
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.result: Any = None
+        self.done = False
+
+
+class GroupCommitter:
+    """
+    Batches concurrent write requests into a single commit.
+
+    The first caller to arrive becomes the leader: it waits ``window_ms`` for
+    other writers to queue up, then hands the whole batch to ``commit_fn`` so
+    the batch shares one lock acquisition and one fsync. Every caller blocks
+    until its own item has been committed.
+
+    ``commit_fn`` receives the list of queued items and returns one result per
+    item. A result that is an exception instance is raised in the caller that
+    submitted that item, so one bad request does not fail the whole batch.
+    """
+
+    def __init__(
+        self,
+        commit_fn: Callable[[List[Any]], List[Any]],
+        window_ms: float = 2.0,
+        max_batch: int = 512
+    ):
+        """
+        Initialize the committer
+
+        Args:
+            commit_fn: Function that durably applies a batch of items
+            window_ms: How long the leader waits for more writers
+            max_batch: Maximum number of items per commit
+        """
+        self.commit_fn = commit_fn
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+
+        self._cond = threading.Condition()
+        self._queue: List[_PendingCommit] = []
+        self._leader_active = False
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, item: Any) -> Any:
+        """
+        Queue an item and block until it has been committed
+
+        Returns:
+            The result produced for this item by ``commit_fn``
+        """
+        pending = _PendingCommit(item)
+        with self._cond:
+            self._queue.append(pending)
+
+        while True:
+            with self._cond:
+                while not pending.done and self._leader_active:
+                    self._cond.wait()
+                if pending.done:
+                    break
+                self._leader_active = True
+
+            self._lead_batch()
+
+        if isinstance(pending.result, BaseException):
+            raise pending.result
+        return pending.result
+
+    def _lead_batch(self) -> None:
+        batch: List[_PendingCommit] = []
+        try:
+            if self.window > 0:
+                time.sleep(self.window)
+            with self._cond:
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+
+            try:
+                results = self.commit_fn([p.item for p in batch])
+            except Exception as e:
+                logger.error(f"Group commit of {len(batch)} writes failed: {str(e)}")
+                results = [e] * len(batch)
+
+            for pending, result in zip(batch, results):
+                pending.result = result
+        finally:
+            with self._cond:
+                for pending in batch:
+                    pending.done = True
+                self.batches += 1 if batch else 0
+                self.items += len(batch)
+                self._leader_active = False
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many commits were made and how many writes they carried"""
+        with self._cond:
+            return {
+                'batches': self.batches,
+                'writes': self.items,
+                'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+            }
@@ -0,0 +1,392 @@
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union, BinaryIO
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Values tracked per text column; beyond this, rare values are dropped and
+# counts become approximate
+MAX_TRACKED_VALUES = 5000
+# A column is numeric/datetime when at least this share of its values parse
+TYPE_THRESHOLD = 0.95
+# Columns with fewer distinct values are reported as categorical
+CATEGORICAL_MAX_DISTINCT = 50
+# Numeric values this many IQRs beyond the quartiles are reported as anomalies
+OUTLIER_IQR_FACTOR = 3.0
+# Longest cell shown in the row sample
+MAX_CELL_CHARS = 60
+
+
+def _fmt(value: Any) -> str:
+    """Format a number compactly for the digest"""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return f"{int(value):,}"
+        if abs(value) >= 1000:
+            return f"{value:,.0f}"
+        return f"{value:.4g}"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value)
+
+
+class _ColumnProfile:
+    """Running statistics for one column, updated chunk by chunk"""
+
+    def __init__(self, name: str, reservoir_size: int, rng: Any):
+        self.name = name
+        self.count = 0
+        self.nulls = 0
+        self.numeric = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.sum = 0.0
+        self.sum_squares = 0.0
+        self.dates = 0
+        self.date_min = None
+        self.date_max = None
+        self.maybe_dates = True
+        self.values: Counter = Counter()
+        self.values_truncated = False
+        self._reservoir_size = reservoir_size
+        self._rng = rng
+        self._reservoir = None
+        self._priorities = None
+
+    def update(self, series: Any) -> None:
+        import numpy as np
+        import pandas as pd
+        from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+
+        missing = series.isna()
+        values = series[~missing]
+        self.nulls += int(missing.sum())
+        self.count += len(values)
+        if values.empty:
+            return
+
+        if is_datetime64_any_dtype(values):
+            self._update_dates(values)
+            return
+
+        if is_numeric_dtype(values) and not is_bool_dtype(values):
+            numbers = values.astype(float)
+            other = values.iloc[0:0]
+        elif is_bool_dtype(values) or (
+            self.numeric == 0 and pd.to_numeric(values.iloc[:100], errors='coerce').isna().all()
+        ):
+            # Parsing a text column as numbers is slow; skip it while a probe
+            # of the chunk finds none
+            numbers = values.iloc[0:0].astype(float)
+            other = values
+        else:
+            parsed = pd.to_numeric(values, errors='coerce')
+            is_number = parsed.notna()
+            numbers = parsed[is_number].astype(float)
+            other = values[~is_number]
+
+        if len(numbers):
+            self.numeric += len(numbers)
+            array = numbers.to_numpy()
+            self.min = float(array.min()) if self.min is None else min(self.min, float(array.min()))
+            self.max = float(array.max()) if self.max is None else max(self.max, float(array.max()))
+            self.sum += float(array.sum())
+            self.sum_squares += float(np.square(array).sum())
+            self._sample_numbers(array)
+
+        if len(other):
+            if self.maybe_dates and not is_bool_dtype(other):
+                self._update_dates(other)
+            if not self.maybe_dates:
+                self._count_values(other)
+
+    def _update_dates(self, values: Any) -> None:
+        import pandas as pd
+        from pandas.api.types import is_datetime64_any_dtype
+
+        if is_datetime64_any_dtype(values):
+            dates = values
+        else:
+            # Decide from a small probe before parsing a whole chunk
+            probe = pd.to_datetime(values.iloc[:100].astype(str), errors='coerce', format='mixed')
+            if probe.notna().mean() < TYPE_THRESHOLD:
+                self.maybe_dates = False
+                return
+            dates = pd.to_datetime(values.astype(str), errors='coerce', format='mixed')
+            unparsed = values[dates.isna()]
+            dates = dates.dropna()
+            if len(unparsed):
+                self._count_values(unparsed)
+        if dates.empty:
+            return
+        self.dates += len(dates)
+        low, high = dates.min(), dates.max()
+        self.date_min = low if self.date_min is None else min(self.date_min, low)
+        self.date_max = high if self.date_max is None else max(self.date_max, high)
+
+    def _count_values(self, values: Any) -> None:
+        counts = values.astype(str).value_counts()
+        self.values.update(dict(zip(counts.index, counts.to_numpy().tolist())))
+        if len(self.values) > MAX_TRACKED_VALUES:
+            self.values = Counter(dict(self.values.most_common(MAX_TRACKED_VALUES // 2)))
+            self.values_truncated = True
+
+    def _sample_numbers(self, array: Any) -> None:
+        """Keep a uniform sample of values (bottom-k by random priority) for quantiles"""
+        import numpy as np
+
+        priorities = self._rng.random(len(array))
+        if self._reservoir is not None:
+            array = np.concatenate([self._reservoir, array])
+            priorities = np.concatenate([self._priorities, priorities])
+        if len(array) > self._reservoir_size:
+            keep = np.argpartition(priorities, self._reservoir_size)[:self._reservoir_size]
+            array, priorities = array[keep], priorities[keep]
+        self._reservoir, self._priorities = array, priorities
+
+    def kind(self) -> str:
+        if self.count == 0:
+            return 'empty'
+        if self.numeric >= TYPE_THRESHOLD * self.count:
+            return 'numeric'
+        if self.dates >= TYPE_THRESHOLD * self.count:
+            return 'datetime'
+        if not self.values_truncated and len(self.values) <= CATEGORICAL_MAX_DISTINCT:
+            return 'categorical'
+        return 'text'
+
+    def distinct(self) -> str:
+        return f">{MAX_TRACKED_VALUES // 2:,}" if self.values_truncated else f"{len(self.values):,}"
+
+    def summary(self, top_k: int) -> str:
+        kind = self.kind()
+        if kind == 'numeric':
+            mean = self.sum / self.numeric
+            variance = max(self.sum_squares / self.numeric - mean * mean, 0.0)
+            return (f"min {_fmt(self.min)}, max {_fmt(self.max)}, "
+                    f"mean {_fmt(mean)}, std {_fmt(variance ** 0.5)}")
+        if kind == 'datetime':
+            return f"{self.date_min} to {self.date_max}"
+        if kind == 'empty':
+            return ''
+        if not self.values:
+            return f"mixed: {self.numeric:,} numbers, {self.dates:,} dates"
+        total = sum(self.values.values()) or 1
+        if self.values_truncated or self.values.most_common(1)[0][1] == 1:
+            examples = ', '.join(value[:MAX_CELL_CHARS] for value in list(self.values)[:3])
+            return f"{self.distinct()} distinct, mostly unique; e.g. {examples}"
+        top = ', '.join(
+            f"{value[:MAX_CELL_CHARS]} ({count / total:.0%})"
+            for value, count in self.values.most_common(top_k)
+        )
+        return f"{self.distinct()} distinct; top: {top}"
+
+    def anomalies(self) -> List[str]:
+        import numpy as np
+
+        found = []
+        rows = self.count + self.nulls
+        kind = self.kind()
+        if rows and self.nulls / rows > 0.5:
+            found.append(f"mostly empty ({self.nulls / rows:.0%} null)")
+        if kind == 'numeric' and self.numeric < self.count:
+            examples = ', '.join(repr(value) for value, _ in self.values.most_common(3))
+            found.append(f"{self.count - self.numeric:,} non-numeric values (e.g. {examples})")
+        if kind == 'numeric' and self._reservoir is not None and len(self._reservoir) >= 20:
+            q1, q3 = np.percentile(self._reservoir, [25, 75])
+            iqr = q3 - q1
+            low, high = q1 - OUTLIER_IQR_FACTOR * iqr, q3 + OUTLIER_IQR_FACTOR * iqr
+            if iqr > 0 and (self.min < low or self.max > high):
+                found.append(
+                    f"extreme values outside the typical range {_fmt(float(low))} to "
+                    f"{_fmt(float(high))} (min {_fmt(self.min)}, max {_fmt(self.max)})"
+                )
+        if self.count > 1 and kind in ('categorical', 'text') and len(self.values) == 1:
+            found.append(f"constant value {next(iter(self.values))!r}")
+        return found
+
+
+class TableProfiler:
+    """
+    Builds a compact digest of a table read in chunks.
+
+    Each chunk updates vectorized per-column statistics (type, nulls,
+    min/max/mean/std, top values, anomalies) and a uniform row sample of
+    bounded size, so memory stays flat however many rows the table has.
+    """
+
+    def __init__(self, top_k: int = 5, sample_rows: int = 20, reservoir_size: int = 2000, seed: int = 0):
+        """
+        Initialize the profiler
+
+        Args:
+            top_k: Most frequent values listed per text column
+            sample_rows: Rows included in the digest
+            reservoir_size: Values kept per numeric column for quantiles
+            seed: Seed of the row/value sampling, so a file always gets the same digest
+        """
+        import numpy as np
+
+        self.top_k = top_k
+        self.sample_rows = sample_rows
+        self.reservoir_size = reservoir_size
+        self.rows = 0
+        self.columns: Dict[str, _ColumnProfile] = {}
+        self._rng = np.random.default_rng(seed)
+        self._sample = None
+
+    def update(self, chunk: Any) -> None:
+        """Add a DataFrame chunk of the table"""
+        import numpy as np
+
+        for name in chunk.columns:
+            profile = self.columns.get(name)
+            if profile is None:
+                profile = self.columns[name] = _ColumnProfile(name, self.reservoir_size, self._rng)
+            profile.update(chunk[name])
+
+        chunk = chunk.assign(
+            _row=np.arange(self.rows, self.rows + len(chunk)),
+            _priority=self._rng.random(len(chunk))
+        )
+        self.rows += len(chunk)
+        candidates = chunk.nsmallest(self.sample_rows, '_priority')
+        if self._sample is not None:
+            import pandas as pd
+            candidates = pd.concat([self._sample, candidates]).nsmallest(self.sample_rows, '_priority')
+        self._sample = candidates
+
+    def digest(self, title: str) -> str:
+        """Render the profile and row sample as Markdown"""
+        lines = [f"## {title}", f"Rows: {self.rows:,} | Columns: {len(self.columns)}", ""]
+        if not self.columns:
+            return '\n'.join(lines + ["(empty)"])
+
+        lines += ["| Column | Type | Nulls | Summary |", "|---|---|---|---|"]
+        anomalies = []
+        for name, profile in self.columns.items():
+            rows = profile.count + profile.nulls
+            nulls = f"{profile.nulls / rows:.1%}" if rows else '-'
+            lines.append(f"| {name} | {profile.kind()} | {nulls} | {profile.summary(self.top_k)} |")
+            anomalies += [f"- {name}: {anomaly}" for anomaly in profile.anomalies()]
+
+        if anomalies:
+            lines += ["", "Anomalies:"] + anomalies
+
+        if self._sample is not None and len(self._sample):
+            sample = self._sample.sort_values('_row').drop(columns=['_priority']).set_index('_row')
+            sample.index.name = 'row'
+            sample = sample.map(
+                lambda cell: cell if not isinstance(cell, str) or len(cell) <= MAX_CELL_CHARS
+                else cell[:MAX_CELL_CHARS - 3] + '...'
+            )
+            label = f"all {self.rows:,} rows" if len(sample) == self.rows else f"{len(sample)} of {self.rows:,} rows, sampled"
+            lines += ["", f"Rows ({label}):", "```", sample.to_string(), "```"]
+        return '\n'.join(lines)
+
+
+def _unique_names(header: Tuple[Any, ...]) -> List[str]:
+    names, seen = [], Counter()
+    for index, value in enumerate(header):
+        name = str(value).strip() if value not in (None, '') else f"column_{index + 1}"
+        seen[name] += 1
+        names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+    return names
+
+
+def _iter_xlsx_sheets(source: Union[Path, BinaryIO], chunksize: int) -> Iterator[Tuple[str, Iterator[Any]]]:
+    """Yield (sheet name, DataFrame chunks) for every sheet, streaming rows"""
+    import openpyxl
+    import pandas as pd
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            def chunks(sheet=sheet):
+                rows = sheet.iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    return
+                names = _unique_names(header)
+                batch = []
+                for row in rows:
+                    if any(cell is not None for cell in row):
+                        batch.append(row[:len(names)])
+                    if len(batch) >= chunksize:
+                        yield pd.DataFrame(batch, columns=names)
+                        batch = []
+                if batch:
+                    yield pd.DataFrame(batch, columns=names)
+            yield sheet.title, chunks()
+    finally:
+        workbook.close()
+
+
+def describe_csv(
+    source: Union[str, Path, BinaryIO],
+    chunksize: int = 50000,
+    name: Optional[str] = None,
+    **profiler_options: Any
+) -> str:
+    """
+    Read a CSV in chunks and return a compact Markdown digest
+
+    Args:
+        source: Path to the CSV file, or a binary file object
+        chunksize: Rows read per chunk
+        name: File name shown in the digest (defaults to the path's name)
+        **profiler_options: Passed to TableProfiler (top_k, sample_rows, ...)
+
+    Returns:
+        Column profiles, anomalies and a bounded row sample
+    """
+    import pandas as pd
+
+    name = name or Path(source).name
+    profiler = TableProfiler(**profiler_options)
+    for chunk in pd.read_csv(source, chunksize=chunksize, encoding_errors='replace'):
+        profiler.update(chunk)
+    return profiler.digest(f"File: {name}")
+
+
+def describe_excel(
+    source: Union[str, Path, BinaryIO],
+    chunksize: int = 50000,
+    name: Optional[str] = None,
+    **profiler_options: Any
+) -> str:
+    """
+    Profile every sheet of a workbook and return a Markdown digest per sheet
+
+    .xlsx sheets are streamed row by row; legacy .xls files are loaded one
+    sheet at a time.
+
+    Args:
+        source: Path to the workbook, or a binary file object
+        chunksize: Rows per chunk
+        name: File name, whose extension tells .xls from .xlsx (defaults to
+            the path's name)
+        **profiler_options: Passed to TableProfiler (top_k, sample_rows, ...)
+
+    Returns:
+        Digests of all sheets separated by blank lines
+    """
+    import pandas as pd
+
+    name = name or Path(source).name
+    if Path(name).suffix.lower() == '.xls':
+        sheets = (
+            (sheet, iter([frame]))
+            for sheet, frame in pd.read_excel(source, sheet_name=None).items()
+        )
+    else:
+        sheets = _iter_xlsx_sheets(source, chunksize)
+
+    digests = []
+    for sheet, chunks in sheets:
+        profiler = TableProfiler(**profiler_options)
+        for chunk in chunks:
+            profiler.update(chunk)
+        digests.append(profiler.digest(f"Sheet: {sheet}"))
+    return '\n\n'.join(digests)
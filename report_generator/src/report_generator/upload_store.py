@@ -0,0 +1,172 @@
+import hashlib
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+import logging
+
+from .storage_utils import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# Access times are refreshed at most this often, so reruns do not turn every
+# cache hit into a metadata write
+TOUCH_INTERVAL = 60 * 60
+
+
+class UploadStore:
+    """
+    Content-addressed store for uploaded files and their extracted text.
+
+    Uploads are stored once under the SHA-256 of their bytes, so uploading
+    the same file again (or Streamlit rerunning the script while it is
+    uploaded) writes nothing. Extracted text is cached per (hash, extractor
+    version), so it is only re-parsed when an extractor changes.
+
+    Files are garbage-collected by age since last use and by total size.
+    """
+
+    def __init__(
+        self,
+        root_dir: Path,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the store
+
+        Args:
+            root_dir: Directory holding the uploads and extracted text
+            max_bytes: Size limit enforced by collect_garbage (None for no limit)
+            max_age_seconds: Files unused for longer are removed by collect_garbage
+        """
+        self.root_dir = Path(root_dir)
+        self.blob_dir = self.root_dir / 'blobs'
+        self.text_dir = self.root_dir / 'text'
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.text_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """Return the SHA-256 hex digest identifying some content"""
+        return hashlib.sha256(data).hexdigest()
+
+    def _blob_path(self, digest: str, suffix: str = '') -> Path:
+        return self.blob_dir / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def _text_path(self, digest: str, version: str) -> Path:
+        return self.text_dir / digest[:2] / f"{digest}.{version}.txt.z"
+
+    def put(self, data: bytes, suffix: str = '', digest: Optional[str] = None) -> Path:
+        """
+        Store uploaded bytes, reusing an existing copy of the same content
+
+        Args:
+            data: File content
+            suffix: File extension to keep (extractors dispatch on it)
+            digest: SHA-256 of data if the caller already computed it
+
+        Returns:
+            Path of the stored file
+        """
+        digest = digest or self.hash_bytes(data)
+        path = self._blob_path(digest, suffix)
+        if path.exists():
+            self._touch(path)
+            return path
+        path.parent.mkdir(exist_ok=True)
+        atomic_write_bytes(path, data, fsync=False)
+        return path
+
+    def get_text(self, digest: str, version: str) -> Optional[str]:
+        """Return cached extracted text, or None if it was never extracted"""
+        path = self._text_path(digest, version)
+        try:
+            with open(path, 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            return None
+        except (OSError, zlib.error) as e:
+            logger.warning(f"Ignoring unreadable extraction cache entry {path.name}: {str(e)}")
+            return None
+        self._touch(path)
+        return text
+
+    def put_text(self, digest: str, version: str, text: str) -> None:
+        """Cache the text extracted from some content by an extractor version"""
+        path = self._text_path(digest, version)
+        path.parent.mkdir(exist_ok=True)
+        atomic_write_bytes(path, zlib.compress(text.encode('utf-8')), fsync=False)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Mark a file as recently used for garbage collection"""
+        try:
+            if time.time() - path.stat().st_mtime > TOUCH_INTERVAL:
+                os.utime(path)
+        except OSError:
+            pass
+
+    def _files(self) -> List[Tuple[float, int, Path]]:
+        files = []
+        for directory in (self.blob_dir, self.text_dir):
+            for path in directory.glob('*/*'):
+                if path.name.startswith('.'):
+                    continue  # temp file of a write in progress
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def collect_garbage(
+        self,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Remove files unused for too long, then the least recently used ones
+        until the store fits its size limit
+
+        Args:
+            max_bytes: Overrides the store's size limit
+            max_age_seconds: Overrides the store's age limit
+
+        Returns:
+            Dict with the number of files removed and bytes freed
+        """
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        max_age_seconds = max_age_seconds if max_age_seconds is not None else self.max_age_seconds
+
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        freed = 0
+        cutoff = time.time() - max_age_seconds if max_age_seconds is not None else None
+
+        for mtime, size, path in files:
+            too_old = cutoff is not None and mtime < cutoff
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                # Files are oldest first, so nothing later is older or needed for size
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+            freed += size
+            total -= size
+
+        if removed:
+            logger.info(f"Upload store garbage collection removed {removed} files ({freed} bytes)")
+        return {'removed': removed, 'freed_bytes': freed, 'total_bytes': total}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number and total size of stored files"""
+        files = self._files()
+        return {'files': len(files), 'total_bytes': sum(size for _, size, _ in files)}
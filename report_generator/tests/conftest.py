@@ -0,0 +1,53 @@
+"""
+Shared fixtures for tests that exercise the Gemini client without network access.
+"""
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.report_generator import gemini_utils
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel without network access."""
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    def _respond(self, prompt):
+        with self.lock:
+            self.calls += 1
+            for marker, errors in self.failures.items():
+                if marker in prompt and errors:
+                    raise errors.pop(0)
+        return FakeResponse(f"report for {prompt.splitlines()[-1]}")
+
+    def generate_content(self, prompt, generation_config=None, stream=False):
+        response = self._respond(prompt)
+        if stream:
+            words = response.text.split(" ")
+            return [FakeResponse(word + " ") for word in words[:-1]] + [FakeResponse(words[-1])]
+        return response
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        await asyncio.sleep(0)
+        return self._respond(prompt)
+
+@pytest.fixture
+def generator(monkeypatch):
+    """Create a generator backed by the fake model."""
+    fake_sdk = SimpleNamespace(
+        configure=lambda **kwargs: None,
+        GenerativeModel=FakeModel,
+        get_model=lambda name: SimpleNamespace(name=name),
+    )
+    monkeypatch.setattr(gemini_utils, "_genai", lambda: fake_sdk)
+    return gemini_utils.GeminiReportGenerator(api_key="test-key")
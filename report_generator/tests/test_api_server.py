@@ -0,0 +1,255 @@
+"""
+End-to-end tests for the HTTP API, served by uvicorn against the fake model.
+"""
+import asyncio
+import http.client
+import json
+import logging
+import socket
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("starlette")
+uvicorn = pytest.importorskip("uvicorn")
+requests = pytest.importorskip("requests")
+
+from src.report_generator.api_server import create_app
+from src.report_generator.file_utils import FileProcessor
+from src.report_generator.job_queue import JobQueue
+from src.report_generator.logging_utils import ContextFilter
+from src.report_generator.report_utils import ReportManager
+
+
+@pytest.fixture
+def serve(tmp_path):
+    """Start the API on a free local port and return its base URL."""
+    servers = []
+
+    def start(app):
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(app, log_level="warning", timeout_keep_alive=5))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+        thread.start()
+        deadline = time.time() + 10
+        while not server.started and time.time() < deadline:
+            time.sleep(0.01)
+        servers.append((server, thread))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+    yield start
+    for server, thread in servers:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = ReportManager(tmp_path / "reports.json", backend="sqlite", search=True)
+    yield manager
+    manager.close()
+
+
+def test_submitted_report_is_generated_by_a_worker(generator, manager, serve, tmp_path):
+    """Test submitting, long-polling, fetching, listing and searching a report."""
+    queue = JobQueue(tmp_path / "jobs.db")
+    base = serve(create_app(generator, manager, FileProcessor(), job_queue=queue, workers=1))
+
+    with requests.Session() as session:
+        response = session.post(f"{base}/reports", json={"content": "fixed the login bug", "template": "development"})
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == "queued"
+
+        status = session.get(f"{base}{job['status_url']}", params={"wait": 10}).json()
+        assert status["status"] == "done"
+        assert status["report_id"] == job["report_id"]
+
+        report = session.get(f"{base}{status['report_url']}").json()
+        assert report["content"] == "report for fixed the login bug"
+        assert report["template"] == "development"
+        assert report["metadata"]["job_id"] == job["job_id"]
+
+        listing = session.get(f"{base}/reports", params={"template": "development"}).json()
+        assert [r["id"] for r in listing["reports"]] == [report["id"]]
+        found = session.get(f"{base}/reports/search", params={"q": "login"}).json()
+        assert [r["id"] for r in found["reports"]] == [report["id"]]
+        assert session.get(f"{base}/reports/missing").status_code == 404
+        assert session.post(f"{base}/reports", json={"content": " "}).status_code == 400
+    queue.close()
+
+
+def test_streamed_report_and_uploads(generator, manager, serve):
+    """Test that a report streams as NDJSON and is saved, from a file upload."""
+    base = serve(create_app(generator, manager, FileProcessor()))
+
+    response = requests.post(
+        f"{base}/reports/stream",
+        data={"template": "meetings", "priority": "high"},
+        files={"files": ("notes.txt", b"weekly sync notes")},
+        stream=True
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.iter_lines() if line]
+
+    text = "".join(event.get("text", "") for event in events)
+    assert text == "report for weekly sync notes"
+    assert events[-1]["status"] == "done"
+    saved = manager.get_report(events[-1]["report_id"])
+    assert saved["content"] == text
+    assert saved["priority"] == "High"
+
+
+def test_requests_are_logged_with_their_ids(generator, manager, serve):
+    """Test that records logged while serving a request carry its request and report IDs."""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    handler.addFilter(ContextFilter())
+    package_logger = logging.getLogger("src.report_generator")
+    level = package_logger.level
+    package_logger.addHandler(handler)
+    package_logger.setLevel(logging.INFO)
+    try:
+        base = serve(create_app(generator, manager, FileProcessor()))
+        response = requests.post(f"{base}/reports/stream", json={"content": "notes", "use_cache": False},
+                                 headers={"X-Request-ID": "req-42"})
+        report_id = json.loads(response.text.splitlines()[0])["report_id"]
+        assert response.headers["x-request-id"] == "req-42"
+        assert requests.get(f"{base}/reports").headers["x-request-id"] != "req-42"
+
+        deadline = time.time() + 5
+        while not any(getattr(record, "path", None) == "/reports/stream" for record in records):
+            assert time.time() < deadline
+            time.sleep(0.01)
+    finally:
+        package_logger.removeHandler(handler)
+        package_logger.setLevel(level)
+
+    streamed = next(record for record in records if record.getMessage().startswith("Streamed report"))
+    assert streamed.request_id == "req-42" and streamed.report_id == report_id
+    assert streamed.duration_ms >= 0
+    access = next(record for record in records if getattr(record, "path", None) == "/reports/stream")
+    assert access.request_id == "req-42" and access.status == 200 and access.method == "POST"
+
+
+def test_busy_server_answers_429(generator, manager, serve, tmp_path):
+    """Test that saturated generation and a full queue are refused, not queued."""
+    release = threading.Event()
+    generate = generator.model.generate_content
+
+    def slow_generate(prompt, **kwargs):
+        release.wait(10)
+        return generate(prompt, **kwargs)
+
+    generator.model.generate_content = slow_generate
+    queue = JobQueue(tmp_path / "jobs.db")
+    app = create_app(generator, manager, FileProcessor(), job_queue=queue, workers=0,
+                     max_generations=1, max_queue_depth=1)
+    base = serve(app)
+
+    first = {}
+    streaming = threading.Thread(target=lambda: first.update(
+        response=requests.post(f"{base}/reports/stream", json={"content": "first", "use_cache": False})
+    ))
+    streaming.start()
+    deadline = time.time() + 10
+    while app.state.generation_limiter.in_flight == 0 and time.time() < deadline:
+        time.sleep(0.01)
+
+    busy = requests.post(f"{base}/reports/stream", json={"content": "second"})
+    assert busy.status_code == 429
+    assert busy.headers["retry-after"] == "1"
+
+    assert requests.post(f"{base}/reports", json={"content": "queued"}).status_code == 202
+    full = requests.post(f"{base}/reports", json={"content": "one too many"})
+    assert full.status_code == 429
+    assert int(full.headers["retry-after"]) > 0
+
+    release.set()
+    streaming.join(timeout=10)
+    assert first["response"].status_code == 200
+    assert app.state.generation_limiter.in_flight == 0
+    health = requests.get(f"{base}/health").json()
+    assert health["generations"]["rejected"] == 1
+    assert health["queue"]["depth"] == 1
+    metrics = requests.get(f"{base}/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'report_generator_jobs{key="queued"} 1' in metrics.text
+    queue.close()
+
+
+def test_connections_are_kept_alive(generator, manager, serve):
+    """Test that several requests are served over one connection."""
+    base = serve(create_app(generator, manager, FileProcessor()))
+    host, port = base.rsplit("/", 1)[-1].split(":")
+    connection = http.client.HTTPConnection(host, int(port), timeout=5)
+    try:
+        for _ in range(3):
+            connection.request("GET", "/health")
+            response = connection.getresponse()
+            assert response.status == 200
+            assert json.loads(response.read())["status"] == "ok"
+        connection.request("POST", "/reports", body=json.dumps({"content": "inline"}),
+                           headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        assert response.status == 201
+        assert json.loads(response.read())["content"] == "report for inline"
+    finally:
+        connection.close()
+
+
+def test_streaming_slot_is_released_when_the_client_leaves_early(generator, manager):
+    """Test that a client disconnecting before the first chunk does not keep its generation slot."""
+    app = create_app(generator, manager, FileProcessor(), max_generations=1)
+    body = json.dumps({"content": "notes"}).encode()
+    messages = iter([{"type": "http.request", "body": body, "more_body": False}])
+
+    async def receive():
+        # The client is gone as soon as its request has been read
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            await asyncio.sleep(0.2)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": "2.3"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/reports/stream", "raw_path": b"/reports/stream",
+        "query_string": b"", "root_path": "", "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+    assert app.state.generation_limiter.in_flight == 0
+    assert app.state.request_limiter.in_flight == 0
+
+
+def test_chunked_bodies_over_the_limit_get_413(generator, manager, serve):
+    """Test that the upload limit applies to bodies sent without a Content-Length."""
+    base = serve(create_app(generator, manager, FileProcessor(), max_upload_bytes=100))
+
+    chunks = iter([b'{"content": "', b"x" * 60, b"x" * 60, b'"}'])
+    too_big = requests.post(f"{base}/reports/stream", data=chunks, headers={"Content-Type": "application/json"})
+    assert too_big.status_code == 413
+    assert "larger than 100 bytes" in too_big.json()["error"]
+    assert requests.post(f"{base}/reports/stream", data=b"x" * 101).status_code == 413
+    small = requests.post(f"{base}/reports/stream", data=iter([b'{"content": ', b'"notes"}']),
+                          headers={"Content-Type": "application/json"})
+    assert small.status_code == 200
+
+
+def test_listing_parameters_are_validated(generator, manager, serve):
+    """Test that bad paging and sorting parameters get 400 instead of a 500 or an unbounded read."""
+    base = serve(create_app(generator, manager, FileProcessor()))
+    for params in ({"limit": -1}, {"offset": -5}, {"limit": "ten"}, {"offset": "1.5"}, {"sort_by": "$.content"}):
+        response = requests.get(f"{base}/reports", params=params)
+        assert response.status_code == 400, params
+        assert response.json()["error"]
+    assert requests.get(f"{base}/reports/search", params={"q": "x", "limit": -1}).status_code == 400
+    assert requests.get(f"{base}/reports/search", params={"q": "x", "limit": "all"}).status_code == 400
+
+    listing = requests.get(f"{base}/reports", params={"limit": 500, "sort_by": "title", "order": "asc"}).json()
+    assert listing["limit"] == 100 and listing["reports"] == []
@@ -0,0 +1,118 @@
+"""
+Tests for batch extraction of several files.
+"""
+import pytest
+
+from src.report_generator.batch_extraction import merge_extractions
+from src.report_generator.file_utils import FileProcessor
+from src.report_generator.upload_store import UploadStore
+from tests.test_upload_store import FakeUpload
+
+
+def test_batch_isolates_failures_and_keeps_input_order(tmp_path):
+    """A broken file is reported in its slot while the others are extracted"""
+    pytest.importorskip("PyPDF2")
+    from tests.test_pdf_extraction import _make_pdf
+
+    notes = tmp_path / "notes.md"
+    notes.write_text("Deployed v2")
+    report = _make_pdf(tmp_path / "report.pdf", 2)
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a workbook")
+    missing = tmp_path / "missing.txt"
+    calls = []
+
+    results = FileProcessor().extract_batch(
+        [notes, report, broken, missing],
+        max_workers=2,
+        progress=lambda done, total, name: calls.append((done, total, name))
+    )
+
+    assert [result.name for result in results] == ["notes.md", "report.pdf", "broken.xlsx", "missing.txt"]
+    assert [result.ok for result in results] == [True, True, False, False]
+    assert results[0].text == "Deployed v2"
+    assert "Page 1" in results[1].text and "Page 2" in results[1].text
+    assert isinstance(results[3].error, FileNotFoundError)
+    assert all(result.elapsed >= 0 for result in results)
+    assert [done for done, _, _ in calls] == [1, 2, 3, 4]
+    assert sorted(name for _, _, name in calls) == sorted(result.name for result in results)
+
+    merged = merge_extractions(results)
+    assert merged.startswith("# notes.md\n\nDeployed v2\n\n# report.pdf\n\n")
+    assert merged.index("# broken.xlsx") < merged.index("# missing.txt")
+    assert "_Could not extract this file:" in merged
+
+
+def test_uploads_reuse_cached_text(tmp_path, monkeypatch):
+    """Only uploads without cached text are extracted"""
+    processor = FileProcessor(store=UploadStore(tmp_path / "uploads"))
+    uploads = [FakeUpload("a.md", b"Alpha"), FakeUpload("b.txt", b"Beta")]
+    processor.extract_upload(uploads[0])
+
+    batches = []
+    extract_concurrently = processor._extract_concurrently
+    monkeypatch.setattr(
+        processor, "_extract_concurrently",
+        lambda items, *args: batches.append(len(items)) or extract_concurrently(items, *args)
+    )
+    calls = []
+    results = processor.extract_uploads(uploads, progress=lambda *args: calls.append(args))
+
+    assert batches == [1]
+    assert [(result.name, result.text, result.cached) for result in results] == [
+        ("a.md", "Alpha", True), ("b.txt", "Beta", False)
+    ]
+    assert calls == [(1, 2, "a.md"), (2, 2, "b.txt")]
+
+    assert all(result.cached for result in processor.extract_uploads(uploads))
+
+
+def test_small_uploads_are_extracted_in_memory(tmp_path):
+    """Only uploads above the spool threshold are written to disk"""
+    store = UploadStore(tmp_path / "uploads")
+    processor = FileProcessor(store=store, spool_max_bytes=16)
+    small = FakeUpload("small.csv", b"a,b\n1,2\n")
+    large = FakeUpload("large.txt", b"x" * 32)
+
+    results = processor.extract_uploads([small, large])
+
+    assert "## File: small.csv" in results[0].text
+    assert results[1].text == "x" * 32
+    assert [path.suffix for path in (tmp_path / "uploads" / "blobs").rglob("*.*")] == [".txt"]
+
+
+def test_in_memory_uploads_reach_the_process_pool_as_paths(tmp_path, monkeypatch):
+    """CPU-heavy uploads held in memory are spilled to disk instead of pickled"""
+    pytest.importorskip("PyPDF2")
+    from src.report_generator import file_utils
+    from tests.test_pdf_extraction import _make_pdf
+
+    submitted = []
+    pool_class = file_utils.ProcessPoolExecutor
+
+    class RecordingPool(pool_class):
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(args[2])
+            return super().submit(fn, *args, **kwargs)
+
+    monkeypatch.setattr(file_utils, "ProcessPoolExecutor", RecordingPool)
+    uploads = [
+        FakeUpload(f"{name}.pdf", _make_pdf(tmp_path / f"{name}.pdf", 1).read_bytes())
+        for name in ("a", "b")
+    ]
+
+    results = FileProcessor().extract_uploads(uploads, max_workers=2)
+
+    assert all(result.ok and "Page 1" in result.text for result in results)
+    assert len(submitted) == 2 and not any(isinstance(source, bytes) for source in submitted)
+    assert not any(path.exists() for path in submitted)
+
+
+def test_large_text_files_are_decoded_from_a_memory_map(tmp_path, monkeypatch):
+    from src.report_generator import config
+
+    monkeypatch.setattr(config, "TEXT_MMAP_MIN_BYTES", 1)
+    path = tmp_path / "notes.md"
+    path.write_text("Déploiement terminé ✓\n", encoding="utf-8")
+
+    assert FileProcessor.extract_text(path) == "Déploiement terminé ✓\n"
@@ -0,0 +1,73 @@
+"""
+Tests for batch report generation, rate limiting and retries.
+"""
+import asyncio
+import time
+
+from src.report_generator.batch_generation import (
+    GenerationJob, RateLimiter, is_retryable_error
+)
+
+class RateLimited(Exception):
+    code = 429
+
+def test_batch_retries_transient_errors_and_isolates_failures(generator):
+    """Test that 429s are retried and a permanent failure does not sink the batch."""
+    generator.model.failures = {
+        "notes 1": [RateLimited("slow down"), RateLimited("slow down")],
+        "notes 2": [ValueError("bad request")],
+    }
+    jobs = [(f"notes {i}", "default") for i in range(5)]
+
+    results = list(generator.generate_batch(jobs, max_workers=3, retry_base_delay=0.01))
+
+    by_index = {r.index: r for r in results}
+    assert len(results) == 5
+    assert by_index[1].ok and by_index[1].attempts == 3
+    assert by_index[1].text == "report for notes 1"
+    assert not by_index[2].ok and isinstance(by_index[2].error, ValueError)
+    assert by_index[2].attempts == 1
+    assert all(by_index[i].ok for i in (0, 3, 4))
+
+def test_async_batch_yields_all_results(generator):
+    """Test the async variant with a job that exhausts its retries."""
+    generator.model.failures = {"notes 0": [RateLimited("busy")] * 5}
+
+    async def collect():
+        jobs = [GenerationJob(f"notes {i}", job_id=f"job{i}") for i in range(4)]
+        return [r async for r in generator.generate_batch_async(
+            jobs, concurrency=2, max_retries=2, retry_base_delay=0.01
+        )]
+
+    results = asyncio.run(collect())
+    assert sorted(r.job.job_id for r in results) == ["job0", "job1", "job2", "job3"]
+    failed = [r for r in results if not r.ok]
+    assert [r.job.job_id for r in failed] == ["job0"]
+    assert failed[0].attempts == 3
+
+def test_rate_limiter_enforces_request_budget():
+    """Test that requests beyond the bucket wait for it to refill."""
+    limiter = RateLimiter(requests_per_minute=600)  # 10 per second
+    limiter._requests = 0
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.25
+    assert limiter.stats()["waits"] == 3
+
+def test_rate_limiter_enforces_token_budget():
+    """Test that a large request waits for the token bucket."""
+    limiter = RateLimiter(requests_per_minute=1000, tokens_per_minute=600000)
+    assert limiter.acquire(tokens=599000) == 0
+    assert limiter.acquire(tokens=2000) > 0
+
+def test_retryable_errors():
+    """Test which errors are retried."""
+    assert is_retryable_error(RateLimited())
+    assert not is_retryable_error(ValueError())
+
+    class ServiceUnavailable(Exception):
+        pass
+
+    assert is_retryable_error(ServiceUnavailable())
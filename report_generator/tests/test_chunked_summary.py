@@ -0,0 +1,65 @@
+"""
+Tests for map-reduce summarization of large inputs.
+"""
+from src.report_generator.chunked_summary import ChunkedSummarizer, split_into_chunks
+from src.report_generator.response_cache import ResponseCache
+
+def _document(sections=8, paragraphs=6):
+    """Build a Markdown document with headings and numbered paragraphs."""
+    parts = []
+    for s in range(sections):
+        parts.append(f"# Section {s}")
+        for p in range(paragraphs):
+            parts.append(f"Paragraph {s}.{p} reports steady progress on the rollout. " * 6)
+    return "\n\n".join(parts)
+
+def test_split_respects_budget_and_structure():
+    """Test that chunks fit the budget, start at headings and rejoin losslessly."""
+    text = _document()
+    chunks = split_into_chunks(text, max_tokens=500)
+
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 * 4 for chunk in chunks)
+    assert sum(chunk.lstrip().startswith("# Section") for chunk in chunks) >= 4
+
+    # A single line longer than the budget is still split
+    assert "".join(split_into_chunks("x" * 5000, max_tokens=100)) == "x" * 5000
+
+def test_edit_only_resummarizes_changed_chunks(generator):
+    """Test that cached chunk summaries are reused after a small edit."""
+    summarizer = ChunkedSummarizer(
+        generator, chunk_tokens=500, max_input_tokens=2000, cache=ResponseCache()
+    )
+    text = _document()
+    chunk_count = len(split_into_chunks(text, 500))
+
+    summarizer.condense(text)
+    assert summarizer.stats()["summaries_generated"] == chunk_count
+
+    edited = text.replace("Paragraph 5.2 reports", "Paragraph 5.2 now reports", 1)
+    summarizer.condense(edited)
+    stats = summarizer.stats()
+    assert stats["summaries_generated"] <= chunk_count + 2
+    assert stats["summaries_cached"] >= chunk_count - 2
+
+def test_summaries_are_merged_hierarchically(generator):
+    """Test that partial summaries are reduced until they fit the input budget."""
+    stages = []
+    summarizer = ChunkedSummarizer(generator, chunk_tokens=300, max_input_tokens=100)
+    text = _document()
+
+    condensed = summarizer.condense(text, progress=lambda stage, done, total: stages.append(stage))
+
+    assert condensed.startswith("report for")
+    assert "map" in stages
+    assert any(stage.startswith("reduce") for stage in stages)
+
+    report = summarizer.summarize(text, template="operations")
+    assert report.startswith("report for")
+
+def test_small_inputs_are_passed_through(generator):
+    """Test that inputs within the budget skip summarization."""
+    summarizer = ChunkedSummarizer(generator)
+    assert summarizer.condense("short notes") == "short notes"
+    assert summarizer.stats()["summaries_generated"] == 0
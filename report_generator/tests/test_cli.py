@@ -0,0 +1,112 @@
+"""
+Tests for the headless batch command.
+"""
+import subprocess
+import sys
+import threading
+
+from src.report_generator.cli import BatchRunner, ProcessedIndex, find_inputs
+from src.report_generator.file_utils import FileProcessor
+from src.report_generator.report_utils import ReportManager
+from tests.test_batch_generation import RateLimited
+
+
+def _runner(generator, tmp_path, **options):
+    manager = ReportManager(tmp_path / "reports.json", backend="journal", background_compaction=False)
+    processed = ProcessedIndex(tmp_path / "processed.jsonl")
+    runner = BatchRunner(
+        generator, manager, FileProcessor(), processed,
+        batch_size=2, retry_base_delay=0.01, **options
+    )
+    return runner, manager
+
+
+def test_directory_is_generated_once_per_content(generator, tmp_path):
+    """Reports are saved in batches and unchanged inputs are skipped on the next run"""
+    notes = tmp_path / "notes"
+    (notes / "week2").mkdir(parents=True)
+    (notes / "2024-05-01.md").write_text("notes A")
+    (notes / "copy.txt").write_text("notes A")
+    (notes / "week2" / "2024-05-08.txt").write_text("notes B")
+    (notes / "empty.md").write_text("   ")
+    (notes / ".hidden.md").write_text("notes C")
+    (notes / "image.png").write_bytes(b"\x89PNG")
+    generator.model.failures = {"notes B": [RateLimited("slow down")]}
+    paths = find_inputs(notes, FileProcessor.SUPPORTED_EXTENSIONS, recursive=True)
+    assert [path.name for path in paths] == ["2024-05-01.md", "copy.txt", "empty.md", "2024-05-08.txt"]
+
+    runner, manager = _runner(generator, tmp_path, template="development")
+    summary = runner.run(paths, root=notes)
+
+    assert (summary.found, summary.duplicates, summary.saved, summary.failed) == (4, 1, 2, 1)
+    assert summary.failures == [("empty.md", "no text could be extracted")]
+    reports = {r["date"]: manager.get_report(r["id"]) for r in manager.list_reports()}
+    assert reports["2024-05-01"]["content"] == "report for notes A"
+    assert reports["2024-05-01"]["title"] == "Development Report - 2024-05-01"
+    assert reports["2024-05-08"]["metadata"]["source"] == "week2/2024-05-08.txt"
+    assert "reports/min" in summary.format()
+
+    calls = generator.model.calls
+    (notes / "2024-05-09.md").write_text("notes D")
+    rerun = BatchRunner(
+        generator, manager, FileProcessor(), ProcessedIndex(tmp_path / "processed.jsonl"),
+        template="development", output_dir=tmp_path / "out"
+    ).run(find_inputs(notes, FileProcessor.SUPPORTED_EXTENSIONS, recursive=True), root=notes)
+    assert (rerun.skipped, rerun.saved) == (2, 1)
+    assert generator.model.calls == calls + 1
+    assert manager.get_report_count() == 3
+    assert (tmp_path / "out" / "2024-05-09.md").read_text() == "report for notes D"
+    manager.close()
+
+
+class FlakySummarizer:
+    """Condenses inputs containing 'large', failing on those containing 'broken'."""
+
+    def __init__(self):
+        self.threads = set()
+
+    def needs_chunking(self, content):
+        return "large" in content
+
+    def condense(self, content, use_cache=True):
+        self.threads.add(threading.current_thread().name)
+        if "broken" in content:
+            raise RateLimited("quota exhausted")
+        return f"summary of {content}"
+
+
+def test_failed_summaries_are_counted_per_file(generator, tmp_path):
+    """A large input that cannot be summarized fails alone instead of ending the run"""
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "a.md").write_text("large broken notes")
+    (notes / "b.md").write_text("large notes")
+    (notes / "c.md").write_text("small notes")
+    (notes / "d.md").write_text("more small notes")
+    summarizer = FlakySummarizer()
+
+    runner, manager = _runner(generator, tmp_path, summarizer=summarizer)
+    summary = runner.run(find_inputs(notes, [".md"]), root=notes)
+
+    assert (summary.saved, summary.generate_failed) == (3, 1)
+    assert summary.failures == [("a.md", "quota exhausted")]
+    contents = sorted(manager.get_report(r["id"])["content"] for r in manager.list_reports())
+    assert contents == ["report for more small notes", "report for small notes", "report for summary of large notes"]
+    assert all(name.startswith("batch-condense") for name in summarizer.threads)
+    manager.close()
+
+
+def test_cli_does_not_import_streamlit(tmp_path):
+    """The command runs (here as a dry run) without loading the UI runtime"""
+    (tmp_path / "notes.md").write_text("Deployed v2")
+    code = (
+        "import sys\n"
+        "from src.report_generator.cli import main\n"
+        f"status = main(['generate', '-i', {str(tmp_path)!r}, '--dry-run'])\n"
+        "assert 'streamlit' not in sys.modules\n"
+        "sys.exit(status)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert "pending: notes.md" in result.stdout
@@ -0,0 +1,66 @@
+"""
+Tests for streaming DOCX extraction.
+"""
+import pytest
+
+from src.report_generator.file_utils import FileProcessor
+from src.report_generator.docx_extraction import extract_docx_text, iter_docx_blocks
+
+docx = pytest.importorskip("docx")
+
+
+def _make_report(path):
+    document = docx.Document()
+    document.add_heading("Daily ops", 0)
+    document.add_heading("Metrics", 1)
+    document.add_paragraph("Latency | throughput summary")
+    table = document.add_table(rows=3, cols=3)
+    for i, row in enumerate(table.rows):
+        for j, cell in enumerate(row.cells):
+            cell.text = f"r{i}c{j}"
+    table.cell(1, 0).merge(table.cell(1, 1))
+    document.add_heading("Follow-ups", 2)
+    document.add_paragraph("Page the DBA", style="List Bullet")
+    document.add_paragraph("Check replicas", style="List Bullet 2")
+    document.add_paragraph("Rotate keys", style="List Number")
+    document.save(path)
+    return path
+
+
+def test_blocks_come_out_in_document_order(tmp_path):
+    path = _make_report(tmp_path / "report.docx")
+
+    text = extract_docx_text(path)
+
+    assert text == "\n".join([
+        "# Daily ops",
+        "# Metrics",
+        "Latency | throughput summary",
+        "",
+        "| r0c0 | r0c1 | r0c2 |",
+        "|---|---|---|",
+        "| r1c0 r1c1 |  | r1c2 |",
+        "| r2c0 | r2c1 | r2c2 |",
+        "",
+        "## Follow-ups",
+        "- Page the DBA",
+        "  - Check replicas",
+        "1. Rotate keys",
+    ])
+    assert FileProcessor.extract_text(path) == text
+
+
+def test_table_cells_with_pipes_and_paragraphs_stay_on_one_row(tmp_path):
+    document = docx.Document()
+    table = document.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "name"
+    table.cell(0, 1).text = "value"
+    table.cell(1, 0).text = "a|b"
+    table.cell(1, 1).text = "first"
+    table.cell(1, 1).add_paragraph("second")
+    path = tmp_path / "table.docx"
+    document.save(path)
+
+    blocks = list(iter_docx_blocks(path))
+
+    assert "| a\\|b | first second |" in blocks[0]
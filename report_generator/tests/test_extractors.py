@@ -0,0 +1,77 @@
+"""
+Tests for the extractor registry, encoding sniffing and size guards.
+"""
+import codecs
+
+import pytest
+
+from src.report_generator.extractors import (
+    CHEAP, CPU_HEAVY, SNIFF_BYTES, Extractor, ExtractorRegistry, FileTooLargeError,
+    UnsupportedFileError, decode_text, default_registry, sniff_encoding
+)
+from src.report_generator.file_utils import FileProcessor
+
+
+def test_encoding_is_sniffed_from_bom_and_content():
+    assert sniff_encoding(codecs.BOM_UTF16_LE + "hi".encode("utf-16-le")) == "utf-16"
+    assert sniff_encoding(codecs.BOM_UTF8 + b"hi") == "utf-8-sig"
+    # A multi-byte character cut off by the sniff window is still UTF-8
+    assert sniff_encoding("café".encode("utf-8")[:-1]) == "utf-8"
+    assert sniff_encoding("café – ok".encode("cp1252")) == "cp1252"
+    with pytest.raises(UnsupportedFileError):
+        sniff_encoding(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR")
+
+
+def test_decoding_falls_back_when_text_past_the_head_does_not_fit():
+    data = b"a" * SNIFF_BYTES + "naïve".encode("cp1252")
+
+    assert decode_text(data).endswith("naïve")
+    assert FileProcessor.extract_source(data, ".txt") == data.decode("cp1252")
+
+
+def _recording_registry(calls, max_bytes=None):
+    def record(name):
+        return lambda source, file_name, **options: calls.append(name) or name
+
+    registry = ExtractorRegistry(fallback=Extractor("text", record("text")))
+    registry.register(Extractor("text", record("text"), suffixes=(".txt",), max_bytes=max_bytes))
+    registry.register(Extractor("PDF", record("pdf"), suffixes=(".pdf",), magic=(b"%PDF-",), cost=CPU_HEAVY))
+    registry.register(Extractor("Word document", record("docx"), suffixes=(".docx",), magic=(b"PK\x03\x04",)))
+    registry.register(Extractor("Excel workbook", record("xlsx"), suffixes=(".xlsx",), magic=(b"PK\x03\x04",)))
+    return registry
+
+
+def test_magic_bytes_take_precedence_over_the_suffix():
+    calls = []
+    registry = _recording_registry(calls)
+
+    assert registry.extract(b"%PDF-1.4 ...", ".txt") == "pdf"
+    assert registry.extract(b"PK\x03\x04 ...", ".xlsx") == "xlsx"
+    assert registry.extract(b"plain notes", ".log") == "text"
+    with pytest.raises(UnsupportedFileError, match="not a valid PDF"):
+        registry.extract(b"<html>not a pdf</html>", ".pdf")
+    with pytest.raises(UnsupportedFileError, match="Word document or Excel workbook"):
+        registry.extract(b"PK\x03\x04 ...", ".txt")
+    assert calls == ["pdf", "xlsx", "text"]
+
+    assert registry.cost(".pdf") == CPU_HEAVY
+    assert registry.cost(".unknown") == CHEAP
+
+
+def test_oversized_files_are_rejected_before_parsing(tmp_path):
+    calls = []
+    registry = _recording_registry(calls, max_bytes=10)
+    path = tmp_path / "big.txt"
+    path.write_bytes(b"x" * 11)
+
+    with pytest.raises(FileTooLargeError):
+        registry.extract(path, ".txt")
+    with pytest.raises(FileTooLargeError):
+        registry.extract(b"%PDF-" + b"x" * 20, ".pdf", max_bytes=16)
+    assert calls == []
+
+
+def test_default_registry_covers_the_supported_formats():
+    assert FileProcessor.SUPPORTED_EXTENSIONS == default_registry.suffixes()
+    for suffix in (".txt", ".md", ".csv", ".docx", ".xlsx", ".pdf"):
+        assert default_registry.for_suffix(suffix) is not None
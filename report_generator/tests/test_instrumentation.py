@@ -0,0 +1,141 @@
+"""
+Tests for the timing spans, the metrics endpoint and the slow-run profiler.
+"""
+import json
+import time
+import urllib.request
+
+import pytest
+
+from src.report_generator.instrumentation import SpanRecorder, SlowRunProfiler, start_metrics_server
+from src.report_generator.report_utils import ReportManager
+
+
+def test_spans_nest_into_traces_and_ring_buffer():
+    """Test that spans record their parent, trace and errors, keeping only the newest."""
+    recorder = SpanRecorder(capacity=5)
+    with recorder.trace("rerun") as trace_id:
+        with recorder.span("rerun.sidebar"):
+            with recorder.span("reports.list_reports") as attrs:
+                attrs["rows"] = 3
+        with pytest.raises(KeyError):
+            with recorder.span("rerun.form"):
+                raise KeyError("missing")
+
+    trace = recorder.find_trace(trace_id)
+    assert trace is recorder.last_trace("rerun")
+    spans = {span.name: span for span in trace.spans}
+    assert set(spans) == {"rerun", "rerun.sidebar", "reports.list_reports", "rerun.form"}
+    assert spans["reports.list_reports"].parent == "rerun.sidebar"
+    assert spans["reports.list_reports"].depth == 2
+    assert spans["reports.list_reports"].attrs == {"rows": 3}
+    assert spans["rerun.form"].error == "KeyError"
+    assert spans["rerun"].duration >= spans["rerun.sidebar"].duration
+
+    for i in range(10):
+        with recorder.span(f"later.{i}"):
+            pass
+    assert [span.name for span in recorder.spans()] == [f"later.{i}" for i in range(5, 10)]
+    assert len(recorder.find_trace(trace_id).spans) == 4
+
+    # Control flow such as Streamlit's rerun is not an error
+    with pytest.raises(GeneratorExit):
+        with recorder.span("rerun.history"):
+            raise GeneratorExit()
+    assert recorder.spans()[-1].error is None
+
+
+def test_prometheus_text():
+    """Test that span totals and gauges are exported as cumulative histograms."""
+    recorder = SpanRecorder(buckets=(0.01, 1.0))
+    with recorder.span("model.generate_report"):
+        pass
+    template = recorder.spans()[0]
+    recorder.reset()
+    for duration in (0.005, 0.5, 2.0):
+        recorder.record(template._replace(duration=duration))
+    recorder.register_gauge("jobs", "Jobs per status", lambda: {"queued": 2, "running": 1})
+    recorder.register_gauge("broken", "Fails to read", lambda: 1 / 0)
+
+    text = recorder.prometheus_text()
+    metric = "report_generator_span_duration_seconds"
+    assert f'{metric}_bucket{{span="model.generate_report",le="0.01"}} 1' in text
+    assert f'{metric}_bucket{{span="model.generate_report",le="1"}} 2' in text
+    assert f'{metric}_bucket{{span="model.generate_report",le="+Inf"}} 3' in text
+    assert f'{metric}_count{{span="model.generate_report"}} 3' in text
+    assert f'{metric}_sum{{span="model.generate_report"}} 2.505000' in text
+    assert 'report_generator_jobs{key="queued"} 2' in text
+    assert "report_generator_broken" not in text
+
+
+def test_instrumented_methods(generator, tmp_path):
+    """Test that wrapped methods keep working and streams are timed until consumed."""
+    recorder = SpanRecorder()
+    recorder.instrument(generator, ("generate_report", "generate_report_stream"), "model")
+    manager = recorder.instrument(ReportManager(tmp_path / "reports.json"), ("save_report", "get_report"), "reports")
+
+    with recorder.trace("rerun"):
+        chunks = generator.generate_report_stream("notes", use_cache=False)
+        with recorder.span("rerun.report"):
+            content = "".join(chunks)
+        report_id = manager.save_report({"title": "Daily", "content": content})
+    assert manager.get_report(report_id)["content"] == content
+    assert generator.generate_report("notes", use_cache=False) == content
+
+    spans = {span.name: span for span in recorder.spans()}
+    stream = spans["model.generate_report_stream"]
+    assert stream.attrs["items"] == len(content.split(" "))
+    assert stream.parent == "rerun" and stream.trace_id == spans["rerun"].trace_id
+    assert stream.duration >= spans["rerun.report"].duration * 0.5
+    assert spans["reports.save_report"].parent == "rerun"
+    assert spans["reports.get_report"].trace_id is None
+
+    # Instrumenting twice does not time a call twice; a disabled recorder leaves objects alone
+    recorder.instrument(generator, ("generate_report",), "model")
+    recorder.reset()
+    generator.generate_report("notes")
+    assert [span.name for span in recorder.spans()] == ["model.generate_report"]
+    processor = object.__new__(ReportManager)
+    SpanRecorder(enabled=False).instrument(processor, ("get_report",), "reports")
+    assert "get_report" not in vars(processor)
+
+
+def test_slow_runs_are_profiled(tmp_path):
+    """Test that only runs over the threshold leave a collapsed-stack profile."""
+    recorder = SpanRecorder()
+    profiler = SlowRunProfiler(tmp_path / "profiles", threshold=0.05, interval=0.001)
+
+    def slow_phase():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    with recorder.trace("rerun", profiler=profiler):
+        pass
+    assert recorder.last_trace().profile is None
+
+    with recorder.trace("rerun", profiler=profiler):
+        slow_phase()
+    profile = recorder.last_trace().profile
+    assert profile is not None
+    lines = open(profile, encoding="utf-8").read().splitlines()
+    assert any("slow_phase (test_instrumentation.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_metrics_server():
+    """Test the standalone /metrics and /spans endpoints."""
+    recorder = SpanRecorder()
+    with recorder.span("files.extract_upload"):
+        pass
+    server = start_metrics_server(0, recorder=recorder)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert 'span="files.extract_upload"' in response.read().decode("utf-8")
+        with urllib.request.urlopen(f"{base}/spans", timeout=5) as response:
+            assert json.load(response)[0]["name"] == "files.extract_upload"
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,99 @@
+"""
+Tests for the persistent background job queue.
+"""
+import threading
+import time
+
+import pytest
+
+from src.report_generator.job_queue import JobQueue, JobWorkerPool, QueueFullError
+from tests.test_batch_generation import RateLimited
+
+
+def test_claims_respect_per_user_limits_and_order(tmp_path):
+    """Test that one user's backlog does not hold up other users."""
+    queue = JobQueue(tmp_path / "jobs.db", max_queued_per_user=2)
+    first = queue.enqueue("alice", {"n": 1})
+    second = queue.enqueue("alice", {"n": 2})
+    other = queue.enqueue("bob", {"n": 3})
+    with pytest.raises(QueueFullError):
+        queue.enqueue("alice", {"n": 4})
+
+    assert queue.position(second) == 1
+    assert queue.claim("w1").id == first
+    assert queue.claim("w2").id == other
+    assert queue.claim("w3") is None
+    stats = queue.stats()
+    assert (stats["depth"], stats["running"], stats["waiting_users"]) == (1, 2, 1)
+
+    assert queue.complete(first, {"report_id": "r1"}, worker="w1")
+    job = queue.claim("w1")
+    assert job.id == second and job.payload == {"n": 2}
+    assert queue.get(first).result == {"report_id": "r1"}
+    assert queue.stats()["recent_done"] == 1
+    queue.close()
+
+
+def test_interrupted_jobs_survive_a_restart(tmp_path):
+    """Test that a job whose worker died is handed to the next worker."""
+    queue = JobQueue(tmp_path / "jobs.db", lease_seconds=0.05)
+    job_id = queue.enqueue("alice", {"content": "notes"})
+    queue.enqueue("bob", {"content": "waiting"})
+    assert queue.claim("old-process").id == job_id
+    queue.close()
+
+    restarted = JobQueue(tmp_path / "jobs.db", lease_seconds=60)
+    time.sleep(0.1)
+    job = restarted.claim("new-process", max_per_user=1)
+    assert (job.id, job.attempts) == (job_id, 2)
+    assert restarted.get(job_id).status == "running"
+    # The old worker's late result does not overwrite the new attempt
+    assert restarted.complete(job_id, {"stale": True}, worker="old-process") is False
+    assert restarted.complete(job_id, {"report_id": "r1"}, worker="new-process") is True
+    assert restarted.claim("new-process").payload == {"content": "waiting"}
+    restarted.close()
+
+
+def test_worker_pool_runs_jobs_and_retries_rate_limits(tmp_path, monkeypatch):
+    """Test that handlers run in the background and 429s are requeued."""
+    from src.report_generator import job_queue
+
+    monkeypatch.setattr(job_queue, "backoff_delay", lambda attempt: 0.0)
+    queue = JobQueue(tmp_path / "jobs.db")
+    failures = [RateLimited("slow down")]
+
+    def handle(job):
+        if job.payload["content"] == "flaky" and failures:
+            raise failures.pop()
+        if job.payload["content"] == "broken":
+            raise ValueError("bad input")
+        return {"text": job.payload["content"].upper()}
+
+    pool = JobWorkerPool(queue, {"report": handle}, workers=2, poll_interval=0.01).start()
+    ids = [queue.enqueue(user, {"content": content}) for user, content in
+           [("alice", "flaky"), ("alice", "fine"), ("bob", "broken")]]
+    deadline = time.monotonic() + 5
+    while not all(queue.get(i).finished for i in ids) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.stop(timeout=5)
+
+    jobs = [queue.get(i) for i in ids]
+    assert [job.status for job in jobs] == ["done", "done", "failed"]
+    assert jobs[0].result == {"text": "FLAKY"} and jobs[0].attempts == 2
+    assert jobs[2].error == "bad input"
+    assert queue.stats()["counts"]["failed"] == 1
+    queue.close()
+
+
+def test_connections_close_with_their_threads(tmp_path):
+    """Test that calls from many short-lived threads keep the open connections bounded."""
+    queue = JobQueue(tmp_path / "jobs.db")
+    queue.enqueue("alice", {"content": "notes"})
+    for _ in range(50):
+        thread = threading.Thread(target=queue.stats)
+        thread.start()
+        thread.join()
+    assert queue._connections.count() <= 2
+
+    queue.close()
+    assert queue._connections.count() == 0
@@ -0,0 +1,134 @@
+"""
+Tests for the queued, rotating JSON logging pipeline.
+"""
+import gzip
+import json
+import logging
+import queue
+import random
+import threading
+
+import pytest
+
+from src.report_generator import logging_utils
+from src.report_generator.logging_utils import (
+    ContextQueueHandler, SampledDebugFilter, configure_logging, log_context, stop_logging
+)
+
+
+@pytest.fixture
+def log_config(tmp_path):
+    """Return a config writing JSON to a small rotating file; restore the root logger afterwards."""
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    config = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {
+            "file": {
+                "class": "logging.handlers.RotatingFileHandler",
+                "filename": str(tmp_path / "app.log"),
+                "maxBytes": 2000,
+                "backupCount": 2,
+                "formatter": "json",
+            },
+        },
+        "loggers": {"": {"handlers": ["file"], "level": "INFO"}},
+    }
+    yield config
+    stop_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_records_are_written_by_the_listener_as_json(log_config, tmp_path):
+    """Test that records carry the log context and extras and are written off the calling thread."""
+    listener = configure_logging(log_config, level="INFO", debug_sample_rate=0, queue_size=100)
+    assert configure_logging(log_config) is listener
+    assert isinstance(logging.getLogger().handlers[0], ContextQueueHandler)
+
+    writers = set()
+    file_handler = listener.handlers[0]
+    emit = file_handler.emit
+    file_handler.emit = lambda record: (writers.add(threading.current_thread().name), emit(record))
+
+    log = logging.getLogger("report_generator.test")
+    with log_context(request_id="req-1"):
+        with log_context(report_id="report_1", job_id=None):
+            log.info("Saved %s", "report_1", extra={"duration_ms": 12.5})
+        try:
+            raise ValueError("bad input")
+        except ValueError:
+            log.exception("Could not save")
+    log.debug("Not written")
+    stop_logging()
+
+    saved, failed = read_records(tmp_path / "app.log")
+    assert saved["message"] == "Saved report_1"
+    assert saved["level"] == "INFO" and saved["logger"] == "report_generator.test"
+    assert saved["request_id"] == "req-1" and saved["report_id"] == "report_1"
+    assert saved["duration_ms"] == 12.5 and "job_id" not in saved
+    assert saved["thread"] == threading.current_thread().name
+    assert "report_id" not in failed and "ValueError: bad input" in failed["exception"]
+    assert threading.current_thread().name not in writers
+
+
+def test_rotated_files_are_compressed(log_config, tmp_path):
+    """Test that the log is rotated by size into gzipped backups, keeping backupCount of them."""
+    configure_logging(log_config, level="INFO", debug_sample_rate=0, compress=True, queue_size=1000)
+    log = logging.getLogger("report_generator.test")
+    for i in range(200):
+        log.info("Record %d %s", i, "x" * 40)
+    stop_logging()
+
+    backups = sorted(path.name for path in tmp_path.iterdir() if path.name != "app.log")
+    assert backups == ["app.log.1.gz", "app.log.2.gz"]
+    with gzip.open(tmp_path / "app.log.1.gz", "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records and all(record["message"].startswith("Record") for record in records)
+    assert read_records(tmp_path / "app.log")[-1]["message"].startswith("Record 199")
+
+
+def test_debug_records_are_sampled(log_config, tmp_path, monkeypatch):
+    """Test that only a fraction of DEBUG records is written, marked with the rate."""
+    monkeypatch.setattr(logging_utils.random, "random", random.Random(3).random)
+    log_config["handlers"]["file"]["maxBytes"] = 0
+    configure_logging(log_config, level="INFO", debug_sample_rate=0.1, queue_size=1000)
+    log = logging.getLogger("report_generator.test")
+    for i in range(500):
+        log.debug("Cache hit %d", i)
+    log.info("Done")
+    stop_logging()
+
+    records = read_records(tmp_path / "app.log")
+    sampled = [record for record in records if record["level"] == "DEBUG"]
+    assert 25 <= len(sampled) <= 75
+    assert all(record["sample_rate"] == 0.1 for record in sampled)
+    assert records[-1]["message"] == "Done" and "sample_rate" not in records[-1]
+
+    never = SampledDebugFilter(logging.WARNING, rate=0)
+    assert not never.filter(logging.makeLogRecord({"levelno": logging.INFO}))
+    assert never.filter(logging.makeLogRecord({"levelno": logging.ERROR}))
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    """Test that a stalled listener costs records, not caller time."""
+    handler = ContextQueueHandler(queue.Queue(2))
+    log = logging.getLogger("report_generator.test.full")
+    log.propagate = False
+    log.addHandler(handler)
+    try:
+        for i in range(5):
+            log.warning("Record %d", i)
+    finally:
+        log.removeHandler(handler)
+        log.propagate = True
+    assert handler.dropped == 3
+    assert handler.queue.get_nowait().msg == "Record 0"
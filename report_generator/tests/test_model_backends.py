@@ -0,0 +1,91 @@
+"""
+Tests for the pluggable model backend and the fake Gemini service.
+"""
+import statistics
+
+import pytest
+
+from src.report_generator import config, services
+from src.report_generator.batch_generation import is_retryable_error
+from src.report_generator.gemini_utils import GeminiReportGenerator
+from src.report_generator.model_backends import FakeModelBackend, ModelServiceError
+from src.report_generator.response_cache import ResponseCache
+
+
+def test_fake_backend_is_deterministic_and_streams(monkeypatch):
+    """Test that the fake model needs no key and answers the same way every run."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    waits = []
+    backend = FakeModelBackend(latency=0.2, distribution="fixed", tokens_per_second=100,
+                               output_tokens=50, chunk_tokens=20, sleep=waits.append)
+    generator = GeminiReportGenerator(backend=backend, cache=ResponseCache())
+    assert generator.model is backend
+    assert generator.check_health()["ok"]
+
+    text = generator.generate_report("notes", max_tokens=30, use_cache=False)
+    assert len(text.split()) == 30
+    assert waits == [0.2, pytest.approx(0.3)]
+
+    chunks = list(generator.generate_report_stream("notes", max_tokens=30, use_cache=False))
+    assert [len(chunk.split()) for chunk in chunks] == [20, 10]
+    assert "".join(chunks) == text
+    assert FakeModelBackend(output_tokens=50, sleep=waits.append).generate_content(
+        generator._prepare_prompt("notes", "default"), {"max_output_tokens": 30}
+    ).text == text
+
+    generator.generate_report("notes", max_tokens=30)
+    generator.generate_report("notes", max_tokens=30)
+    assert backend.stats()["calls"] == 3
+    assert generator.cache_stats()["memory_hits"] == 1
+
+
+def test_fake_backend_failures_are_retried():
+    """Test that injected 429s and server errors look like Gemini's to the retry logic."""
+    backend = FakeModelBackend(rate_limit_rate=1.0, sleep=lambda seconds: None)
+    with pytest.raises(ModelServiceError) as error:
+        backend.generate_content("prompt")
+    assert error.value.code == 429 and is_retryable_error(error.value)
+
+    flaky = FakeModelBackend(rate_limit_rate=0.3, error_rate=0.3, output_tokens=5, seed=7,
+                             sleep=lambda seconds: None)
+    generator = GeminiReportGenerator(backend=flaky)
+    jobs = [(f"notes {i}", "default") for i in range(20)]
+    results = list(generator.generate_batch(jobs, max_retries=10, retry_base_delay=0, use_cache=False))
+    assert all(result.error is None for result in results)
+    stats = flaky.stats()
+    assert stats["rate_limited"] > 0 and stats["errors"] > 0
+    assert stats["calls"] == sum(result.attempts for result in results)
+
+    # The same seed injects the same failures
+    again = FakeModelBackend(rate_limit_rate=0.3, error_rate=0.3, output_tokens=5, seed=7,
+                             sleep=lambda seconds: None)
+    list(GeminiReportGenerator(backend=again).generate_batch(jobs, max_retries=10, retry_base_delay=0, use_cache=False))
+    assert again.stats() == stats
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "normal", "lognormal"])
+def test_latency_distributions(distribution):
+    """Test that sampled latencies center on the configured latency."""
+    waits = []
+    backend = FakeModelBackend(latency=0.4, distribution=distribution, spread=0.25,
+                               tokens_per_second=0, sleep=waits.append)
+    for i in range(400):
+        backend.generate_content(f"prompt {i}")
+    first_tokens = waits[::2]
+    assert statistics.median(first_tokens) == pytest.approx(0.4, rel=0.1)
+    assert min(first_tokens) >= 0 and statistics.pstdev(first_tokens) > 0.03
+    with pytest.raises(ValueError):
+        FakeModelBackend(distribution="bimodal")
+
+
+def test_services_use_the_configured_backend(monkeypatch, tmp_path):
+    """Test that MODEL_BACKEND=fake replaces the Gemini service."""
+    monkeypatch.setattr(config, "MODEL_BACKEND", "fake")
+    monkeypatch.setattr(config, "FAKE_MODEL_LATENCY", 0.0)
+    monkeypatch.setattr(config, "RESPONSE_CACHE_DIR", tmp_path / "cache")
+    generator = services.build_generator()
+    assert isinstance(generator.backend, FakeModelBackend)
+    assert generator.model_name == "fake"
+
+    monkeypatch.setattr(config, "MODEL_BACKEND", "gemini")
+    assert services.build_model_backend() is None
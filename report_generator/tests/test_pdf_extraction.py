@@ -0,0 +1,66 @@
+"""
+Tests for page-parallel PDF extraction.
+"""
+import pytest
+
+from src.report_generator.file_utils import FileProcessor
+
+PyPDF2 = pytest.importorskip("PyPDF2")
+from src.report_generator.pdf_extraction import iter_pdf_pages
+
+def _make_pdf(path, page_count):
+    """Write a minimal PDF whose page i shows the text 'Page i'."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for i in range(1, page_count + 1):
+        stream = f"BT /F1 12 Tf 72 720 Td (Page {i}) Tj ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), page_count)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return path
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_pages_stream_in_order_with_progress(tmp_path, workers):
+    """Test serial and process-pool extraction yield the same pages in order."""
+    pdf = _make_pdf(tmp_path / "report.pdf", 20)
+    updates = []
+
+    pages = list(iter_pdf_pages(
+        pdf, workers=workers, batch_size=4,
+        progress=lambda done, total: updates.append((done, total))
+    ))
+
+    assert [number for number, _ in pages] == list(range(1, 21))
+    assert all(f"Page {number}" in text for number, text in pages)
+    assert updates[-1] == (20, 20)
+    assert len(updates) == 20
+
+def test_page_ranges_and_limits(tmp_path):
+    """Test selecting a page range and capping the number of pages."""
+    pdf = _make_pdf(tmp_path / "report.pdf", 12)
+
+    pages = list(iter_pdf_pages(pdf, first_page=3, last_page=9, max_pages=4, workers=2, batch_size=2))
+    assert [number for number, _ in pages] == [3, 4, 5, 6]
+
+    text = FileProcessor.extract_text(pdf, max_pages=2)
+    assert "Page 1" in text and "Page 2" in text and "Page 3" not in text
@@ -0,0 +1,333 @@
+"""
+Tests for the report storage backends.
+"""
+import pytest
+import json
+import threading
+
+from src.report_generator.report_utils import ReportManager
+from src.report_generator.report_journal import JournalReportStore
+
+@pytest.fixture
+def journal_manager(tmp_path):
+    """Create a journal-backed report manager without a background compactor."""
+    manager = ReportManager(
+        tmp_path / "reports.json",
+        backend="journal",
+        background_compaction=False
+    )
+    yield manager
+    manager.close()
+
+def test_journal_save_get_delete(journal_manager):
+    """Test the basic report lifecycle on the journal backend."""
+    report_id = journal_manager.save_report({"title": "Journal Report", "content": "Body"})
+
+    report = journal_manager.get_report(report_id)
+    assert report["title"] == "Journal Report"
+    assert journal_manager.get_report_count() == 1
+
+    assert journal_manager.delete_report(report_id) is True
+    assert journal_manager.get_report(report_id) is None
+    assert journal_manager.delete_report(report_id) is False
+
+def test_journal_replays_after_reopen(tmp_path):
+    """Test that the offset index is rebuilt from the journal on restart."""
+    storage = tmp_path / "reports.json"
+    manager = ReportManager(storage, backend="journal", background_compaction=False)
+    for i in range(1, 6):
+        manager.save_report({"id": f"report_{i}", "created_at": f"2023-01-{i:02d}T12:00:00"})
+    manager.delete_report("report_3")
+    manager.close()
+
+    reopened = ReportManager(storage, backend="journal", background_compaction=False)
+    listed = reopened.list_reports(limit=10)
+    assert [r["id"] for r in listed] == ["report_5", "report_4", "report_2", "report_1"]
+    reopened.close()
+
+def test_journal_migrates_legacy_json(tmp_path):
+    """Test that an existing JSON history is imported into the journal."""
+    storage = tmp_path / "reports.json"
+    with open(storage, "w") as f:
+        json.dump([{"id": "old_1", "title": "Old Report"}], f)
+
+    manager = ReportManager(storage, backend="journal", background_compaction=False)
+    assert manager.get_report("old_1")["title"] == "Old Report"
+    assert not storage.exists()
+    assert (tmp_path / "reports.json.migrated").exists()
+    manager.close()
+
+def test_journal_compaction_reclaims_dead_records(tmp_path):
+    """Test that sealed segments full of superseded records are rewritten."""
+    store = JournalReportStore(
+        tmp_path / "journal",
+        segment_max_bytes=200,
+        background_compaction=False
+    )
+    for version in range(10):
+        store.put({"id": "report_1", "content": f"version {version}" * 5})
+    store.put({"id": "report_2", "content": "keep me"})
+
+    before = store.stats()
+    assert store.compact() > 0
+    after = store.stats()
+    assert after["total_bytes"] < before["total_bytes"]
+    assert store.get("report_1")["content"] == "version 9" * 5
+    assert store.get("report_2")["content"] == "keep me"
+    store.close()
+
+    reopened = JournalReportStore(tmp_path / "journal", background_compaction=False)
+    assert reopened.count() == 2
+    reopened.close()
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    """Create a SQLite-backed report manager with a few reports."""
+    manager = ReportManager(tmp_path / "reports.json", backend="sqlite")
+    for i in range(1, 7):
+        manager.save_report({
+            "id": f"report_{i}",
+            "title": f"Report {i}",
+            "content": f"Body {i}",
+            "template": "operations" if i % 2 else "meetings",
+            "date": f"2023-01-{i:02d}",
+            "priority": "High" if i > 4 else "Low",
+            "created_at": f"2023-01-{i:02d}T12:00:00"
+        })
+    yield manager
+    manager.close()
+
+def test_sqlite_list_pushes_down_sort_and_filters(sqlite_manager):
+    """Test sorting, filtering and pagination on the SQLite backend."""
+    listed = sqlite_manager.list_reports(limit=2)
+    assert [r["id"] for r in listed] == ["report_6", "report_5"]
+    assert "content" not in listed[0]
+
+    listed = sqlite_manager.list_reports(template="operations", descending=False)
+    assert [r["id"] for r in listed] == ["report_1", "report_3", "report_5"]
+
+    listed = sqlite_manager.list_reports(date_from="2023-01-02", date_to="2023-01-04", priority="Low")
+    assert [r["id"] for r in listed] == ["report_4", "report_3", "report_2"]
+
+    assert sqlite_manager.get_report("report_3")["content"] == "Body 3"
+
+def test_keyset_pagination_matches_offset(sqlite_manager, journal_manager):
+    """Test that keyset cursors page the same way on every backend."""
+    for report in sqlite_manager.list_reports(limit=10):
+        journal_manager.save_report(dict(sqlite_manager.get_report(report["id"])))
+
+    for manager in (sqlite_manager, journal_manager):
+        first_page = manager.list_reports(limit=3)
+        last = first_page[-1]
+        second_page = manager.list_reports(limit=3, after=(last["created_at"], last["id"]))
+        assert [r["id"] for r in second_page] == ["report_3", "report_2", "report_1"]
+        assert second_page == manager.list_reports(limit=3, offset=3)
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pagination_keeps_missing_sort_values(tmp_path, descending):
+    """Test that reports without the sort field are paged, sorted as '' on every backend."""
+    pages = {}
+    for backend in ("json", "journal", "sqlite"):
+        manager = ReportManager(tmp_path / backend / "reports.json", backend=backend)
+        for i in range(1, 7):
+            manager.save_report({"id": f"report_{i}", "date": f"2023-01-{i:02d}" if i % 2 else None})
+
+        ids, after = [], None
+        while True:
+            page = manager.list_reports(limit=2, sort_by="date", descending=descending, after=after)
+            if not page:
+                break
+            ids.extend(r["id"] for r in page)
+            after = (page[-1]["date"], page[-1]["id"])
+        assert ids == [r["id"] for r in manager.list_reports(limit=10, sort_by="date", descending=descending)]
+        pages[backend] = ids
+        manager.close()
+
+    assert len(pages["sqlite"]) == 6
+    assert pages["json"] == pages["journal"] == pages["sqlite"]
+
+def test_sqlite_connections_close_with_their_threads(sqlite_manager):
+    """Test that connections opened by short-lived threads do not pile up."""
+    store = sqlite_manager._store
+    for _ in range(50):
+        thread = threading.Thread(target=sqlite_manager.list_reports)
+        thread.start()
+        thread.join()
+    assert store._connections.count() <= 2
+
+    sqlite_manager.close()
+    assert store._connections.count() == 0
+
+def test_json_read_cache_revalidates_on_external_change(tmp_path):
+    """Test that the JSON read cache is reused until another writer changes the file."""
+    storage = tmp_path / "reports.json"
+    manager = ReportManager(storage)
+    manager.save_report({"id": "report_1", "title": "First"})
+
+    manager.get_report("report_1")
+    manager.list_reports(limit=5)
+    stats = manager.cache_stats()
+    assert stats["hits"] >= 2
+
+    # Simulate another process rewriting the history file
+    other = ReportManager(storage)
+    other.save_report({"id": "report_2", "title": "Second", "padding": "x" * 10})
+
+    misses = manager.cache_stats()["misses"]
+    assert manager.get_report("report_2")["title"] == "Second"
+    assert manager.cache_stats()["misses"] == misses + 1
+
+def _save_many(storage, backend, worker, count):
+    """Save reports from a separate process."""
+    manager = ReportManager(storage, backend=backend)
+    for i in range(count):
+        manager.save_report({"id": f"worker{worker}_{i}", "title": f"Report {i}"})
+    manager.close()
+
+@pytest.mark.parametrize("backend", ["json", "journal"])
+def test_concurrent_processes_do_not_lose_writes(tmp_path, backend):
+    """Test that saves from several processes sharing one DATA_DIR are all kept."""
+    multiprocessing = pytest.importorskip("multiprocessing")
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("fork start method not available")
+    context = multiprocessing.get_context("fork")
+
+    storage = tmp_path / "reports.json"
+    workers = [
+        context.Process(target=_save_many, args=(storage, backend, worker, 20))
+        for worker in range(4)
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(timeout=60)
+        assert process.exitcode == 0
+
+    manager = ReportManager(storage, backend=backend)
+    assert manager.get_report_count() == 80
+    manager.close()
+
+def test_group_commit_batches_concurrent_saves(tmp_path):
+    """Test that saves arriving together share a commit."""
+    import threading
+
+    store = JournalReportStore(
+        tmp_path / "journal",
+        background_compaction=False,
+        group_commit_ms=20
+    )
+    threads = [
+        threading.Thread(target=store.put, args=({"id": f"report_{i}"},))
+        for i in range(16)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = store.stats()["group_commit"]
+    assert stats["writes"] == 16
+    assert stats["batches"] < 16
+    assert store.count() == 16
+    store.close()
+
+def test_journal_repairs_torn_write(tmp_path):
+    """Test that a partial record left by a crash is dropped on restart."""
+    store = JournalReportStore(tmp_path / "journal", background_compaction=False)
+    store.put({"id": "report_1", "title": "Kept"})
+    store.close()
+
+    segment = next((tmp_path / "journal").glob("*.jsonl"))
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "put", "report": {"id": "rep')
+
+    reopened = JournalReportStore(tmp_path / "journal", background_compaction=False)
+    reopened.put({"id": "report_2", "title": "After crash"})
+    assert reopened.get("report_1")["title"] == "Kept"
+    assert reopened.get("report_2")["title"] == "After crash"
+    reopened.close()
+
+def test_search_ranks_and_filters_reports(tmp_path):
+    """Test ranked keyword search kept in step with saves and deletes."""
+    manager = ReportManager(tmp_path / "reports.json", search=True)
+    manager.save_report({
+        "id": "ops", "title": "Database outage", "template": "operations",
+        "date": "2023-02-01", "content": "The primary database failed over twice."
+    })
+    manager.save_report({
+        "id": "dev", "title": "Sprint update", "template": "development",
+        "date": "2023-03-01", "content": "Migrated the database schema."
+    })
+    manager.save_report({
+        "id": "meet", "title": "Standup", "template": "meetings",
+        "date": "2023-03-02", "content": "Discussed hiring."
+    })
+
+    results = manager.search_reports("database")
+    assert [r["id"] for r in results] == ["ops", "dev"]
+    assert "content" not in results[0]
+
+    assert [r["id"] for r in manager.search_reports("database", template="development")] == ["dev"]
+    assert [r["id"] for r in manager.search_reports("database", date_to="2023-02-28")] == ["ops"]
+
+    manager.delete_report("ops")
+    assert [r["id"] for r in manager.search_reports("database")] == ["dev"]
+    manager.close()
+
+def test_search_connections_close_with_their_threads(tmp_path):
+    """Test that searches from short-lived threads do not leave connections open."""
+    manager = ReportManager(tmp_path / "reports.json", search=True)
+    manager.save_report({"id": "ops", "title": "Database outage"})
+    for _ in range(50):
+        thread = threading.Thread(target=manager.search_reports, args=("database",))
+        thread.start()
+        thread.join()
+    assert manager._search._connections.count() <= 2
+    manager.close()
+
+def test_search_index_is_built_for_existing_history(tmp_path):
+    """Test that enabling search indexes reports saved before it existed."""
+    storage = tmp_path / "reports.json"
+    ReportManager(storage).save_report({"id": "old", "title": "Quarterly budget"})
+
+    manager = ReportManager(storage, search=True)
+    assert [r["id"] for r in manager.search_reports("budget")] == ["old"]
+    manager.close()
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_split_bodies_are_compressed_and_loaded_lazily(tmp_path, backend):
+    """Test that listings return summaries and bodies live in the body store."""
+    storage = tmp_path / "reports.json"
+    manager = ReportManager(storage, backend=backend, split_bodies=True, search=True)
+    content = "## Summary\n" + "All systems nominal. " * 200
+    report_id = manager.save_report({"title": "Ops Report", "template": "operations", "content": content})
+
+    listed = manager.list_reports(limit=5)
+    assert listed[0]["id"] == report_id
+    assert "content" not in listed[0]
+
+    body_files = list((tmp_path / "reports.bodies").rglob("*.md.z"))
+    assert len(body_files) == 1
+    assert body_files[0].stat().st_size < len(content) / 4
+
+    assert manager.get_report(report_id)["content"] == content
+    assert [r["id"] for r in manager.search_reports("nominal")] == [report_id]
+
+    assert manager.delete_report(report_id) is True
+    assert not body_files[0].exists()
+    manager.close()
+
+@pytest.mark.parametrize("backend", ["json", "journal", "sqlite"])
+def test_save_reports_writes_a_batch_at_once(tmp_path, backend):
+    """Test that a batch of reports is stored, indexed and kept in order."""
+    manager = ReportManager(tmp_path / "reports.json", backend=backend, split_bodies=True, search=True)
+    reports = [{"title": f"Notes {i}", "content": f"deploy step {i}"} for i in range(3)]
+
+    ids = manager.save_reports(reports)
+
+    assert ids == [report["id"] for report in reports] and len(set(ids)) == 3
+    assert manager.get_report_count() == 3
+    assert manager.get_report(ids[1])["content"] == "deploy step 1"
+    assert len(manager.search_reports("deploy")) == 3
+    assert manager.save_reports([]) == []
+    manager.close()
@@ -0,0 +1,87 @@
+"""
+Tests for the model response cache.
+"""
+import time
+
+from src.report_generator.response_cache import ResponseCache
+
+def test_cache_key_depends_on_prompt_model_and_config():
+    """Test that any change to the request produces a different key."""
+    key = ResponseCache.make_key("prompt", "model-a", {"temperature": 0.7})
+    assert key == ResponseCache.make_key("prompt", "model-a", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("prompt!", "model-a", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("prompt", "model-b", {"temperature": 0.7})
+    assert key != ResponseCache.make_key("prompt", "model-a", {"temperature": 0.2})
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    """Test that the in-memory tier stays within its size limit."""
+    cache = ResponseCache(max_memory_bytes=25)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 10)
+    assert cache.get("a") == "x" * 10  # a is now most recently used
+    cache.set("c", "z" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_bytes"] <= 25
+    assert stats["misses"] == 1
+
+def test_disk_tier_survives_restart_and_expires(tmp_path, monkeypatch):
+    """Test that responses are reloaded from disk and dropped after the TTL."""
+    cache = ResponseCache(tmp_path / "cache", ttl_seconds=60)
+    cache.set("key", "cached report")
+
+    restarted = ResponseCache(tmp_path / "cache", ttl_seconds=60)
+    assert restarted.get("key") == "cached report"
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.get("key") == "cached report"
+    assert restarted.stats()["memory_hits"] == 1
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert restarted.get("key") is None
+    assert not list((tmp_path / "cache").rglob("*.json"))
+
+def test_disk_hits_keep_the_stored_expiry(tmp_path, monkeypatch):
+    """Test that reloading an entry from disk does not restart its TTL."""
+    ResponseCache(tmp_path / "cache", ttl_seconds=60).set("key", "cached report")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 50)
+    restarted = ResponseCache(tmp_path / "cache", ttl_seconds=60)
+    assert restarted.get("key") == "cached report"
+
+    monkeypatch.setattr(time, "time", lambda: now + 70)
+    assert restarted.get("key") is None
+
+def test_prune_removes_expired_entries_never_read(tmp_path, monkeypatch):
+    """Test that prune deletes expired files that no lookup would reach."""
+    cache = ResponseCache(tmp_path / "cache", ttl_seconds=60)
+    cache.set("stale", "old report")
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    cache.set("fresh", "new report")
+
+    assert ResponseCache(tmp_path / "cache").prune() == 1
+    assert not cache._disk_path("stale").exists()
+    assert cache._disk_path("fresh").exists()
+
+def test_expired_entries_are_pruned_in_the_background(tmp_path):
+    """Test that a cache with a prune interval cleans its disk tier at startup."""
+    ResponseCache(tmp_path / "cache", ttl_seconds=-1).set("stale", "old report")
+
+    cache = ResponseCache(tmp_path / "cache", prune_interval=3600)
+    deadline = time.time() + 5
+    while list((tmp_path / "cache").rglob("*.json")):
+        assert time.time() < deadline
+        time.sleep(0.01)
+    cache.close()
+    assert not cache._pruner.is_alive()
+
+def test_disabled_cache_never_stores(tmp_path):
+    """Test the opt-out switch."""
+    cache = ResponseCache(tmp_path / "cache", enabled=False)
+    cache.set("key", "report")
+    assert cache.get("key") is None
+    assert not list((tmp_path / "cache").rglob("*.json"))
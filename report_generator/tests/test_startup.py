@@ -0,0 +1,35 @@
+"""
+Tests for lazy imports and lazy Gemini client initialization.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+def test_package_import_skips_heavy_dependencies():
+    """Test that importing the package does not load pandas, python-docx or the Gemini SDK."""
+    code = (
+        "import sys, src.report_generator as pkg\n"
+        "heavy = [m for m in ('pandas', 'docx', 'google.generativeai') if m in sys.modules]\n"
+        "print(','.join(heavy))\n"
+        "pkg.ReportManager\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert result.stdout.strip() == ""
+
+def test_client_connects_on_first_use(generator):
+    """Test that constructing the generator makes no API call."""
+    assert generator._model is None
+
+    health = generator.check_health()
+    assert health["ok"] is True
+    assert generator.health == health
+    assert generator.model.calls == 0
+
+    generator.generate_report("notes")
+    assert generator.model.calls == 1
@@ -0,0 +1,31 @@
+"""
+Tests for streaming report generation.
+"""
+import logging
+
+from src.report_generator.response_cache import ResponseCache
+
+def test_stream_yields_chunks_and_caches_complete_text(generator, caplog):
+    """Test that chunks arrive incrementally and the full text is cached once finished."""
+    generator.cache = ResponseCache()
+
+    with caplog.at_level(logging.INFO):
+        chunks = list(generator.generate_report_stream("standup notes"))
+    assert len(chunks) > 1
+    assert "".join(chunks) == "report for standup notes"
+    assert "time to first token" in caplog.text
+
+    # The cached response is replayed without calling the model
+    calls = generator.model.calls
+    assert list(generator.generate_report_stream("standup notes")) == ["report for standup notes"]
+    assert generator.model.calls == calls
+
+def test_abandoned_stream_is_not_cached(generator):
+    """Test that a partially consumed stream does not leave a truncated cache entry."""
+    generator.cache = ResponseCache()
+
+    stream = generator.generate_report_stream("standup notes")
+    next(stream)
+    stream.close()
+
+    assert generator.cache.stats()["memory_entries"] == 0
@@ -0,0 +1,79 @@
+"""
+Tests for chunked CSV/Excel profiling.
+"""
+import pytest
+
+from src.report_generator.file_utils import FileProcessor
+from src.report_generator.table_extraction import TableProfiler, describe_csv, describe_excel
+
+pd = pytest.importorskip("pandas")
+
+
+def _write_sales_csv(path, rows):
+    lines = ["id,amount,region,date,comment"]
+    for i in range(rows):
+        amount = "n/a?" if i == 7 else ("100000" if i == 11 else str(100 + i % 10))
+        region = ["north", "south", "east"][i % 3]
+        comment = "" if i % 4 else f"note {i}"
+        lines.append(f"{i},{amount},{region},2024-01-{i % 28 + 1:02d},{comment}")
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_csv_digest_profiles_columns_across_chunks(tmp_path):
+    """Statistics cover every chunk and the row sample stays bounded"""
+    path = _write_sales_csv(tmp_path / "sales.csv", 1000)
+
+    digest = describe_csv(path, chunksize=64, sample_rows=10)
+
+    assert "Rows: 1,000 | Columns: 5" in digest
+    assert "| id | numeric | 0.0% | min 0, max 999," in digest
+    assert "| region | categorical |" in digest
+    assert "3 distinct; top: north (33%)" in digest
+    assert "| date | datetime |" in digest
+    assert "| comment |" in digest and "75.0%" in digest
+    assert "amount: 1 non-numeric values (e.g. 'n/a?')" in digest
+    assert "amount: extreme values" in digest
+    assert "comment: mostly empty (75% null)" in digest
+    assert "Rows (10 of 1,000 rows, sampled):" in digest
+    # Sampling is seeded, so the same file always gives the same digest
+    assert describe_csv(path, chunksize=64, sample_rows=10) == digest
+
+
+def test_small_tables_include_every_row(tmp_path):
+    path = _write_sales_csv(tmp_path / "small.csv", 5)
+
+    digest = describe_csv(path, sample_rows=10)
+
+    assert "Rows (all 5 rows):" in digest
+    assert "note 4" in digest
+
+
+def test_excel_digest_covers_every_sheet(tmp_path):
+    pytest.importorskip("openpyxl")
+    path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"team": ["a", "b", "a"], "hours": [1.5, 2.0, 8.0]}).to_excel(
+            writer, sheet_name="Hours", index=False
+        )
+        pd.DataFrame({"status": ["done"] * 4}).to_excel(writer, sheet_name="Tasks", index=False)
+
+    digest = describe_excel(path, chunksize=2)
+
+    assert "## Sheet: Hours\nRows: 3 | Columns: 2" in digest
+    assert "| hours | numeric | 0.0% | min 1.5, max 8, mean 3.833," in digest
+    assert "## Sheet: Tasks\nRows: 4 | Columns: 1" in digest
+    assert "status: constant value 'done'" in digest
+    assert FileProcessor.extract_text(path) == describe_excel(path, sample_rows=20)
+
+
+def test_profiler_accepts_chunks_with_changing_dtypes():
+    """A column read as numbers in one chunk and text in the next is merged"""
+    profiler = TableProfiler(sample_rows=3)
+    profiler.update(pd.DataFrame({"value": [1, 2, 3]}))
+    profiler.update(pd.DataFrame({"value": ["4", "5", None]}))
+
+    digest = profiler.digest("Chunks")
+
+    assert "| value | numeric | 16.7% | min 1, max 5, mean 3," in digest
+    assert "Rows (3 of 6 rows, sampled):" in digest
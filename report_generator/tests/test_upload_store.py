@@ -0,0 +1,73 @@
+"""
+Tests for the content-addressed upload store and extraction cache.
+"""
+import os
+import time
+
+from src.report_generator.file_utils import FileProcessor
+from src.report_generator.upload_store import UploadStore
+
+class FakeUpload:
+    """Mimics Streamlit's UploadedFile."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getvalue(self):
+        return self._data
+
+def test_identical_uploads_are_stored_and_parsed_once(tmp_path, monkeypatch):
+    """Test that reruns and re-uploads reuse the stored file and extracted text."""
+    store = UploadStore(tmp_path / "uploads")
+    # Spill every upload to the store so the stored copies can be counted
+    processor = FileProcessor(store=store, spool_max_bytes=0)
+    calls = []
+    original = FileProcessor.extract_source
+
+    def counting_extract(source, suffix, **kwargs):
+        calls.append(source)
+        return original(source, suffix, **kwargs)
+
+    monkeypatch.setattr(FileProcessor, "extract_source", staticmethod(counting_extract))
+
+    for name in ("notes.md", "notes.md", "copy.md"):
+        assert processor.extract_upload(FakeUpload(name, b"# Standup\nAll good")) == "# Standup\nAll good"
+
+    assert len(calls) == 1
+    assert len(list((tmp_path / "uploads" / "blobs").rglob("*.md"))) == 1
+
+    processor.extract_upload(FakeUpload("other.md", b"Different notes"))
+    assert len(calls) == 2
+
+def test_extractor_version_change_invalidates_cached_text(tmp_path, monkeypatch):
+    """Test that text is re-extracted after an extractor's version is bumped."""
+    store = UploadStore(tmp_path / "uploads")
+    processor = FileProcessor(store=store)
+    processor.extract_upload(FakeUpload("data.csv", b"a,b\n1,2\n"))
+
+    digest = store.hash_bytes(b"a,b\n1,2\n")
+    assert store.get_text(digest, FileProcessor.extractor_version(".csv")) is not None
+
+    monkeypatch.setitem(FileProcessor.EXTRACTOR_VERSIONS, ".csv", 99)
+    assert store.get_text(digest, FileProcessor.extractor_version(".csv")) is None
+
+def test_garbage_collection_by_age_and_size(tmp_path):
+    """Test that stale files go first, then the least recently used beyond the size limit."""
+    store = UploadStore(tmp_path / "uploads")
+    now = time.time()
+    paths = []
+    for i, age_days in enumerate([30, 3, 2, 1]):
+        path = store.put(os.urandom(1000), ".bin")
+        os.utime(path, (now - age_days * 86400, now - age_days * 86400))
+        paths.append(path)
+
+    result = store.collect_garbage(max_age_seconds=7 * 86400)
+    assert result["removed"] == 1
+    assert not paths[0].exists()
+
+    result = store.collect_garbage(max_bytes=2000)
+    assert result["removed"] == 1
+    assert not paths[1].exists()
+    assert paths[2].exists() and paths[3].exists()
+    assert store.stats()["total_bytes"] == 2000